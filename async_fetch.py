@@ -0,0 +1,322 @@
+"""
+Concurrent version of `ScrapeYahoo.fetch_yahoo_data`.
+
+The sequential fetcher makes a new cloudscraper session per request and sleeps a fixed
+2 seconds between requests, so a backfill is bound by round trip time plus sleeps.
+This one reuses a single pooled session, runs up to `concurrency` requests at once and
+spaces requests out with a token bucket set in requests/second, so throughput is limited
+by the allowed request rate instead.
+
+The cache layout is the same: each game is saved as `{fetch_dir}/{game_id}.json`, and games
+that are already cached aren't fetched again. The gameOdds endpoint takes a list of game ids,
+so with `batch_size` > 1 a whole slate can be fetched in a few requests and split back into
+one file per game.
+
+There is no async HTTP client in the dependencies, so the blocking session calls are run on
+worker threads with `asyncio.to_thread`. The session's connection pool is sized to match
+the concurrency so connections are kept alive between requests.
+
+`rate` is where the request rate starts. The scraper's Throttle (see throttle.py) moves it up
+to the scraper's MAX_RATE while responses are clean, and the token bucket follows it. After a
+429 or a 5xx every request holds off until the backoff is over, and games that still fail after
+being split down to one per request go into the retry queue, which is drained before returning.
+"""
+
+import asyncio
+import json
+import time
+
+import cloudscraper
+from requests.adapters import HTTPAdapter
+
+import game_index
+import throttle
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, with bursts of up to `capacity`.
+    Waiters are served in the order they arrive.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = None
+        self.slept = 0.0 # total time spent waiting for a token
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if self.updated is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+                self.slept += wait
+                await asyncio.sleep(wait)
+
+
+def make_session(scraper, pool_size):
+    """
+    a session from the scraper's get_scraper(), keeping up to `pool_size` connections alive.
+
+    https:// keeps a cloudscraper CipherSuiteAdapter with the session's cipher suite, curve and
+    ssl context, so the requests still look like the browser's. only the pool is bigger.
+    """
+    session = scraper.get_scraper()
+    session.mount("https://", cloudscraper.CipherSuiteAdapter(
+        cipherSuite=session.cipherSuite, ecdhCurve=session.ecdhCurve, server_hostname=session.server_hostname,
+        source_address=session.source_address, ssl_context=session.ssl_context,
+        pool_connections=1, pool_maxsize=pool_size))
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    return session
+
+
+class AsyncFetcher:
+    """
+    Fetches date pages and game JSON for a scraper (ScrapeYahoo or a subclass), which
+    supplies the URLs and the game id extraction.
+
+    `rate` is the starting request rate in requests per second across all requests (the
+    throttle adjusts it from there), `concurrency` caps the number of
+    requests in flight, and `batch_size` is the number of games asked for in each gameOdds
+    request. A `session` can be passed in, otherwise one is made with the scraper's
+    `get_scraper()`. With a GameIndex as `index`, settled dates and final games are skipped,
+    same as in `ScrapeYahoo.fetch_yahoo_data`.
+    """
+
+    def __init__(self, scraper, concurrency=4, rate=0.5, burst=1, batch_size=1, session=None,
+                 index=None, season=None):
+        self.scraper = scraper
+        self.index = index
+        self.season = season
+        # failed games are queued in the index, or just for this run without one
+        self.retries = index if index is not None else game_index.GameIndex(":memory:")
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.rate = rate
+        self.burst = burst
+        self.session = session if session is not None else self.make_session()
+        self.fetched = 0
+        self.skipped = 0
+        self.failed = []
+        self.backed_off = 0.0 # time spent holding off after failures, on top of the token bucket's waits
+
+    def make_session(self):
+        return make_session(self.scraper, self.concurrency)
+
+    async def get_text(self, url, parse=None, endpoint='dates'):
+        """
+        the async version of ScrapeYahoo.get_text
+        """
+        while (wait := self.throttle.backoff_seconds()) > 0:
+            self.backed_off += wait
+            await asyncio.sleep(wait)
+        await self.bucket.acquire()
+        async with self.semaphore:
+            started = self.throttle.started()
+            try:
+                response = await asyncio.to_thread(self.session.get, url)
+                self.scraper.metrics.count('fetched_bytes', len(response.content), endpoint=endpoint)
+                text = throttle.check_response(response)
+                result = parse(text) if parse else text
+            except Exception as error:
+                self.throttle.failure(error)
+                self.scraper.record_request(endpoint, self.throttle.clock() - started, error)
+                raise
+        self.throttle.success(self.throttle.clock() - started)
+        self.scraper.record_request(endpoint, self.throttle.clock() - started)
+        self.bucket.rate = self.throttle.rate
+        return result
+
+    async def get_game_ids(self, unit):
+        """
+        the game ids for one of the scraper's discovery units, like a date
+        """
+        text = await self.get_text(self.scraper.make_discovery_url(unit))
+        return self.scraper.discovered_game_ids(unit, text)
+
+    def save_game(self, game_json, yahoo_game_id, fetch_dir):
+        self.scraper.save_game_json(game_json, yahoo_game_id, fetch_dir, self.index, self.season)
+        self.retries.clear_retry(yahoo_game_id)
+        self.fetched += 1
+
+    async def fetch_batch(self, game_ids, fetch_dir):
+        """
+        fetches and saves the data for a list of games in one request. if the request fails,
+        or some of the games are missing from the response, the missing games are split in
+        two and retried, down to one game per request. a single game that fails is queued in
+        `retries`.
+        """
+        game_url = self.scraper.make_yahoo_json_url(game_ids)
+        error = "missing from the response"
+        try:
+            games = self.scraper.split_games_response(await self.get_text(game_url, json.loads, 'odds'))
+        except throttle.CircuitOpen:
+            raise
+        except Exception as e:
+            games = {}
+            error = str(e)
+
+        missing = []
+        for game_id in game_ids:
+            if game_id in games:
+                self.save_game(games[game_id], game_id, fetch_dir)
+            else:
+                missing.append(game_id)
+
+        if not missing:
+            return
+        if len(game_ids) == 1:
+            print(f"failed on {game_url}: {error}")
+            self.scraper.metrics.count('games_failed')
+            self.failed.append(game_ids[0])
+            self.retries.queue_retry(game_ids[0], self.scraper.LEAGUE, self.season, error, self.scraper.FAILURE_DELAY)
+            return
+
+        half = (len(missing) + 1) // 2
+        await asyncio.gather(*(self.fetch_batch(part, fetch_dir) for part in (missing[:half], missing[half:]) if part))
+
+    async def fetch_games(self, yahoo_ids, fetch_dir):
+        """
+        fetches every game in yahoo_ids that isn't already cached, `batch_size` games per request.
+        """
+        to_fetch = []
+        for game_id in sorted(yahoo_ids):
+            if self.scraper.game_needs_fetch(game_id, fetch_dir, self.index):
+                to_fetch.append(game_id)
+            else:
+                self.skipped += 1
+
+        batches = [to_fetch[i:i + self.batch_size] for i in range(0, len(to_fetch), self.batch_size)]
+        await asyncio.gather(*(self.fetch_batch(batch, fetch_dir) for batch in batches))
+
+    async def keep_trying(self, fetch, *args):
+        """
+        the async version of ScrapeYahoo.keep_trying
+        """
+        for attempt in range(1, self.scraper.MAX_ATTEMPTS + 1):
+            try:
+                return await fetch(*args)
+            except throttle.CircuitOpen:
+                raise
+            except Exception as error:
+                if attempt == self.scraper.MAX_ATTEMPTS:
+                    raise
+                print(f"failed on {args[0]}, trying again: {error}")
+
+    async def fetch_date(self, nice_date, fetch_dir):
+        try:
+            yahoo_ids = await self.keep_trying(self.get_game_ids, nice_date)
+        except throttle.CircuitOpen:
+            raise
+        except Exception as error:
+            # not recorded in the index, so the next run tries it again
+            print(f"GAVE UP on {nice_date}: {error}")
+            return
+        self.record_date(nice_date, yahoo_ids)
+        await self.fetch_games(yahoo_ids, fetch_dir)
+        print(f"DONE WITH {nice_date}")
+
+    async def discover_window(self, start, end, game_map):
+        """
+        async version of the loop in ScrapeYahoo.discover_game_ids, for one window.
+        halves of a split window are discovered concurrently, and a failed one-day window is tried again.
+        """
+        date_url = self.scraper.make_date_url(start, end)
+        if start == end:
+            game_map.update(self.scraper.assign_game_dates(await self.keep_trying(self.get_text, date_url), start, end))
+            return
+        try:
+            date_html = await self.get_text(date_url)
+            assigned = self.scraper.assign_game_dates(date_html, start, end)
+        except throttle.CircuitOpen:
+            raise
+        except Exception:
+            assigned = None
+
+        if assigned is None:
+            await asyncio.gather(*(self.discover_window(window_start, window_end, game_map)
+                                   for (window_start, window_end) in self.scraper.split_discovery_window(start, end)))
+        else:
+            game_map.update(assigned)
+
+    async def discover(self, start, end, window_days):
+        game_map = {}
+        await asyncio.gather(*(self.discover_window(window_start, window_end, game_map)
+                               for (window_start, window_end) in self.scraper.make_discovery_windows(start, end, window_days)))
+        return game_map
+
+    def record_date(self, nice_date, yahoo_ids):
+        if self.index is not None:
+            self.scraper.record_discovery(self.index, self.season, nice_date, yahoo_ids)
+
+    async def fetch_discovered(self, dates, window_days, fetch_dir):
+        game_map = await self.discover(dates[0], dates[-1], window_days)
+        for nice_date in dates:
+            if nice_date in game_map:
+                print(f"{nice_date}: {len(game_map[nice_date])} games")
+            self.record_date(nice_date, game_map.get(nice_date, set()))
+        await self.fetch_games(set().union(*game_map.values()), fetch_dir)
+
+    def start_loop_state(self, shared=None):
+        # made once the event loop is running, rather than in __init__, so they belong to it.
+        # fetchers that run together (see orchestrator.py) use `shared`'s, for one request budget
+        if shared is not None:
+            self.throttle, self.bucket, self.semaphore = shared.throttle, shared.bucket, shared.semaphore
+            return
+        self.throttle = self.scraper.make_throttle(self.rate)
+        self.bucket = TokenBucket(self.throttle.rate, self.burst)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def drain_retries(self, fetch_dir, wait=True):
+        """
+        the async version of ScrapeYahoo.drain_retries. games that are due are fetched concurrently.
+        """
+        league, max_attempts = self.scraper.LEAGUE, self.scraper.MAX_ATTEMPTS
+        while True:
+            due = self.retries.due_retries(league, self.season, max_attempts)
+            if not due:
+                wait_seconds = self.retries.next_retry_seconds(league, self.season, max_attempts)
+                if not wait or wait_seconds is None:
+                    break
+                self.backed_off += wait_seconds
+                await asyncio.sleep(wait_seconds)
+                continue
+            self.failed = [game_id for game_id in self.failed if game_id not in due]
+            await asyncio.gather(*(self.fetch_batch([game_id], fetch_dir) for game_id in due))
+
+    async def fetch_dates(self, dates, fetch_dir):
+        await asyncio.gather(*(self.fetch_date(nice_date, fetch_dir) for nice_date in dates))
+
+    async def fetch_range(self, fetch_dir, start, end, window_days=None):
+        self.start_loop_state()
+        # games left over from an earlier run
+        await self.drain_retries(fetch_dir, wait=False)
+        dates = self.scraper.unsettled_dates(start, end, self.index, self.season)
+        if dates:
+            if window_days:
+                await self.fetch_discovered(dates, window_days, fetch_dir)
+            else:
+                await self.fetch_dates(dates, fetch_dir)
+        await self.drain_retries(fetch_dir)
+        self.scraper.log_abandoned_retries(self.retries)
+
+    def run(self, fetch_dir, start, end, window_days=None):
+        """
+        fetches all games from `start` to `end` into `fetch_dir`. with `window_days`, game ids
+        are discovered `window_days` at a time instead of one date per request.
+        """
+        with self.scraper.metrics.stage('fetch') as stage:
+            asyncio.run(self.fetch_range(fetch_dir, start, end, window_days))
+            stage.items = self.fetched
+        self.scraper.metrics.count('sleep_seconds', self.bucket.slept + self.backed_off)
+        return self
@@ -0,0 +1,263 @@
+"""
+Vectorized backtesting of betting strategies on the money line and spread data.
+
+Every game is split into two candidate bets, one on each side. A strategy is a boolean mask
+over those bets, so a whole set of strategies is a (bets x strategies) matrix, and the record,
+profit and significance of all of them come out of a few matrix products instead of an
+`iterrows()` loop per strategy.
+
+A strategy is described by a dict, with any of these keys:
+
+    market   'money' (default) or 'spread'
+    odds     (low, high): bet sides with low <= American odds < high, like the `config`
+             buckets in the notebooks
+    side     'home' or 'away'
+    role     'favorite' or 'dog'. on the spread the dog is the side getting points, on the
+             money line it's the side with the longer odds.
+    public   'popular' or 'contrarian': the side with more (or less) of the bets
+    by       'wager' (default) or 'stake': whether `public` goes by bet count or money
+
+Significance is tested against the market: each bet is assumed to win with its vig-free
+implied probability (see `scrape_utils.vig_free_probs`). For -110/-110 spread bets that's
+the same 50% null hypothesis as `win_loss_report`.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+import scrape_utils
+
+MARKETS = {
+    # market: (odds column, won column, wager % column, stake % column)
+    'money': ('money_{side}_odds', 'money_{side}_won', 'money_{side}_wager_percentage', 'money_{side}_stake_percentage'),
+    'spread': ('spread_{side}_odds', 'spread_{side}_won', 'spread_{side}_wager_percentage', 'spread_{side}_stake_percentage'),
+}
+
+
+def normal_sf(z):
+    """
+    the upper tail of the standard normal distribution, for a number or a whole array of them
+
+    >>> round(float(normal_sf(1.6449)), 3)
+    0.05
+    """
+    z = np.asarray(z, dtype=float)
+    # only a few hundred strategies are tested at a time, so math.erfc per element is plenty fast
+    return 0.5 * np.asarray(np.frompyfunc(math.erfc, 1, 1)(z / math.sqrt(2)), dtype=float)
+
+
+def make_bets(df, market='money'):
+    """
+    returns a dataframe with two rows per game, one for betting each side of `market`.
+    games without odds for both sides are left out.
+    """
+    odds_col, won_col, wager_col, stake_col = MARKETS[market]
+    columns = {}
+    for side in ['home', 'away']:
+        other = 'away' if side == 'home' else 'home'
+        odds = pd.to_numeric(df[odds_col.format(side=side)], errors='coerce').to_numpy(dtype=float)
+        other_odds = pd.to_numeric(df[odds_col.format(side=other)], errors='coerce').to_numpy(dtype=float)
+        won = df[won_col.format(side=side)].astype(object).eq(True).to_numpy()
+        other_won = df[won_col.format(side=other)].astype(object).eq(True).to_numpy()
+        wager = pd.to_numeric(df[wager_col.format(side=side)], errors='coerce').to_numpy(dtype=float)
+        stake = pd.to_numeric(df[stake_col.format(side=side)], errors='coerce').to_numpy(dtype=float)
+
+        if market == 'spread':
+            points = pd.to_numeric(df[f"spread_{side}_points"], errors='coerce').to_numpy(dtype=float)
+            dog = points > 0
+            favorite = points < 0
+        else:
+            dog = odds > other_odds
+            favorite = odds < other_odds
+
+        # ties go to the away side, same as money_popular and spread_most_popular
+        tie_goes_here = side == 'away'
+        columns[side] = pd.DataFrame({
+            'game_id': df['game_id'].to_numpy() if 'game_id' in df.columns else df.index.to_numpy(),
+            'side': side,
+            'odds': odds,
+            'other_odds': other_odds,
+            'won': won,
+            'push': ~won & ~other_won,
+            'dog': dog,
+            'favorite': favorite,
+            'wager_popular': (wager > 50) | ((wager == 50) & tie_goes_here),
+            'stake_popular': (stake > 50) | ((stake == 50) & tie_goes_here),
+            'has_wager': ~np.isnan(wager),
+            'has_stake': ~np.isnan(stake),
+        })
+
+    bets = pd.concat([columns['home'], columns['away']], ignore_index=True)
+    bets = bets[~np.isnan(bets.odds) & ~np.isnan(bets.other_odds)].reset_index(drop=True)
+    bets['payout'] = scrape_utils.payout(bets.odds.to_numpy())
+    bets['fair_prob'] = scrape_utils.vig_free_probs(bets.odds.to_numpy(), bets.other_odds.to_numpy())[0]
+    return bets
+
+
+def strategy_mask(bets, strategy):
+    """
+    the boolean mask of the bets a single strategy makes.
+    """
+    mask = np.ones(len(bets), dtype=bool)
+    if 'odds' in strategy:
+        low, high = strategy['odds']
+        mask &= (bets.odds.to_numpy() >= low) & (bets.odds.to_numpy() < high)
+    if 'side' in strategy:
+        mask &= (bets.side == strategy['side']).to_numpy()
+    if 'role' in strategy:
+        mask &= bets[strategy['role']].to_numpy()
+    if 'public' in strategy:
+        by = strategy.get('by', 'wager')
+        popular = bets[f"{by}_popular"].to_numpy()
+        mask &= bets[f"has_{by}"].to_numpy()
+        mask &= popular if strategy['public'] == 'popular' else ~popular
+    return mask
+
+
+def strategy_masks(bets, strategies):
+    """
+    a (bets x strategies) float matrix of 1s for the bets each strategy makes. pushes don't
+    count as bets, so they're left out of every strategy.
+    """
+    masks = np.column_stack([strategy_mask(bets, strategy) for strategy in strategies]).astype(float)
+    masks[bets.push.to_numpy()] = 0
+    return masks
+
+
+def group_by_market(strategies):
+    """
+    {market: [strategy names]}, keeping the order of `strategies`
+    """
+    by_market = {}
+    for name, strategy in strategies.items():
+        by_market.setdefault(strategy.get('market', 'money'), []).append(name)
+    return by_market
+
+
+def bet_outcomes(bets):
+    """
+    profit per $100 bet, or 0 for a push.
+    """
+    return np.where(bets.push, 0.0, np.where(bets.won, bets.payout, -100.0))
+
+
+def market_masks(df, strategies):
+    """
+    yields (market, strategy names, bets, masks) for each market the strategies bet on.
+    """
+    for market, names in group_by_market(strategies).items():
+        bets = make_bets(df, market)
+        yield market, names, bets, strategy_masks(bets, [strategies[name] for name in names])
+
+
+def score_strategies(market, names, bets, masks):
+    """
+    the record, profit and normal approximation significance of each column of `masks`.
+    """
+    won = bets.won.to_numpy(dtype=float)
+    payout = bets.payout.to_numpy()
+    profit = bet_outcomes(bets)
+    q = bets.fair_prob.to_numpy()
+    expected = q * payout - (1 - q) * 100
+    variance = q * (1 - q) * (payout + 100) ** 2
+
+    n = masks.sum(axis=0)
+    wins = won @ masks
+    total = profit @ masks
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_score = (total - expected @ masks) / np.sqrt(variance @ masks)
+        roi = total / n
+
+    return pd.DataFrame({
+        'market': market,
+        'bets': n.astype(int),
+        'wins': wins.astype(int),
+        'losses': (n - wins).astype(int),
+        'profit': total,
+        'roi': roi,
+        'z_score': z_score,
+        'p_value': normal_sf(z_score),
+    }, index=pd.Index(names, name='strategy'))
+
+
+def run_strategies(df, strategies):
+    """
+    evaluates every strategy in `strategies` ({name: strategy dict}) against a frame from
+    money_data.add_money_columns / spread_data.add_spread_columns.
+
+    returns one row per strategy with its record, profit, ROI (profit per $100 bet), and a z-score
+    and one-sided p-value for doing better than the vig-free market odds.
+    """
+    results = [score_strategies(*market) for market in market_masks(df, strategies)]
+    return pd.concat(results).loc[list(strategies)]
+
+
+def odds_buckets(config, market='money', **strategy):
+    """
+    turns a notebook style config of {name: [low, high]} odds buckets into strategies.
+    any other strategy keys are added to all of them.
+    """
+    return {name: dict(strategy, market=market, odds=(low, high)) for name, (low, high) in config.items()}
+
+
+def strategy_grid(markets=('money', 'spread'), sides=(None, 'home', 'away'), roles=(None, 'favorite', 'dog'),
+                  publics=(None, 'popular', 'contrarian'), bys=('wager', 'stake'), buckets=None):
+    """
+    every combination of the given options, named like 'money/home/dog/popular by stake/mild dogs'.
+    `buckets` is an optional notebook style odds config.
+    """
+    strategies = {}
+    bucket_items = list((buckets or {None: None}).items())
+    for market in markets:
+        for side in sides:
+            for role in roles:
+                for public in publics:
+                    for by in (bys if public else ('wager',)):
+                        for bucket_name, bucket in bucket_items:
+                            strategy = {'market': market}
+                            parts = [market]
+                            if side:
+                                strategy['side'] = side
+                                parts.append(side)
+                            if role:
+                                strategy['role'] = role
+                                parts.append(role)
+                            if public:
+                                strategy['public'] = public
+                                strategy['by'] = by
+                                parts.append(f"{public} by {by}")
+                            if bucket is not None:
+                                strategy['odds'] = tuple(bucket)
+                                parts.append(bucket_name)
+                            strategies["/".join(parts)] = strategy
+    return strategies
+
+
+def win_loss_report(wins, losses, vig=1.1):
+    """
+    the notebooks' report for a record against -110 style lines, returned as a dict
+    instead of printed. works on arrays of wins and losses too.
+    """
+    wins = np.asarray(wins, dtype=float)
+    losses = np.asarray(losses, dtype=float)
+    win_pct = wins / (wins + losses)
+    expected_wins = (wins + losses) / 2
+    std = np.sqrt(wins + losses) / 2 # sqrt(n*p*(1-p)) = sqrt(n * .5 * .5) = sqrt(n)/2
+    z_score = (wins - expected_wins) / std
+    return {
+        'record': (wins, losses),
+        'units': wins - (vig * losses),
+        'full vig (-110) units': wins - (1.1 * losses),
+        'reduced juice (-106)': wins - (1.06 * losses),
+        'reduced juice (-105)': wins - (1.05 * losses),
+        'betting market': (.97 * wins) - (1.017 * losses),
+        'win pct': 100 * win_pct,
+        'expected wins': expected_wins,
+        'excess': wins - expected_wins,
+        'profit %': 100 * (win_pct - (vig * (1 - win_pct))),
+        'z test': z_score,
+        'std': std,
+        'p-value': normal_sf(z_score),
+    }
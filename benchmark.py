@@ -0,0 +1,202 @@
+"""
+Benchmarks each stage of turning cached games into summary data, on synthetic games.
+
+    python benchmark.py --league mlb --games 1000 10000 100000 --output bench.json
+
+Games come from `synthetic_games`, written to a temporary directory the way the scrapers cache
+them (`--store json`, one JSON file per game, the default) or packed into a GameArchive
+(`--store archive`), and then go through the same steps as `rebuild_summary_csv`, each timed on
+its own:
+
+    parse            load + decode + rules (ScrapeYahoo.parse_files, unmassaged)
+    assemble         rows to a DataFrame (rows_to_dataframe)
+    massage          one/two to home/away (massage_yahoo_frame)
+    spread_columns   spread_data.add_spread_columns
+    money_columns    money_data.add_money_columns
+    significance     bootstrap intervals and p-values for backtest.strategy_grid() (significance.significance)
+    summary_csv      writing the summary CSV
+    summary_parquet  writing the typed Parquet partition (if pyarrow is installed)
+
+Each stage reports seconds, games per second and, unless --no-memory is given, the peak memory
+allocated during a second run of the stage under tracemalloc (memory allocated outside of
+Python and numpy, like pyarrow's, isn't counted). significance is only run once, since its
+bootstrap is slower than everything else put together on big runs. The results are JSON, with the commit and
+library versions, so runs can be compared between commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import game_decoder
+import leagues
+import money_data
+import scrape_utils
+import significance
+import spread_data
+import summary_store
+import synthetic_games
+
+SCRAPERS = leagues.SCRAPERS
+STORES = ['json', 'archive']
+
+
+def time_stage(fn, args, games, memory=True):
+    """
+    runs fn(*args), returning its result and a dict of timings. with `memory`, fn is
+    run a second time under tracemalloc for its peak allocation.
+    """
+    started = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - started
+    stats = {
+        'seconds': seconds,
+        'games_per_second': games / seconds if seconds else None,
+    }
+    if memory:
+        tracemalloc.start()
+        fn(*args)
+        stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, stats
+
+
+def quiet(fn):
+    """
+    fn with its prints (skipped games, missing markets) thrown away
+    """
+    def run(*args):
+        with open(os.devnull, 'w') as devnull:
+            stdout = sys.stdout
+            sys.stdout = devnull
+            try:
+                return fn(*args)
+            finally:
+                sys.stdout = stdout
+    return run
+
+
+def have_pyarrow():
+    try:
+        import pyarrow # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_benchmark(n_games, league='mlb', missing_rate=0.05, sparse_rate=0.0, seed=0, memory=True, work_dir=None,
+                  store='json'):
+    """
+    generates `n_games` games, cached as `store` (one of STORES), and times every stage on them.
+    returns a dict of results.
+    """
+    scraper = SCRAPERS[league]()
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        started = time.perf_counter()
+        games = synthetic_games.make_games(n_games, league, seed, missing_rate, sparse_rate)
+        if store == 'archive':
+            archive_path = os.path.join(tmp, f"{league}.pack")
+            sources = [(archive_path, game_id) for game_id in synthetic_games.write_archive(archive_path, games)]
+        else:
+            json_dir = os.path.join(tmp, league)
+            os.makedirs(json_dir)
+            sources = synthetic_games.write_files(json_dir, games)
+        generate_seconds = time.perf_counter() - started
+
+        parsed_rules = scraper.preparse_rules()
+        stages = {}
+        rows, stages['parse'] = time_stage(quiet(scraper.parse_files), (sources, parsed_rules, False), n_games, memory)
+        df, stages['assemble'] = time_stage(scraper.rows_to_dataframe, (rows,), n_games, memory)
+        (massaged, _), stages['massage'] = time_stage(scraper.massage_yahoo_frame, (df,), n_games, memory)
+
+        _, stages['spread_columns'] = time_stage(lambda df: spread_data.add_spread_columns(df.copy()),
+                                                 (massaged,), n_games, memory)
+        numeric = scrape_utils.numericize(massaged.copy())
+        _, stages['money_columns'] = time_stage(money_data.add_money_columns, (numeric,), n_games, memory)
+        _, stages['significance'] = time_stage(significance.significance, (numeric, backtest.strategy_grid()),
+                                               n_games, memory=False)
+
+        csv_path = os.path.join(tmp, "odds.csv")
+        _, stages['summary_csv'] = time_stage(lambda df: df.to_csv(csv_path, index=False), (massaged,), n_games, memory)
+        if have_pyarrow():
+            parquet_root = os.path.join(tmp, "parquet")
+            _, stages['summary_parquet'] = time_stage(summary_store.write_season, (massaged, parquet_root, league, 'bench'),
+                                                      n_games, memory)
+
+    return {
+        'league': league,
+        'store': store,
+        'games': n_games,
+        'rows': len(rows),
+        'missing_rate': missing_rate,
+        'sparse_rate': sparse_rate,
+        'seed': seed,
+        'generate_seconds': generate_seconds,
+        'stages': stages,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def environment():
+    return {
+        'commit': git_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'decoder': 'msgspec' if game_decoder.get_decoder() else 'json',
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--league', choices=sorted(SCRAPERS), default='mlb')
+    parser.add_argument('--games', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--missing-rate', type=float, default=0.05,
+                        help="chance each market is missing from a game")
+    parser.add_argument('--sparse-rate', type=float, default=0.0,
+                        help="chance a game has no six-pack data at all")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--store', choices=STORES, default='json',
+                        help="cache the games as one JSON file each, or in a GameArchive")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc runs")
+    parser.add_argument('--output', help="write the JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {'environment': environment(), 'runs': []}
+    for n_games in args.games:
+        run = run_benchmark(n_games, args.league, args.missing_rate, args.sparse_rate, args.seed, not args.no_memory,
+                            store=args.store)
+        results['runs'].append(run)
+        summary = ", ".join(f"{name} {stage['games_per_second']:,.0f}/s" for name, stage in run['stages'].items())
+        print(f"{args.league} {n_games} games ({args.store}): {summary}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmarks fetching against the local Yahoo stand-in, instead of the real site.
+
+    python fetch_benchmark.py --league mlb --games 500 --mode async --concurrency 8 --latency 0.05
+    python fetch_benchmark.py --mode sequential --polite-delay 0.01 --error-rate 0.05
+
+Serves `--games` synthetic games from a `yahoo_stand_in.StandInYahoo` with the given latency
+and faults, points a scraper at it and fetches everything into a temporary directory with
+either the sequential `fetch_yahoo_data` or `fetch_yahoo_data_async`. NFL always uses the
+weekly sequential fetcher.
+
+Both fetchers pace themselves with a throttle.Throttle: it starts at `--rate` requests per
+second for the async fetcher, or one request every `--polite-delay` seconds for the sequential
+one, and can climb to `--max-rate` (no limit by default). Failures back off `--failure-delay`
+seconds, doubling, and the circuit breaker cools down for six times that.
+
+Reports games per second, the requests the server saw by endpoint and status, retried
+gameOdds requests, games that never made it, the rate the throttle ended up at, and seconds
+spent sleeping (between requests and backing off for the sequential fetcher, waiting on the
+token bucket and backing off for the async one), as JSON.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+import benchmark
+import yahoo_stand_in
+
+
+def run_fetch_benchmark(n_games=200, league='mlb', mode='async', concurrency=8, rate=50.0, batch_size=1,
+                        window_days=None, polite_delay=0.0, max_rate=None, failure_delay=0.0, latency=0.0,
+                        jitter=0.0, error_rate=0.0, throttle_rate=0.0, truncate_rate=0.0, retry_after=1, seed=0):
+    """
+    fetches `n_games` synthetic games from a stand-in server, and returns a dict of results.
+    """
+    scraper = benchmark.SCRAPERS[league]()
+    scraper.POLITE_DELAY = polite_delay
+    scraper.MAX_RATE = max_rate or float('inf')
+    scraper.FAILURE_DELAY = failure_delay
+    scraper.BREAKER_COOLDOWN = failure_delay * 6
+
+    server = yahoo_stand_in.StandInYahoo.from_synthetic(n_games, league, seed, latency=latency, jitter=jitter,
+                                                        error_rate=error_rate, throttle_rate=throttle_rate,
+                                                        truncate_rate=truncate_rate, retry_after=retry_after)
+    dates = sorted(server.dates)
+    with server, tempfile.TemporaryDirectory() as fetch_dir:
+        server.configure(scraper)
+        started = time.perf_counter()
+        if league == 'nfl':
+            mode = 'sequential'
+            benchmark.quiet(scraper.fetch_yahoo_data)(fetch_dir, int(dates[0][:4]))
+            pacer, slept = scraper.get_throttle(), scraper.slept
+        elif mode == 'sequential':
+            benchmark.quiet(scraper.fetch_yahoo_data)(fetch_dir, dates[0], dates[-1], window_days)
+            pacer, slept = scraper.get_throttle(), scraper.slept
+        else:
+            fetcher = benchmark.quiet(scraper.fetch_yahoo_data_async)(
+                fetch_dir, dates[0], dates[-1], concurrency, rate, batch_size, window_days)
+            pacer, slept = fetcher.throttle, fetcher.bucket.slept + fetcher.backed_off
+        seconds = time.perf_counter() - started
+        fetched = len([filename for filename in os.listdir(fetch_dir) if filename.endswith('.json')])
+
+    odds_requests = sum(count for (endpoint, _), count in server.stats.items() if endpoint.startswith('odds'))
+    needed = math.ceil(n_games / (1 if mode == 'sequential' else batch_size))
+    return {
+        'league': league,
+        'mode': mode,
+        'games': n_games,
+        'fetched': fetched,
+        'failed': n_games - fetched,
+        'seconds': seconds,
+        'games_per_second': fetched / seconds if seconds else None,
+        'retries': max(0, odds_requests - needed),
+        'slept_seconds': slept,
+        'final_rate': pacer.rate,
+        'throttle': dict(pacer.counts, circuit_trips=pacer.breaker.trips),
+        'requests': {f"{endpoint} {status}": count for (endpoint, status), count in sorted(server.stats.items())},
+        'settings': {
+            'concurrency': concurrency, 'rate': rate, 'batch_size': batch_size, 'window_days': window_days,
+            'polite_delay': polite_delay, 'max_rate': max_rate, 'failure_delay': failure_delay, 'latency': latency,
+            'jitter': jitter, 'error_rate': error_rate, 'throttle_rate': throttle_rate,
+            'truncate_rate': truncate_rate, 'retry_after': retry_after, 'seed': seed,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--league', choices=sorted(benchmark.SCRAPERS), default='mlb')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--mode', choices=['async', 'sequential'], default='async')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=50.0, help="async requests per second to start at")
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--window-days', type=int, default=None)
+    parser.add_argument('--polite-delay', type=float, default=0.0,
+                        help="sequential fetcher's starting sleep between requests")
+    parser.add_argument('--max-rate', type=float, default=None, help="highest requests per second to climb to")
+    parser.add_argument('--failure-delay', type=float, default=0.0, help="first backoff after a failure")
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--truncate-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=1, help="seconds the stand-in's 429s ask for")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    run = run_fetch_benchmark(args.games, args.league, args.mode, args.concurrency, args.rate, args.batch_size,
+                              args.window_days, args.polite_delay, args.max_rate, args.failure_delay, args.latency,
+                              args.jitter, args.error_rate, args.throttle_rate, args.truncate_rate, args.retry_after,
+                              args.seed)
+    results = {'environment': benchmark.environment(), 'runs': [run]}
+    print(f"{run['league']} {run['mode']}: {run['fetched']}/{run['games']} games, "
+          f"{run['games_per_second']:,.1f}/s, {run['retries']} retries, {run['slept_seconds']:.1f}s asleep, "
+          f"ended at {run['final_rate']:,.1f} requests/s",
+          file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return results
+
+
+if __name__ == '__main__':
+    main()
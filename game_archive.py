@@ -0,0 +1,198 @@
+"""
+A packed, append-only archive of raw game JSON, one per league/season.
+
+Each game is normally its own JSON file under `BASE_DIR/<season>/`, which adds up to tens of
+thousands of small files across seasons and leagues. An archive keeps a whole season in one
+data file instead:
+
+    <path>       records of (id length, payload length, game id, zlib compressed JSON)
+    <path>.idx   one "game_id offset length" line per record, for finding games without a scan
+
+Records are only ever appended. If a game is written again (say it wasn't final the first
+time), the newest record wins. The data file is self-describing, so the index can always be
+rebuilt from it with `rebuild_index()`. Reads go through a memory map of the data file.
+
+A write that was interrupted leaves part of a record at the end of the data file. Reading
+skips it, and the first write after opening cuts it off, so new records don't land behind it.
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+
+HEADER = struct.Struct('<HI')
+
+# archives opened for reading, by path, so worker processes only load each index once
+_open_archives = {}
+
+
+def open_archive(path):
+    if path not in _open_archives:
+        _open_archives[path] = GameArchive(path)
+    return _open_archives[path]
+
+
+class GameArchive:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.offsets = {}
+        self._file = None
+        self._map = None
+        self._tail_checked = False
+
+        if os.path.exists(path):
+            self.load_index()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, game_id):
+        return game_id in self.offsets
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def game_ids(self):
+        """
+        game ids in the order they are stored, which is the fastest order to read them in.
+        """
+        return sorted(self.offsets, key=lambda game_id: self.offsets[game_id][0])
+
+    def load_index(self):
+        """
+        reads the .idx file, or rebuilds it if it's missing or doesn't cover the whole data file.
+        """
+        self.close()
+        offsets = {}
+        end = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                try:
+                    for line in f:
+                        game_id, offset, length = line.split()
+                        offsets[game_id] = (int(offset), int(length))
+                        end = max(end, int(offset) + int(length))
+                except ValueError:
+                    end = -1 # a partly written line, so the index gets rebuilt
+
+        if end != os.path.getsize(self.path):
+            self.rebuild_index()
+        else:
+            self.offsets = offsets
+
+    def scan(self):
+        """
+        yields (game_id, payload offset, payload length) for every record in the data file.
+        """
+        if os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = 0
+            while pos + HEADER.size <= len(data):
+                id_length, length = HEADER.unpack_from(data, pos)
+                id_start = pos + HEADER.size
+                payload_start = id_start + id_length
+                if id_length == 0 or payload_start + length > len(data):
+                    break # a partly written record at the end
+                yield data[id_start:payload_start].decode(), payload_start, length
+                pos = payload_start + length
+
+    def rebuild_index(self):
+        self.offsets = {}
+        with open(self.index_path, 'w') as f:
+            for game_id, offset, length in self.scan():
+                self.offsets[game_id] = (offset, length)
+                f.write(f"{game_id} {offset} {length}\n")
+
+    def truncate_partial_record(self):
+        """
+        cuts off anything after the last whole record in the data file, like the start of a record
+        whose write was interrupted. returns the number of bytes cut off.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        self.close()
+        self.load_index()
+        good_end = max((offset + length for offset, length in self.offsets.values()), default=0)
+        extra = os.path.getsize(self.path) - good_end
+        if extra > 0:
+            print(f"{self.path}: cutting off {extra} bytes of a partly written record")
+            os.truncate(self.path, good_end)
+        return max(extra, 0)
+
+    def write(self, game_id, json_data):
+        """
+        appends a game to the archive.
+        """
+        self.close() # the memory map is re-made on the next read, to cover the new record
+        if not self._tail_checked:
+            self.truncate_partial_record()
+            self._tail_checked = True
+        payload = zlib.compress(json.dumps(json_data, separators=(',', ':')).encode())
+        id_bytes = game_id.encode()
+
+        with open(self.path, 'ab') as f:
+            offset = f.tell() + HEADER.size + len(id_bytes)
+            f.write(HEADER.pack(len(id_bytes), len(payload)))
+            f.write(id_bytes)
+            f.write(payload)
+        with open(self.index_path, 'a') as f:
+            f.write(f"{game_id} {offset} {len(payload)}\n")
+
+        self.offsets[game_id] = (offset, len(payload))
+
+    def read_bytes(self, game_id):
+        """
+        returns the uncompressed JSON for a game.
+        """
+        if self._map is None:
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset, length = self.offsets[game_id]
+        return zlib.decompress(self._map[offset:offset + length])
+
+    def read(self, game_id):
+        return json.loads(self.read_bytes(game_id))
+
+    def items(self):
+        for game_id in self.game_ids():
+            yield game_id, self.read(game_id)
+
+
+def migrate_directory(json_dir, path, check=True):
+    """
+    packs every JSON file in `json_dir` into the archive at `path`, skipping games that are
+    already in it. with `check`, each game is read back and compared to the original file.
+
+    returns the number of games added.
+    """
+    added = 0
+    with GameArchive(path) as archive:
+        for filename in sorted(os.listdir(json_dir)):
+            if not filename.endswith('.json'):
+                continue
+            game_id = filename[:-len('.json')]
+            if game_id in archive:
+                continue
+
+            with open(os.path.join(json_dir, filename), 'r') as f:
+                json_data = json.load(f)
+            archive.write(game_id, json_data)
+            if check and archive.read(game_id) != json_data:
+                raise ValueError(f"{game_id} doesn't match {filename} after packing")
+            added += 1
+    return added
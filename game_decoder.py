@@ -0,0 +1,115 @@
+"""
+Decodes cached gameOdds JSON straight from bytes, keeping only what the rules read.
+
+`json.load` builds the whole document: league metadata, team objects, prop bets, the
+quarter/half/period six-packs and every six-pack entry, even though `scrape_rules.RULES` only
+reads a few dozen fields. Here the rule paths are turned into a msgspec schema instead:
+
+    .field          a Struct with that field
+    [index]         a list of whatever comes after it
+    [?k = "v" ...]  a list of Structs with the k fields, plus whatever comes after it
+
+msgspec skips every key that isn't in the schema without building anything for it, so the
+decoded game is a small tree of Structs. `GameDecoder.decode()` turns that into plain dicts
+and lists (missing fields left out, nulls kept as None) with the same shape as the parts of the original document the rules look at, so
+`rule_compiler.CompiledRules.extract()` gives exactly the same row as on the full document.
+
+A document that doesn't fit the schema (a list where the rules expect an object, say) is
+decoded with `json.loads` instead, so the results never depend on which path was taken.
+
+Needs msgspec, which is an optional dependency (`pip install scrape-yahoo-odds[fast]`).
+"""
+
+import functools
+import json
+from typing import Any
+
+import rule_compiler
+import scrape_rules
+
+LEAF = None
+
+
+def make_shape(rules):
+    """
+    merges the rule paths into a tree of nested dicts (objects), one element lists (arrays),
+    and LEAF where a rule ends and the value is kept whole.
+
+    >>> make_shape({'a': '$.x[0].y', 'b': '$.x[?t = "z"].w'})
+    {'x': [{'y': None, 't': None, 'w': None}]}
+    """
+    root = {}
+    for expression in rules.values():
+        parent, key, shape = None, None, root
+        for kind, arg in rule_compiler.parse_path(expression):
+            if shape is LEAF:
+                break # something above this is already kept whole
+            if kind == rule_compiler.FIELD:
+                if not isinstance(shape, dict):
+                    raise ValueError(f"{expression!r} reads a field of an array")
+                parent, key = shape, arg
+                shape = shape.setdefault(arg, {})
+                continue
+
+            if isinstance(shape, dict):
+                if shape or parent is None:
+                    raise ValueError(f"{expression!r} reads an object as an array")
+                shape = parent[key] = [{}] # an array where we'd only seen the name so far
+            parent, key = shape, 0
+            shape = shape[0]
+            if kind == rule_compiler.FILTER and shape is not LEAF:
+                for field, _ in arg:
+                    shape.setdefault(field, LEAF)
+        else:
+            if parent is not None:
+                parent[key] = LEAF # the rule ends here, so keep whatever is at this spot
+    return root
+
+
+def make_type(shape, name='Game'):
+    import msgspec
+
+    if shape is LEAF:
+        return Any
+    if isinstance(shape, list):
+        return list[make_type(shape[0], name + 'Item')]
+    fields = []
+    for field, child in shape.items():
+        field_type = make_type(child, name + field[:1].upper() + field[1:])
+        if field_type is not Any:
+            field_type = field_type | None | msgspec.UnsetType
+        fields.append((field, field_type, msgspec.UNSET))
+    return msgspec.defstruct(name, fields)
+
+
+class GameDecoder:
+    def __init__(self, rules=scrape_rules.RULES):
+        import msgspec
+
+        self.decoder = msgspec.json.Decoder(make_type(make_shape(rules)))
+        # fields that weren't in the document are UNSET, and left out of the dicts
+        self.to_builtins = msgspec.to_builtins
+        self.errors = (msgspec.ValidationError, msgspec.DecodeError)
+        self.fallbacks = 0
+
+    def decode(self, data):
+        """
+        returns the parts of the JSON in `data` (bytes) that the rules read, or the whole
+        document from json.loads if it doesn't fit the schema.
+        """
+        try:
+            return self.to_builtins(self.decoder.decode(data))
+        except self.errors:
+            self.fallbacks += 1
+            return json.loads(data)
+
+
+@functools.cache
+def get_decoder():
+    """
+    a GameDecoder for scrape_rules.RULES, or None if msgspec isn't installed.
+    """
+    try:
+        return GameDecoder()
+    except ImportError:
+        return None
@@ -0,0 +1,206 @@
+"""
+An on-disk index of every game the scrapers have seen, kept in SQLite.
+
+Without it, every re-run has to re-download every date page to find out which games were
+played, and can only tell whether a game is cached by checking for its file. The index
+remembers which dates have been checked, which games were on them, when each game was
+fetched and what its status was at the time. That way a date where every game was already
+FINAL can be skipped without any network calls, and games that were saved before they were
+over can be fetched again.
+
+It also holds the retry queue: games that failed to fetch, how many times they failed and
+when they're due to be tried again, so a failure isn't forgotten when the run ends.
+"""
+
+import datetime
+import sqlite3
+
+# games with one of these statuses aren't going to change anymore
+FINAL_STATUSES = ('FINAL',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    league TEXT NOT NULL,
+    season TEXT,
+    game_date TEXT,
+    status TEXT,
+    fetched_at TEXT
+);
+CREATE INDEX IF NOT EXISTS games_by_date ON games (league, game_date);
+CREATE INDEX IF NOT EXISTS games_by_season ON games (league, season);
+
+CREATE TABLE IF NOT EXISTS dates (
+    league TEXT NOT NULL,
+    game_date TEXT NOT NULL,
+    season TEXT,
+    checked_at TEXT NOT NULL,
+    PRIMARY KEY (league, game_date)
+);
+
+CREATE TABLE IF NOT EXISTS retries (
+    game_id TEXT PRIMARY KEY,
+    league TEXT NOT NULL,
+    season TEXT,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    retry_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS retries_by_time ON retries (league, retry_at);
+"""
+
+
+def now(delay=0):
+    return (datetime.datetime.now() + datetime.timedelta(seconds=delay)).isoformat(timespec='seconds')
+
+
+class GameIndex:
+    """
+    Index of games keyed by game id. `path` is the SQLite file, or ":memory:".
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record_date(self, league, season, game_date, game_ids):
+        """
+        records that `game_date` was checked, and which games were on it.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO dates (league, game_date, season, checked_at) VALUES (?, ?, ?, ?)",
+                (league, game_date, season, now()))
+            self.connection.executemany(
+                """INSERT INTO games (game_id, league, season, game_date) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (game_id) DO UPDATE SET
+                       season = coalesce(excluded.season, season),
+                       game_date = excluded.game_date""",
+                [(game_id, league, season, game_date) for game_id in game_ids])
+
+    def record_fetch(self, game_id, league, status, season=None, game_date=None, fetched_at=None):
+        """
+        records that a game was fetched, and its status at the time.
+        """
+        with self.connection:
+            self.connection.execute(
+                """INSERT INTO games (game_id, league, season, game_date, status, fetched_at) VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (game_id) DO UPDATE SET
+                       season = coalesce(excluded.season, season),
+                       game_date = coalesce(excluded.game_date, game_date),
+                       status = excluded.status,
+                       fetched_at = excluded.fetched_at""",
+                (game_id, league, season, game_date, status, fetched_at or now()))
+            self.connection.execute("DELETE FROM retries WHERE game_id = ?", (game_id,))
+
+    def get_game(self, game_id):
+        """
+        returns (status, fetched_at) for a game, or None if it isn't in the index.
+        """
+        return self.connection.execute(
+            "SELECT status, fetched_at FROM games WHERE game_id = ?", (game_id,)).fetchone()
+
+    def is_final(self, game_id):
+        game = self.get_game(game_id)
+        return game is not None and game[1] is not None and game[0] in FINAL_STATUSES
+
+    def is_date_settled(self, league, game_date):
+        """
+        a date is settled once it has been checked and every game on it was fetched after it
+        was final. a date with no games is settled if it was checked on a later day.
+        """
+        checked = self.connection.execute(
+            "SELECT checked_at FROM dates WHERE league = ? AND game_date = ?",
+            (league, game_date)).fetchone()
+        if checked is None:
+            return False
+
+        placeholders = ",".join("?" * len(FINAL_STATUSES))
+        total, unsettled = self.connection.execute(
+            f"""SELECT count(*),
+                       coalesce(sum(fetched_at IS NULL OR status IS NULL OR status NOT IN ({placeholders})), 0)
+                FROM games WHERE league = ? AND game_date = ?""",
+            (*FINAL_STATUSES, league, game_date)).fetchone()
+        if total == 0:
+            return checked[0][:10] > game_date
+        return unsettled == 0
+
+    def missing_games(self, league, season=None):
+        """
+        game ids that were discovered but never fetched.
+        """
+        return self._game_ids("fetched_at IS NULL", league, season)
+
+    def unfinished_games(self, league, season=None):
+        """
+        game ids that were fetched before they were final.
+        """
+        placeholders = ",".join("?" * len(FINAL_STATUSES))
+        return self._game_ids(f"fetched_at IS NOT NULL AND (status IS NULL OR status NOT IN ({placeholders}))",
+                              league, season, FINAL_STATUSES)
+
+    def _game_ids(self, condition, league, season, params=()):
+        query = f"SELECT game_id FROM games WHERE {condition} AND league = ?"
+        params = (*params, league)
+        if season is not None:
+            query += " AND season = ?"
+            params = (*params, season)
+        return [row[0] for row in self.connection.execute(query + " ORDER BY game_date, game_id", params)]
+
+    def queue_retry(self, game_id, league, season, error, delay):
+        """
+        puts a game that failed to fetch in the retry queue, or counts another attempt if it's
+        already there. it's due again `delay` seconds from now, doubled for every earlier attempt.
+        returns the number of failed attempts so far.
+        """
+        row = self.connection.execute("SELECT attempts FROM retries WHERE game_id = ?", (game_id,)).fetchone()
+        attempts = (row[0] if row else 0) + 1
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO retries (game_id, league, season, attempts, error, retry_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (game_id, league, season, attempts, error, now(delay * 2 ** (attempts - 1))))
+        return attempts
+
+    def clear_retry(self, game_id):
+        with self.connection:
+            self.connection.execute("DELETE FROM retries WHERE game_id = ?", (game_id,))
+
+    def due_retries(self, league, season, max_attempts):
+        """
+        queued game ids for a season that are due to be tried again, leaving out the ones that
+        already failed `max_attempts` times.
+        """
+        return [row[0] for row in self.connection.execute(
+            """SELECT game_id FROM retries
+               WHERE league = ? AND season IS ? AND attempts < ? AND retry_at <= ?
+               ORDER BY retry_at, game_id""",
+            (league, season, max_attempts, now()))]
+
+    def next_retry_seconds(self, league, season, max_attempts):
+        """
+        seconds until the next queued game for a season is due, or None if there aren't any left to try.
+        """
+        row = self.connection.execute(
+            "SELECT min(retry_at) FROM retries WHERE league = ? AND season IS ? AND attempts < ?",
+            (league, season, max_attempts)).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, (datetime.datetime.fromisoformat(row[0]) - datetime.datetime.now()).total_seconds())
+
+    def abandoned_retries(self, league, max_attempts):
+        """
+        (game id, season, last error) for games that failed `max_attempts` times and aren't tried anymore.
+        """
+        return self.connection.execute(
+            "SELECT game_id, season, error FROM retries WHERE league = ? AND attempts >= ? ORDER BY game_id",
+            (league, max_attempts)).fetchall()
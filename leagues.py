@@ -0,0 +1,66 @@
+"""
+Every league there's a scraper for, by its Yahoo league name.
+
+    scraper = leagues.make_scraper('nfl')
+
+`iter_games` and `iter_frames` stream cached games from any number of leagues and seasons (see
+ScrapeYahoo.iter_games), so an analysis can go through all of the history in constant memory:
+
+    for df in leagues.iter_frames(['nba', 'nfl'], start='2024-01-01', teams={'Boston'}):
+        ...
+"""
+
+from scrape_yahoo_mlb import ScrapeYahooMLB
+from scrape_yahoo_nba import ScrapeYahooNBA
+from scrape_yahoo_nfl import ScrapeYahooNFL
+
+SCRAPERS = {
+    'nba': ScrapeYahooNBA,
+    'mlb': ScrapeYahooMLB,
+    'nfl': ScrapeYahooNFL,
+}
+
+
+def make_scraper(league):
+    try:
+        return SCRAPERS[league]()
+    except KeyError:
+        raise ValueError(f"no scraper for {league!r}, only for {', '.join(sorted(SCRAPERS))}") from None
+
+
+def select_scrapers(leagues=None, scrapers=None):
+    """
+    {league: scraper} for `leagues` (every league by default), using the ones in `scrapers` where given
+    """
+    scrapers = dict(scrapers or {})
+    return {league: scrapers.get(league) or make_scraper(league)
+            for league in (leagues if leagues is not None else scrapers or SCRAPERS)}
+
+
+def league_seasons(scraper, seasons):
+    if seasons is None:
+        return None
+    return [season for season in scraper.SEASONS if season in seasons]
+
+
+def iter_games(leagues=None, seasons=None, start=None, end=None, teams=None, massage=True, scrapers=None):
+    """
+    yields the games of every league in `leagues`, one row dict at a time, with their 'league' and
+    'season'. leagues, seasons, dates and teams are filtered the same way as ScrapeYahoo.iter_games,
+    so files that aren't needed are never opened.
+    """
+    for league, scraper in select_scrapers(leagues, scrapers).items():
+        for row in scraper.iter_games(league_seasons(scraper, seasons), start, end, teams, massage):
+            row['league'] = league
+            yield row
+
+
+def iter_frames(leagues=None, seasons=None, start=None, end=None, teams=None, chunk_size=None, scrapers=None):
+    """
+    the same games as iter_games, as massaged DataFrames of up to `chunk_size` games. a chunk
+    only has games from one league.
+    """
+    for league, scraper in select_scrapers(leagues, scrapers).items():
+        for df in scraper.iter_frames(league_seasons(scraper, seasons), start, end, teams, chunk_size):
+            df['league'] = league
+            yield df
@@ -0,0 +1,129 @@
+"""
+Line movement: how a game's odds and wager/stake percentages change leading up to the start.
+
+The fetchers save one snapshot per game, usually after it's over, so there's no telling how
+the line moved (or whether `pregame_odds` is the opening line). `ScrapeYahoo.poll_lines` polls
+upcoming games over and over, and hands every snapshot to a LineLog, which only writes down
+the fields that changed since the last one. Each game gets an append-only log of JSON lines:
+
+    {"at": "2026-06-10T18:00:00+00:00", "set": {"money_home_odds": -150, ...}}     first snapshot, in full
+    {"at": "2026-06-10T18:10:00+00:00", "set": {"money_home_wager_percentage": "61.20"}}
+    {"at": "2026-06-10T18:20:00+00:00", "set": {"money_home_odds": -155}, "unset": ["spread_home_points"]}
+
+Polls where nothing changed aren't written at all, so a game's log is about the size of one
+snapshot plus a few short lines. A missing field and a None field are the same thing here.
+
+`read_line_history` replays the logs into a DataFrame with one row per change per game.
+"""
+
+import datetime
+import glob
+import json
+import os
+
+import pandas as pd
+
+import scrape_utils
+
+
+class LineLog:
+    """
+    the change log of one game, in `path`
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = None
+
+    def read(self):
+        """
+        yields (time string, the game's fields at that time) for every snapshot that changed something
+        """
+        if not os.path.exists(self.path):
+            return
+        state = {}
+        with open(self.path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                change = json.loads(line)
+                state.update(change.get('set', {}))
+                for field in change.get('unset', ()):
+                    state.pop(field, None)
+                yield change['at'], dict(state)
+
+    def current(self):
+        """
+        the game's fields as of the last snapshot
+        """
+        if self.state is None:
+            self.state = {}
+            for _, state in self.read():
+                self.state = state
+        return self.state
+
+    def append(self, at, row):
+        """
+        writes down the fields of `row` that changed since the last snapshot. `at` is a datetime
+        or an ISO string. returns whether anything changed.
+        """
+        row = {field: value for field, value in row.items() if value is not None}
+        previous = self.current()
+        change = {'set': {field: value for field, value in row.items() if previous.get(field) != value}}
+        unset = [field for field in previous if field not in row]
+        if unset:
+            change['unset'] = unset
+        if not change['set'] and not unset:
+            return False
+
+        at = at.isoformat() if isinstance(at, datetime.datetime) else at
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'at': at, **change}, separators=(',', ':')) + "\n")
+        self.state = row
+        return True
+
+
+class LineLogs:
+    """
+    the LineLogs of every game in a directory, one `<game id>.jsonl` file each
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.logs = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, game_id):
+        if game_id not in self.logs:
+            self.logs[game_id] = LineLog(os.path.join(self.directory, f"{game_id}.jsonl"))
+        return self.logs[game_id]
+
+    def append(self, game_id, at, row):
+        return self.get(game_id).append(at, row)
+
+
+def read_line_history(directory, game_ids=None):
+    """
+    rebuilds the line history of `game_ids` (every game with a log by default) as a DataFrame,
+    with a row for each snapshot that changed something: game_id, `polled_at` (a UTC timestamp) and
+    every field as of that time. if the games have a start_time, `hours_before_start` is added too.
+    """
+    if game_ids is None:
+        paths = sorted(glob.glob(os.path.join(directory, "*.jsonl")))
+    else:
+        paths = [os.path.join(directory, f"{game_id}.jsonl") for game_id in game_ids]
+
+    rows = scrape_utils.RowAccumulator()
+    for path in paths:
+        game_id = os.path.basename(path)[:-len(".jsonl")]
+        for at, state in LineLog(path).read():
+            rows.append({'game_id': game_id, 'polled_at': at, **state})
+
+    df = rows.to_dataframe()
+    if df.empty:
+        return pd.DataFrame(columns=['game_id', 'polled_at'])
+    df['polled_at'] = pd.to_datetime(df['polled_at'], utc=True)
+    if 'start_time' in df.columns:
+        start = pd.to_datetime(df['start_time'], utc=True)
+        df['hours_before_start'] = (start - df['polled_at']).dt.total_seconds() / 3600
+    return df
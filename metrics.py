@@ -0,0 +1,211 @@
+"""
+Counters, latency histograms and per-stage timers, for finding out where a run spends its time.
+
+A scraper records into its `metrics` attribute, which is `DISABLED` unless metrics are turned on.
+DISABLED's methods do nothing and its `stage` hands back one shared, do-nothing context manager,
+so instrumented code only pays for a method call while metrics are off.
+
+    scraper.metrics = metrics.Metrics()
+    scraper.scrape_pages(index)
+    scraper.rebuild_summary_csv(workers=4)
+    scraper.metrics.write("nightly.json")   # a JSON snapshot
+    scraper.metrics.write("nightly.prom")   # Prometheus' text format, for a textfile collector
+
+What the scrapers record:
+
+    requests         counter by endpoint (dates/odds) and status (ok, the HTTP status, or the error)
+    request_seconds  histogram of request latency by endpoint
+    fetched_bytes    counter by endpoint
+    cache            counter of games that were already cached (hit) or had to be fetched (miss)
+    sleep_seconds    counter of time spent waiting between requests and backing off
+    games_fetched, games_failed, games_parsed
+    rule_misses      counter by rule expression, even for scrapers that don't print parse errors
+    group_misses     counter by rule group (see scrape_rules.GROUPS)
+
+and stages (fetch, date_ids, parse, massage, make_dataframe, write_csv, ...) with the number of
+calls, the items they went through, wall and CPU seconds, and items per second. Stages nest, so
+their times overlap. Worker processes keep their own Metrics, which are merged back into the
+parent's, so a stage's CPU seconds add up the time spent in every process.
+"""
+
+import bisect
+import collections
+import json
+import time
+
+# the default Prometheus buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+PREFIX = "scrape_yahoo"
+
+
+class Stage:
+    """
+    times a block of code. set `items` to the number of things it went through.
+    """
+
+    def __init__(self, metrics, name, items=0):
+        self.metrics = metrics
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        stats = self.metrics.stages.setdefault(self.name, dict.fromkeys(
+            ['calls', 'items', 'wall_seconds', 'cpu_seconds'], 0))
+        stats['calls'] += 1
+        stats['items'] += self.items
+        stats['wall_seconds'] += time.perf_counter() - self.wall
+        stats['cpu_seconds'] += time.process_time() - self.cpu
+
+
+class NullStage:
+    items = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+class Metrics:
+    enabled = True
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # keyed by (name, ((label, value), ...))
+        self.counters = collections.Counter()
+        self.histograms = {}
+        self.stages = {}
+
+    def count(self, name, amount=1, **labels):
+        self.counters[(name, label_key(labels))] += amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, label_key(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = {'buckets': buckets, 'counts': [0] * (len(buckets) + 1),
+                                                'sum': 0.0, 'count': 0}
+        histogram['counts'][bisect.bisect_left(histogram['buckets'], value)] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def stage(self, name, items=0):
+        return Stage(self, name, items)
+
+    def merge(self, other):
+        """
+        adds in the metrics recorded by another Metrics, like one from a worker process
+        """
+        if not other.enabled:
+            return
+        self.counters.update(other.counters)
+        for key, theirs in other.histograms.items():
+            ours = self.histograms.get(key)
+            if ours is None:
+                self.histograms[key] = dict(theirs, counts=list(theirs['counts']))
+                continue
+            ours['counts'] = [a + b for a, b in zip(ours['counts'], theirs['counts'])]
+            ours['sum'] += theirs['sum']
+            ours['count'] += theirs['count']
+        for name, theirs in other.stages.items():
+            ours = self.stages.setdefault(name, dict.fromkeys(theirs, 0))
+            for field, value in theirs.items():
+                ours[field] += value
+
+    def snapshot(self):
+        """
+        everything recorded so far, as a dict that can be dumped to JSON
+        """
+        return {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(self.counters.items())],
+            'histograms': [{'name': name, 'labels': dict(labels), 'buckets': list(histogram['buckets']),
+                            'counts': histogram['counts'], 'sum': histogram['sum'], 'count': histogram['count']}
+                           for (name, labels), histogram in sorted(self.histograms.items())],
+            'stages': {name: dict(stats, items_per_second=stats['items'] / stats['wall_seconds']
+                                  if stats['wall_seconds'] else None)
+                       for name, stats in sorted(self.stages.items())},
+        }
+
+    def prometheus(self):
+        """
+        everything recorded so far in Prometheus' text exposition format
+        """
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            for (counter, labels), value in sorted(self.counters.items()):
+                if counter == name:
+                    lines.append(f"{PREFIX}_{name}_total{format_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for (histogram_name, labels), histogram in sorted(self.histograms.items()):
+                if histogram_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip([*histogram['buckets'], '+Inf'], histogram['counts']):
+                    cumulative += count
+                    lines.append(f"{PREFIX}_{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{PREFIX}_{name}_sum{format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{PREFIX}_{name}_count{format_labels(labels)} {histogram['count']}")
+
+        for field in ['calls', 'items', 'wall_seconds', 'cpu_seconds']:
+            lines.append(f"# TYPE {PREFIX}_stage_{field} gauge")
+            for name, stats in sorted(self.stages.items()):
+                lines.append(f"{PREFIX}_stage_{field}{format_labels((('stage', name),))} {stats[field]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        writes a snapshot to `path`: Prometheus' text format if it ends in .prom, otherwise JSON
+        """
+        with open(path, 'w') as f:
+            if path.endswith('.prom'):
+                f.write(self.prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+
+
+class DisabledMetrics(Metrics):
+    enabled = False
+
+    def count(self, name, amount=1, **labels):
+        pass
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        pass
+
+    def stage(self, name, items=0):
+        return NULL_STAGE
+
+    def merge(self, other):
+        pass
+
+
+def label_key(labels):
+    return tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return "{" + ",".join(f'{label}="{value}"' for (label, _), value in zip(labels, escaped)) + "}"
+
+
+NULL_STAGE = NullStage()
+DISABLED = DisabledMetrics()
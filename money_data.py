@@ -32,14 +32,14 @@ def add_money_columns(df):
     df.loc[(df.money_popular == 'AWAY'), 'money_popular_odds'] = df.loc[(df.money_popular == 'AWAY'), 'money_away_odds']
 
     # what is the overround (profit margin for sportsbook)?
-    df['money_overround'] = df.money_away_odds.map(scrape_utils.convert_line) + df.money_home_odds.map(scrape_utils.convert_line)
+    df['money_overround'] = scrape_utils.overround(df.money_away_odds, df.money_home_odds)
 
     # what would be the payout on a $100 bet, if it won?
-    df['money_away_payout'] = df.money_away_odds.map(scrape_utils.payout)
-    df['money_home_payout'] = df.money_home_odds.map(scrape_utils.payout)
+    df['money_away_payout'] = scrape_utils.payout(df.money_away_odds)
+    df['money_home_payout'] = scrape_utils.payout(df.money_home_odds)
 
     # the payout on the popular side
-    df['money_popular_payout'] = df.money_popular_odds.map(scrape_utils.payout)
+    df['money_popular_payout'] = scrape_utils.payout(df.money_popular_odds)
 
     return df
 
@@ -0,0 +1,181 @@
+"""
+Final scores from the `nfl_scores/<season>.csv` tables, joined onto Yahoo NFL games.
+
+The tables are pro-football-reference's season results: one row per game with `Winner/tie`,
+`Loser/tie`, `PtsW` and `PtsL`, and an `@` in the column between the teams when the winner was
+the away team. Teams go by their full names there ("Kansas City Chiefs"), and by Yahoo's
+displayName ("Kansas City", "LA Rams", "NY Jets") in the scraped data, so names are mapped with
+TEAM_NAMES before anything is matched.
+
+`load_scores` turns the tables into one row per game, by home and away team. `attach_scores`
+puts every game's key, (date, home team, away team), in a dict and looks each Yahoo row up in it,
+so the join is one pass over each side:
+
+    df = ScrapeYahooNFL().get_all_data()
+    df, report = nfl_results.attach_scores(df)
+    df.plot.scatter('spread_home_points', 'home_margin')
+
+The report has a row for each game that's only on one side.
+"""
+
+import os
+
+import pandas as pd
+
+SCORES_DIR = "nfl_scores"
+
+# pro-football-reference's team names, as Yahoo displays them
+TEAM_NAMES = {
+    'Arizona Cardinals': 'Arizona',
+    'Atlanta Falcons': 'Atlanta',
+    'Baltimore Ravens': 'Baltimore',
+    'Buffalo Bills': 'Buffalo',
+    'Carolina Panthers': 'Carolina',
+    'Chicago Bears': 'Chicago',
+    'Cincinnati Bengals': 'Cincinnati',
+    'Cleveland Browns': 'Cleveland',
+    'Dallas Cowboys': 'Dallas',
+    'Denver Broncos': 'Denver',
+    'Detroit Lions': 'Detroit',
+    'Green Bay Packers': 'Green Bay',
+    'Houston Texans': 'Houston',
+    'Indianapolis Colts': 'Indianapolis',
+    'Jacksonville Jaguars': 'Jacksonville',
+    'Kansas City Chiefs': 'Kansas City',
+    'Las Vegas Raiders': 'Las Vegas',
+    'Los Angeles Chargers': 'LA Chargers',
+    'Los Angeles Rams': 'LA Rams',
+    'Miami Dolphins': 'Miami',
+    'Minnesota Vikings': 'Minnesota',
+    'New England Patriots': 'New England',
+    'New Orleans Saints': 'New Orleans',
+    'New York Giants': 'NY Giants',
+    'New York Jets': 'NY Jets',
+    'Philadelphia Eagles': 'Philadelphia',
+    'Pittsburgh Steelers': 'Pittsburgh',
+    'San Francisco 49ers': 'San Francisco',
+    'Seattle Seahawks': 'Seattle',
+    'Tampa Bay Buccaneers': 'Tampa Bay',
+    'Tennessee Titans': 'Tennessee',
+    'Washington Commanders': 'Washington',
+    'Washington Football Team': 'Washington',
+}
+
+SCORE_COLUMNS = ['date', 'home_team', 'away_team', 'home_score', 'away_score', 'season']
+REPORT_COLUMNS = ['source', 'date', 'home_team', 'away_team', 'game_id']
+
+
+def yahoo_team_name(name):
+    """
+    the Yahoo displayName for a pro-football-reference team name. names that aren't in
+    TEAM_NAMES are left alone, so they show up in attach_scores' report.
+    """
+    return TEAM_NAMES.get(name, name)
+
+
+def read_season(path, season):
+    """
+    one season's table as SCORE_COLUMNS
+    """
+    table = pd.read_csv(path, dtype=str, keep_default_na=False)
+    # the header above the @ is blank, and so is the one above the boxscore links in some seasons
+    columns = list(table.columns)
+    away_won = table[columns[columns.index('Winner/tie') + 1]] == '@'
+    winner = table['Winner/tie'].map(yahoo_team_name)
+    loser = table['Loser/tie'].map(yahoo_team_name)
+    points_winner = pd.to_numeric(table['PtsW'])
+    points_loser = pd.to_numeric(table['PtsL'])
+    return pd.DataFrame({
+        'date': table['Date'].str[:10],
+        'home_team': loser.where(away_won, winner),
+        'away_team': winner.where(away_won, loser),
+        'home_score': points_loser.where(away_won, points_winner),
+        'away_score': points_winner.where(away_won, points_loser),
+        'season': season,
+    })
+
+
+def load_scores(seasons=None, scores_dir=SCORES_DIR):
+    """
+    the games in the `scores_dir` tables for `seasons` (every table by default), one row per game
+    """
+    if seasons is None:
+        seasons = sorted(name[:-len('.csv')] for name in os.listdir(scores_dir) if name.endswith('.csv'))
+    frames = [read_season(os.path.join(scores_dir, f"{season}.csv"), str(season)) for season in seasons]
+    if not frames:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def game_keys(dates, home_teams, away_teams):
+    return list(zip(dates, home_teams, away_teams))
+
+
+def make_score_index(scores):
+    """
+    {(date, home team, away team): row position in `scores`}
+    """
+    return {key: position for position, key in
+            enumerate(game_keys(scores['date'], scores['home_team'], scores['away_team']))}
+
+
+def attach_scores(df, scores=None, score_index=None):
+    """
+    adds each game's home_score and away_score from `scores` (load_scores() by default) to a
+    frame of Yahoo NFL games, like the one from ScrapeYahooNFL.get_all_data, along with:
+
+        home_margin    home score minus away score
+        total_points   both scores added up
+        spread_error   home_margin plus the home spread, so a positive one means the home team covered
+        total_error    total_points minus the over/under
+
+    games are matched on (date, home team, away team). a game that isn't found is looked up again
+    with the teams the other way around, for neutral site games that the two sources disagree on.
+    games without a match get no scores.
+
+    returns (df with the scores, report), where report has a row for each game that's only in
+    one of them, and which one it's in.
+    """
+    if scores is None:
+        scores = load_scores()
+    if score_index is None:
+        score_index = make_score_index(scores)
+
+    dates = df['game_date'].astype(str).str[:10]
+    score_home, score_away = scores['home_score'].tolist(), scores['away_score'].tolist()
+    home_scores, away_scores = [], []
+    matched, unmatched = set(), []
+    for row, (date, home, away) in enumerate(game_keys(dates, df['home_team'], df['away_team'])):
+        if (position := score_index.get((date, home, away))) is not None:
+            home_scores.append(score_home[position])
+            away_scores.append(score_away[position])
+        elif (position := score_index.get((date, away, home))) is not None:
+            home_scores.append(score_away[position])
+            away_scores.append(score_home[position])
+        else:
+            home_scores.append(None)
+            away_scores.append(None)
+            unmatched.append(row)
+            continue
+        matched.add(position)
+
+    df = df.copy()
+    df['home_score'] = pd.Series(home_scores, index=df.index, dtype=float)
+    df['away_score'] = pd.Series(away_scores, index=df.index, dtype=float)
+    df['home_margin'] = df['home_score'] - df['away_score']
+    df['total_points'] = df['home_score'] + df['away_score']
+    if 'spread_home_points' in df.columns:
+        df['spread_error'] = df['home_margin'] + pd.to_numeric(df['spread_home_points'], errors='coerce')
+    if 'total_over_points' in df.columns:
+        df['total_error'] = df['total_points'] - pd.to_numeric(df['total_over_points'], errors='coerce')
+
+    only_yahoo = df.iloc[unmatched]
+    only_scores = scores.iloc[[position for position in range(len(scores)) if position not in matched]]
+    report = pd.DataFrame({
+        'source': ['yahoo'] * len(only_yahoo) + ['scores'] * len(only_scores),
+        'date': list(dates.iloc[unmatched]) + list(only_scores['date']),
+        'home_team': list(only_yahoo['home_team']) + list(only_scores['home_team']),
+        'away_team': list(only_yahoo['away_team']) + list(only_scores['away_team']),
+        'game_id': list(only_yahoo['game_id']) + [None] * len(only_scores),
+    }, columns=REPORT_COLUMNS)
+    return df, report
@@ -0,0 +1,221 @@
+"""
+Keeps every league current from one process, under one request budget.
+
+Running each league's scraper on its own means one sequential process per league, each with
+its own sleeps, and none of them knowing about the others' requests. The Orchestrator runs an
+AsyncFetcher for every (league, season) instead, and they all share one pooled session, one
+Throttle (and its circuit breaker), one token bucket and one cap on requests in flight, so
+together they stay under the rate Yahoo allows while using all of it.
+
+Work goes through one priority queue, handled by `concurrency` workers:
+
+    discover   fetch one of a season's discovery units (a date, or an NFL week) for its game ids,
+               and queue a `games` job for them
+    games      fetch the games that aren't cached yet, `batch_size` per request
+
+Seasons that `today` falls in come first, then backfills, newest season first. Within a season,
+found games are fetched before more units are discovered. Each season's retry queue is drained
+before the run starts and again at the end, same as fetch_yahoo_data.
+
+    python orchestrator.py --leagues nba mlb nfl --rate 1 --concurrency 8
+
+Seasons that are over and settled in a league's game index cost no requests, so running it
+every day mostly just fetches what's in season.
+"""
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import os
+
+import async_fetch
+import leagues
+import throttle
+
+IN_SEASON = 0
+BACKFILL = 1
+
+# jobs of the same season: fetching games they found comes before discovering more
+GAMES = 0
+DISCOVER = 1
+
+
+class SeasonRun:
+    """
+    one season of one league: its scraper, fetcher, and where its games are kept
+    """
+
+    def __init__(self, scraper, season, fetcher, store, priority):
+        self.scraper = scraper
+        self.season = season
+        self.fetcher = fetcher
+        self.store = store
+        self.priority = priority
+
+    @property
+    def name(self):
+        return f"{self.scraper.LEAGUE} {self.season}"
+
+
+class Orchestrator:
+    """
+    Fetches every season of every scraper in `scrapers` (a {league: scraper} dict, all the
+    leagues in leagues.SCRAPERS by default), or only the seasons in `seasons`.
+
+    `rate` is the starting request rate across every league, `concurrency` caps the requests
+    in flight across every league, and `batch_size` is the number of games per gameOdds request.
+    With `use_index`, each league's GameIndex is used to skip settled dates and final games and
+    to keep failed games for the next run.
+    """
+
+    def __init__(self, scrapers=None, seasons=None, concurrency=8, rate=0.5, batch_size=1, use_index=True,
+                 today=None):
+        if scrapers is None:
+            scrapers = {league: leagues.make_scraper(league) for league in leagues.SCRAPERS}
+        self.scrapers = scrapers
+        self.seasons = seasons
+        self.concurrency = concurrency
+        self.rate = rate
+        self.batch_size = batch_size
+        self.use_index = use_index
+        self.today = today or datetime.datetime.now()
+        self.runs = []
+        self.indexes = {}
+        self.circuit_open = None
+        self.order = itertools.count() # ties between jobs go to the one queued first
+        # every fetcher shares these. the scrapers' pacing settings are class attributes, so any of them will do
+        self.pacer = next(iter(scrapers.values()))
+        self.session = async_fetch.make_session(self.pacer, concurrency)
+
+    def season_priority(self, scraper, season):
+        start, end = scraper.SEASONS[season]
+        if start <= self.today <= end + datetime.timedelta(days=1):
+            return (IN_SEASON, 0)
+        return (BACKFILL, -int(season))
+
+    def make_runs(self):
+        for league, scraper in self.scrapers.items():
+            index = None
+            if self.use_index:
+                os.makedirs(scraper.BASE_DIR, exist_ok=True)
+                index = self.indexes[league] = scraper.get_game_index()
+            for season in scraper.SEASONS:
+                if self.seasons is not None and season not in self.seasons:
+                    continue
+                store = scraper.get_season_store(season)
+                if isinstance(store, str):
+                    os.makedirs(store, exist_ok=True)
+                fetcher = async_fetch.AsyncFetcher(scraper, self.concurrency, self.rate, batch_size=self.batch_size,
+                                                   session=self.session, index=index, season=season)
+                self.runs.append(SeasonRun(scraper, season, fetcher, store, self.season_priority(scraper, season)))
+        self.runs.sort(key=lambda run: run.priority)
+
+    def start_loop_state(self):
+        self.throttle = self.pacer.make_throttle(self.rate)
+        self.bucket = async_fetch.TokenBucket(self.throttle.rate)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        for run in self.runs:
+            run.fetcher.start_loop_state(shared=self)
+
+    def put(self, run, kind, work):
+        self.queue.put_nowait((run.priority, kind, next(self.order), run, work))
+
+    async def do_job(self, run, kind, work):
+        fetcher = run.fetcher
+        if kind == DISCOVER:
+            game_ids = await fetcher.keep_trying(fetcher.get_game_ids, work)
+            fetcher.record_date(work, game_ids)
+            if game_ids:
+                self.put(run, GAMES, game_ids)
+        else:
+            await fetcher.fetch_games(work, run.store)
+
+    async def worker(self):
+        while True:
+            _, kind, _, run, work = await self.queue.get()
+            try:
+                if self.circuit_open is None:
+                    await self.do_job(run, kind, work)
+            except throttle.CircuitOpen as error:
+                # the rest of the queue is let go. whatever failed is in the retry queues for next time
+                if self.circuit_open is None:
+                    print(f"STOPPING: {error}")
+                self.circuit_open = error
+            except Exception as error:
+                print(f"{run.name}: failed on {work}: {error}")
+            finally:
+                self.queue.task_done()
+
+    async def drain_retries(self, wait):
+        try:
+            await asyncio.gather(*(run.fetcher.drain_retries(run.store, wait) for run in self.runs))
+        except throttle.CircuitOpen as error:
+            self.circuit_open = error
+
+    async def fetch_all(self):
+        self.start_loop_state()
+        self.queue = asyncio.PriorityQueue()
+        # games left over from an earlier run
+        await self.drain_retries(wait=False)
+        for run in self.runs:
+            units = run.scraper.discovery_units(run.season, self.today, run.fetcher.index)
+            print(f"{run.name}: {len(units)} to discover" + (" (in season)" if run.priority[0] == IN_SEASON else ""))
+            for unit in units:
+                self.put(run, DISCOVER, unit)
+
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.concurrency)]
+        await self.queue.join()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        if self.circuit_open is None:
+            await self.drain_retries(wait=True)
+        # seasons of a league share the league's index, and with it the retry queue
+        queues = {id(run.fetcher.retries): run for run in self.runs}
+        for run in queues.values():
+            run.scraper.log_abandoned_retries(run.fetcher.retries)
+
+    def summary(self):
+        """
+        {(league, season): {fetched, skipped, failed}}
+        """
+        return {(run.scraper.LEAGUE, run.season): {'fetched': run.fetcher.fetched, 'skipped': run.fetcher.skipped,
+                                                   'failed': len(run.fetcher.failed)}
+                for run in self.runs}
+
+    def run(self):
+        """
+        fetches everything that's missing, and returns the summary
+        """
+        self.make_runs()
+        try:
+            asyncio.run(self.fetch_all())
+        finally:
+            for index in self.indexes.values():
+                index.close()
+        for (league, season), counts in self.summary().items():
+            print(f"{league} {season}: fetched {counts['fetched']}, skipped {counts['skipped']}, "
+                  f"failed {counts['failed']}")
+        print(f"final rate {self.throttle.rate:.2f}/s, slept {self.bucket.slept:.1f}s")
+        return self.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--leagues', nargs='+', choices=sorted(leagues.SCRAPERS), default=sorted(leagues.SCRAPERS))
+    parser.add_argument('--seasons', nargs='+', help="only these seasons, like 2025")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=0.5, help="starting requests per second, across every league")
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--no-index', action='store_true', help="don't use or update the game indexes")
+    args = parser.parse_args(argv)
+
+    scrapers = {league: leagues.make_scraper(league) for league in args.leagues}
+    return Orchestrator(scrapers, args.seasons, args.concurrency, args.rate, args.batch_size,
+                        not args.no_index).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Compiles the JSONPath expressions in `scrape_rules.RULES` into a single extractor.
+
+Running each rule through `jsonpath_ng` walks the whole document once per rule, and
+the `gameLineSixPack[?...]` filters get re-evaluated for every field that hangs off
+of them. The rules all share a handful of prefixes, so instead they are split into
+steps and merged into a prefix tree. Walking the tree once visits `data.games[0]`
+and each filtered six-pack entry a single time, then reads all the leaf fields
+from there.
+
+Rules can also be grouped by a shared parent path, like the `OVER_UNDER`, `MONEY_LINE` and
+`SPREAD` six-pack entries in `scrape_rules.GROUPS`. When a group's parent isn't in a game at all
+(most older MLB games have no six-pack data), the whole group is reported as one missing group
+and counted in `group_misses`, instead of as a missing rule for every field under it. The same
+goes for every group under a path that's missing further up, like the whole six-pack.
+
+Only the subset of JSONPath used in `scrape_rules.py` is supported: `$`, `.field`,
+`[index]` and `[?field = "value" & ...]` filters.
+"""
+
+import re
+from collections import Counter
+
+_STEP = re.compile(r'\.(\w+)|\[(\d+)\]|\[\?([^\]]+)\]')
+_CONDITION = re.compile(r'\s*(\w+)\s*=\s*"([^"]*)"\s*$')
+
+FIELD = 'field'
+INDEX = 'index'
+FILTER = 'filter'
+
+
+def parse_path(expression):
+    """
+    splits a rule expression into a tuple of (kind, argument) steps.
+
+    >>> parse_path('$.data.games[0].gameId')
+    (('field', 'data'), ('field', 'games'), ('index', 0), ('field', 'gameId'))
+    >>> parse_path('$.six[?type = "SPREAD" & period = "FULL_GAME"]')
+    (('field', 'six'), ('filter', (('type', 'SPREAD'), ('period', 'FULL_GAME'))))
+    """
+    if not expression.startswith('$'):
+        raise ValueError(f"rule must start at the root ($): {expression!r}")
+
+    steps = []
+    pos = 1
+    while pos < len(expression):
+        match = _STEP.match(expression, pos)
+        if not match:
+            raise ValueError(f"unsupported JSONPath syntax in {expression!r} at position {pos}")
+        field, index, conditions = match.groups()
+        if field is not None:
+            steps.append((FIELD, field))
+        elif index is not None:
+            steps.append((INDEX, int(index)))
+        else:
+            parsed_conditions = []
+            for condition in conditions.split('&'):
+                condition_match = _CONDITION.match(condition)
+                if not condition_match:
+                    raise ValueError(f"unsupported filter condition {condition!r} in {expression!r}")
+                parsed_conditions.append(condition_match.groups())
+            steps.append((FILTER, tuple(parsed_conditions)))
+        pos = match.end()
+
+    return tuple(steps)
+
+
+def apply_step(step, value):
+    """
+    returns the list of values that `step` matches in `value`, following the
+    same rules as jsonpath_ng (missing keys and out of range indices match nothing).
+    """
+    kind, arg = step
+    if kind == FIELD:
+        if isinstance(value, dict) and arg in value:
+            return [value[arg]]
+        return []
+    if kind == INDEX:
+        if isinstance(value, list) and arg < len(value):
+            return [value[arg]]
+        return []
+
+    # filter: keep the list items (or dict values) where every condition holds
+    if isinstance(value, dict):
+        candidates = value.values()
+    elif isinstance(value, list):
+        candidates = value
+    else:
+        return []
+    return [item for item in candidates
+            if isinstance(item, dict) and all(k in item and item[k] == v for (k, v) in arg)]
+
+
+class _Node:
+    __slots__ = ('children', 'rules', 'group', 'groups_below')
+
+    def __init__(self):
+        self.children = {}
+        self.rules = []
+        self.group = None
+        self.groups_below = [] # this node's group and every group under it, in definition order
+
+
+class CompiledRules:
+    """
+    A prefix tree built from a dict of {column name: JSONPath expression}.
+
+    `extract()` returns the same row dict as evaluating each expression with
+    jsonpath_ng and taking the first match, plus the names of the rules that
+    matched nothing.
+
+    `groups` is an optional {group name: parent JSONPath expression}. see `extract_grouped()`.
+    """
+
+    def __init__(self, rules, groups=None):
+        self.expressions = dict(rules)
+        self.root = _Node()
+        paths = {name: parse_path(expression) for name, expression in self.expressions.items()}
+        for name, steps in paths.items():
+            node = self.root
+            for step in steps:
+                node = node.children.setdefault(step, _Node())
+            node.rules.append(name)
+
+        self.groups = dict(groups or {})
+        self.group_rules = {}
+        self.group_misses = Counter()
+        for group, expression in self.groups.items():
+            steps = parse_path(expression)
+            node = self.root
+            for step in steps:
+                node = node.children.setdefault(step, _Node())
+            node.group = group
+            self.group_rules[group] = [name for name, path in paths.items() if path[:len(steps)] == steps]
+            node = self.root
+            node.groups_below.append(group)
+            for step in steps:
+                node = node.children[step]
+                node.groups_below.append(group)
+
+    def __len__(self):
+        return len(self.expressions)
+
+    def extract(self, json_data):
+        """
+        walks `json_data` once and returns (row, missing), where row has the rule
+        names as keys in the order they were defined.
+        """
+        row, _, _ = self.extract_grouped(json_data)
+        return row, [name for name in self.expressions if name not in row]
+
+    def extract_grouped(self, json_data):
+        """
+        like `extract()`, but returns (row, missing groups, missing rules). the rules of a
+        group whose parent wasn't found, or whose parent's parent wasn't, and so on, aren't
+        looked at, and aren't in missing rules.
+        """
+        found = {}
+        missing_groups = []
+        self._walk(self.root, [json_data], found, missing_groups)
+        self.group_misses.update(missing_groups)
+
+        skipped = set()
+        for group in missing_groups:
+            skipped.update(self.group_rules[group])
+
+        row = {}
+        missing = []
+        for name in self.expressions:
+            if name in found:
+                row[name] = found[name]
+            elif name not in skipped:
+                missing.append(name)
+        return row, missing_groups, missing
+
+    def _walk(self, node, values, found, missing_groups):
+        # a rule takes the first match, same as `[...find(json_data)][0]`
+        for name in node.rules:
+            found[name] = values[0]
+
+        for step, child in node.children.items():
+            matches = []
+            for value in values:
+                matches.extend(apply_step(step, value))
+            if matches:
+                self._walk(child, matches, found, missing_groups)
+            else:
+                missing_groups.extend(child.groups_below)
@@ -12,6 +12,14 @@ SPREAD = THE_GAME + '.gameLineSixPack[?type = "SPREAD" & period = "FULL_GAME" &
 SPREAD_ONE_INFO = SPREAD + '.options[0]'
 SPREAD_TWO_INFO = SPREAD + '.options[1]'
 
+# the parent of each group of rules. when a game doesn't have one of these at all,
+# none of the rules under it are evaluated.
+GROUPS = {
+    'OVER_UNDER': OVER_UNDER,
+    'MONEY_LINE': MONEY_LINE,
+    'SPREAD': SPREAD,
+}
+
 RULES = {
     'game_id': THE_GAME + '.gameId',
     'game_date': THE_GAME + '.startDate',
@@ -23,7 +31,8 @@ RULES = {
     'home_team_id': THE_GAME + '.homeTeam.teamId',
 
     # this contains both spread and total info.
-    # I believe this is the opening line, but haven't verified that
+    # I believe this is the opening line, but haven't verified that.
+    # ScrapeYahoo.poll_lines keeps a history of it (see line_history.py) that can settle it
     'pregame_odds': THE_GAME + '.gameOddsSummary.pregameOddsDisplay',
 
     # totals. over/under data
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def numericize(df):
@@ -18,21 +19,80 @@ def numericize(df):
 
     return df
 
+class RowAccumulator:
+    """
+    Collects row dicts into per-column lists, so a DataFrame can be built once at the end
+    instead of concatenating thousands of one-row DataFrames.
+
+    Columns are kept in the order they are first seen. A field that is missing from
+    some rows is filled with NaN, same as pd.concat would do.
+
+    >>> rows = RowAccumulator()
+    >>> rows.append({'a': 1, 'b': 'x'})
+    >>> rows.append({'a': 2, 'c': True})
+    >>> rows.to_dataframe()
+       a    b     c
+    0  1    x   NaN
+    1  2  NaN  True
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, row):
+        columns = self.columns
+        for k, v in row.items():
+            column = columns.get(k)
+            if column is None:
+                column = columns[k] = [np.nan] * self.length
+            column.append(v)
+        self.length += 1
+
+        if len(row) < len(columns):
+            for column in columns.values():
+                if len(column) < self.length:
+                    column.append(np.nan)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.columns, index=pd.RangeIndex(self.length))
+
+def _like(values, result):
+    """
+    returns `result` in the same form as `values`: a float for a scalar, a Series with the
+    same index for a Series, and an array otherwise.
+    """
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    if np.ndim(values) == 0:
+        return float(result)
+    return result
+
 def convert_line(line):
     """
-    convert American style money line to the implied probability
+    convert American style money line to the implied probability. works on a single line,
+    or a whole array/Series of them at once.
 
     -400 implies you will win 4 out of 5 bets
     >>> convert_line(-400)
     0.8
     >>> convert_line(+300)
     0.25
+    >>> convert_line(np.array([-400, 300]))
+    array([0.8 , 0.25])
     """
-    if line < 0:
-        return abs(line)/(abs(line)+100)
-    else:
-        return 100/(100+line)
-    
+    lines = np.asarray(line, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(lines < 0, np.abs(lines)/(np.abs(lines)+100), 100/(100+lines))
+    return _like(line, result)
+
 def payout(line):
     """
     calculates amount of profit from taking an American style money line (risking $100)
@@ -45,4 +105,40 @@ def payout(line):
     >>> payout(300)
     300.0
     """
-    return (100/convert_line(line)) - 100
+    return _like(line, (100/np.asarray(convert_line(line), dtype=float)) - 100)
+
+def convert_prob_to_line(proba):
+    """
+    the inverse of convert_line: the American style money line for a win probability.
+
+    >>> round(convert_prob_to_line(0.8))
+    -400
+    >>> convert_prob_to_line(pd.Series([0.25, 0.5]))
+    0    300.0
+    1    100.0
+    dtype: float64
+    """
+    probas = np.asarray(proba, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(probas > .5, -100 * (probas/(1-probas)), 100 * ((1-probas) / probas))
+    return _like(proba, result)
+
+def overround(line_a, line_b):
+    """
+    the total implied probability of both sides of a bet. anything over 1 is the sportsbook's margin.
+
+    >>> round(overround(-110, -110), 4)
+    1.0476
+    """
+    return convert_line(line_a) + convert_line(line_b)
+
+def vig_free_probs(line_a, line_b):
+    """
+    the implied probabilities of both sides of a bet with the sportsbook's margin taken out,
+    so they add up to 1.
+
+    >>> vig_free_probs(-110, -110)
+    (0.5, 0.5)
+    """
+    total = overround(line_a, line_b)
+    return convert_line(line_a) / total, convert_line(line_b) / total
@@ -9,13 +9,16 @@ The rules for extracting each field are found in the `scrape_rules.py` file.
 
 """
 
+import collections
 import datetime
 import glob
 import json
 import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
 
 import cloudscraper
@@ -23,9 +26,40 @@ import cloudscraper
 # I didn't encounter any errors or rate limiting when scraping the data at a very slow rate, though,
 # so this may be an unneeded dependency.
 
-from jsonpath_ng.ext import parse
-
+import async_fetch
+import game_archive
+import game_decoder
+import game_index
+import line_history
+import metrics
+import rule_compiler
 import scrape_rules
+import scrape_utils
+import summary_store
+import throttle
+
+# each worker process in a parsing pool keeps its own scraper and compiled rules,
+# so the rules are only compiled once per process instead of once per chunk.
+_worker_scraper = None
+_worker_rules = None
+
+def _init_parse_worker(scraper):
+    global _worker_scraper, _worker_rules
+    _worker_scraper = scraper
+    _worker_rules = scraper.preparse_rules()
+
+def _day(value):
+    # a YYYY-MM-DD string out of a date, datetime or string, for comparing against game dates
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d")
+
+def _parse_chunk(json_filenames, massage):
+    # the group miss counts and metrics go back with the rows, since the worker's aren't shared
+    _worker_rules.group_misses.clear()
+    _worker_scraper.metrics.clear()
+    rows = _worker_scraper.parse_files(json_filenames, _worker_rules, massage)
+    return rows, _worker_rules.group_misses.copy(), _worker_scraper.metrics
 
 class ScrapeYahoo:
     """
@@ -50,8 +84,53 @@ class ScrapeYahoo:
     BASE_DIR = "nba_scrapes"
     LEAGUE = "nba"
 
+    # typed summary output for every league, partitioned by league and season
+    PARQUET_DIR = "odds_parquet"
+
+    # number of files handed to a worker process at a time when parsing in parallel
+    PARSE_CHUNK_SIZE = 100
+
+    # number of games in each DataFrame yielded by iter_frames
+    STREAM_CHUNK_SIZE = 1000
+
+    # decode cached games with game_decoder (only the fields the rules read) when msgspec is installed
+    FAST_DECODE = True
+
+    # number of days asked for in each leagueGameIdsByDate request by discover_game_ids
+    DISCOVERY_WINDOW_DAYS = 7
+    # a response with this many game ids may have been cut off, so the window gets split
+    DISCOVERY_MAX_IDS = 100
+
+    # where requests go. these can be pointed at a local stand-in (see yahoo_stand_in.py)
+    YAHOO_BASE_URL = "https://sports.yahoo.com"
+    GRAPHITE_BASE_URL = "https://graphite.sports.yahoo.com"
+
+    # the sequential fetchers start out with POLITE_DELAY seconds between requests, and back off
+    # FAILURE_DELAY seconds (doubling) after a failed one. see throttle.py
+    POLITE_DELAY = 2
+    FAILURE_DELAY = 10
+    # the request rate goes up while responses are fast and clean, but stays between these (requests/second)
+    MIN_RATE = 0.05
+    MAX_RATE = 2
+    # failures in a row before the circuit breaker opens, and its first cooldown in seconds
+    BREAKER_THRESHOLD = 5
+    BREAKER_COOLDOWN = 60
+    # games that fail are queued and tried again this many times in all, FAILURE_DELAY seconds
+    # after the first failure and twice as long after each one after that
+    MAX_ATTEMPTS = 5
+
+    # poll_lines checks games starting in the next POLL_HOURS hours every POLL_INTERVAL seconds,
+    # POLL_BATCH_SIZE games per gameOdds request
+    POLL_HOURS = 6
+    POLL_INTERVAL = 600
+    POLL_BATCH_SIZE = 20
+
     def __init__(self):
         self.cache_dir = 'nba_scrapes/2024'
+        self.slept = 0.0
+        self.throttle = None
+        # set to a metrics.Metrics() to record where runs spend their time
+        self.metrics = metrics.DISABLED
 
     def get_scraper(self):
         """
@@ -71,19 +150,109 @@ class ScrapeYahoo:
         return cloudscraper.create_scraper()
 
     def make_yahoo_json_url(self, game_id):
-        return f"https://sports.yahoo.com/site/api/resource/sports.graphite.gameOdds;dataType=graphite;endpoint=graphite;gameIds={game_id}"
+        """
+        game_id can be a single id, or a list of ids to fetch in one request.
+        """
+        if not isinstance(game_id, str):
+            game_id = ",".join(game_id)
+        return f"{self.YAHOO_BASE_URL}/site/api/resource/sports.graphite.gameOdds;dataType=graphite;endpoint=graphite;gameIds={game_id}"
+
+    def split_games_response(self, json_data):
+        """
+        splits a gameOdds response for several games into one document per game,
+        shaped like the response for a single game. returns a dict of {game_id: document}.
+        """
+        games = {}
+        for game in json_data['data']['games']:
+            document = dict(json_data)
+            document['data'] = dict(json_data['data'], games=[game])
+            games[game['gameId']] = document
+        return games
+
+    def pause(self, seconds):
+        """
+        sleeps between requests, keeping a running total in `slept`
+        """
+        self.slept += seconds
+        self.metrics.count('sleep_seconds', seconds)
+        time.sleep(seconds)
+
+    def make_throttle(self, rate=None):
+        """
+        a Throttle starting at `rate` requests per second, or one request every POLITE_DELAY seconds
+        """
+        if rate is None:
+            rate = 1 / self.POLITE_DELAY if self.POLITE_DELAY else self.MAX_RATE
+        breaker = throttle.CircuitBreaker(self.BREAKER_THRESHOLD, self.BREAKER_COOLDOWN)
+        return throttle.Throttle(rate, self.MIN_RATE, max(rate, self.MAX_RATE), backoff=self.FAILURE_DELAY,
+                                 breaker=breaker)
+
+    def get_throttle(self):
+        """
+        the Throttle shared by the sequential fetchers, so the rate it settles on carries over between seasons
+        """
+        if self.throttle is None:
+            self.throttle = self.make_throttle()
+        return self.throttle
+
+    def get_text(self, url, parse=None, endpoint='dates'):
+        """
+        fetches url once the throttle allows it, and returns the text, or `parse(text)`.
+        429s, 5xx, connection errors and text `parse` chokes on count against the throttle and are raised.
+        other 4xx are only raised.
+        """
+        pacer = self.get_throttle()
+        while (wait := pacer.wait_seconds()) > 0:
+            self.pause(wait)
+        started = pacer.started()
+        try:
+            response = self.get_scraper().get(url)
+            self.metrics.count('fetched_bytes', len(response.content), endpoint=endpoint)
+            text = throttle.check_response(response)
+            result = parse(text) if parse else text
+        except Exception as error:
+            pacer.failure(error)
+            self.record_request(endpoint, pacer.clock() - started, error)
+            raise
+        pacer.success(pacer.clock() - started)
+        self.record_request(endpoint, pacer.clock() - started)
+        return result
+
+    def record_request(self, endpoint, seconds, error=None):
+        status = 'ok' if error is None else getattr(error, 'status', None) or type(error).__name__
+        self.metrics.count('requests', endpoint=endpoint, status=status)
+        self.metrics.observe('request_seconds', seconds, endpoint=endpoint)
 
     def get_some_json(self, url):
-        some_html = self.get_scraper().get(url).text
-        parsed = json.loads(some_html)
-        return parsed
+        return self.get_text(url, json.loads, endpoint='odds')
+
+    def keep_trying(self, fetch, *args):
+        """
+        calls fetch(*args) until it works, for requests a fetch can't go on without (like the
+        games on a date). the throttle backs off more after every failed request, and the circuit
+        breaker raises CircuitOpen if it doesn't get anywhere. errors that come after a request
+        went fine (a page the game ids can't be read from, say) don't slow anything down, so
+        after MAX_ATTEMPTS tries the last error is raised either way.
+        """
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                return fetch(*args)
+            except throttle.CircuitOpen:
+                raise
+            except Exception as error:
+                if attempt == self.MAX_ATTEMPTS:
+                    raise
+                print(f"failed on {args[0]}, trying again: {error}")
 
-    def make_date_url(self, yyyy_mm_dd):
+    def make_date_url(self, yyyy_mm_dd, end_yyyy_mm_dd=None):
         """
-        This is the URL for the Yahoo page that shows all NBA scores for a particular date.
+        This is the URL for the Yahoo page that shows all NBA scores for a particular date,
+        or for every date from `yyyy_mm_dd` to `end_yyyy_mm_dd`.
         """
         #return f"https://sports.yahoo.com/nba/scoreboard/?date={yyyy_mm_dd}"
-        return f"https://graphite.sports.yahoo.com/v1/query/shangrila/leagueGameIdsByDate?startRange={yyyy_mm_dd}&endRange={yyyy_mm_dd}&leagues={self.LEAGUE}"
+        if end_yyyy_mm_dd is None:
+            end_yyyy_mm_dd = yyyy_mm_dd
+        return f"{self.GRAPHITE_BASE_URL}/v1/query/shangrila/leagueGameIdsByDate?startRange={yyyy_mm_dd}&endRange={end_yyyy_mm_dd}&leagues={self.LEAGUE}"
 
 
     def get_yahoo_ids_for_date(self, nice_date):
@@ -91,82 +260,501 @@ class ScrapeYahoo:
         fetches date_url and extracts all game ids out of the HTML. expects
         YYYY-MM-DD format for date.
         """
-        date_url = self.make_date_url(nice_date)
-        date_html = self.get_scraper().get(date_url).text
-        game_ids = set(re.findall(r"nba\.g\.202[\d]+", date_html))
+        with self.metrics.stage('date_ids') as stage:
+            date_url = self.make_date_url(nice_date)
+            game_ids = self.extract_game_ids(self.get_text(date_url))
+            stage.items = len(game_ids)
         return game_ids
 
-    def fetch_yahoo_data(self, fetch_dir="nba_scrapes/2024", start=START_DATE, end=END_DATE):
+    def extract_game_ids(self, date_html):
         """
-        fetches all data from `start` to `end` and saves them as JSON in the `dir` directory.
+        returns the set of game ids found in the response from a date_url.
+        """
+        return set(re.findall(r"nba\.g\.202[\d]+", date_html))
+
+    def discovery_units(self, season, today=None, index=None):
+        """
+        what it takes to find every game in a season: one YYYY-MM-DD date per request, up to
+        `today` and leaving out dates the index has settled. see make_discovery_url.
+        """
+        start, end = self.SEASONS[season]
+        if today is not None:
+            end = min(end, today)
+        if start > end:
+            return []
+        return self.unsettled_dates(start, end, index, season)
+
+    def make_discovery_url(self, unit):
+        return self.make_date_url(unit)
+
+    def discovered_game_ids(self, unit, text):
+        return self.extract_game_ids(text)
+
+    def record_discovery(self, index, season, unit, game_ids):
+        index.record_date(self.LEAGUE, season, unit, game_ids)
+
+    def game_id_date(self, game_id):
+        """
+        returns the YYYY-MM-DD date a game is scheduled on, which NBA game ids start with,
+        or None if it can't be decoded.
+        """
+        match = re.fullmatch(r"nba\.g\.(\d{4})(\d{2})(\d{2})\d+", game_id)
+        if not match:
+            return None
+        return "-".join(match.groups())
+
+    def make_discovery_windows(self, start, end, window_days=DISCOVERY_WINDOW_DAYS):
+        """
+        splits the dates from `start` to `end` into (first, last) YYYY-MM-DD windows of
+        up to `window_days` days.
+        """
+        dates = pd.date_range(start, end).strftime("%Y-%m-%d")
+        return [(dates[i], dates[min(i + window_days, len(dates)) - 1])
+                for i in range(0, len(dates), window_days)]
+
+    def split_discovery_window(self, start, end):
+        dates = pd.date_range(start, end).strftime("%Y-%m-%d")
+        middle = len(dates) // 2
+        return [(dates[0], dates[middle - 1]), (dates[middle], dates[-1])]
+
+    def assign_game_dates(self, date_html, start, end):
+        """
+        maps the game ids in the response for the window from `start` to `end` to their dates.
+
+        returns None if the window needs to be split into smaller ones: when the response looks
+        truncated (it isn't valid JSON, or has DISCOVERY_MAX_IDS or more games), or when some game
+        ids can't be decoded to a date inside the window. A one-day window is never split.
+        """
+        game_ids = self.extract_game_ids(date_html)
+        if start == end:
+            return {start: game_ids} if game_ids else {}
+
+        try:
+            json.loads(date_html)
+        except ValueError:
+            return None
+        if len(game_ids) >= self.DISCOVERY_MAX_IDS:
+            return None
+
+        game_map = {}
+        for game_id in game_ids:
+            game_date = self.game_id_date(game_id)
+            if game_date is None or not (start <= game_date <= end):
+                return None
+            game_map.setdefault(game_date, set()).add(game_id)
+        return game_map
+
+    def discover_game_ids(self, start=START_DATE, end=END_DATE, window_days=DISCOVERY_WINDOW_DAYS):
+        """
+        finds the games for every date from `start` to `end` with one request per `window_days`
+        days, instead of one request per day. Windows are split in half whenever the response
+        can't be fully trusted (see assign_game_dates).
+
+        returns a dict of {YYYY-MM-DD: set of game ids}, only for dates that have games.
+        """
+        game_map = {}
+        windows = self.make_discovery_windows(start, end, window_days)
+        while windows:
+            window_start, window_end = windows.pop(0)
+            date_html = self.keep_trying(self.get_text, self.make_date_url(window_start, window_end))
+
+            assigned = self.assign_game_dates(date_html, window_start, window_end)
+            if assigned is None:
+                windows[0:0] = self.split_discovery_window(window_start, window_end)
+            else:
+                game_map.update(assigned)
+        return game_map
+
+    def discover_seasons(self, window_days=DISCOVERY_WINDOW_DAYS):
+        """
+        runs discover_game_ids over every season in SEASONS, and returns one {date: game ids} map.
+        """
+        game_map = {}
+        for (season_start, season_end) in self.SEASONS.values():
+            game_map.update(self.discover_game_ids(season_start, season_end, window_days))
+        return game_map
+
+    def get_game_index(self):
+        """
+        returns the index of games seen by this league's scraper, stored in BASE_DIR.
+        """
+        return game_index.GameIndex(f"{self.BASE_DIR}/game_index.sqlite")
+
+    def game_status(self, json_data):
+        return json_data['data']['games'][0].get('status')
+
+    def game_needs_fetch(self, yahoo_game_id, fetch_dir, index=None):
+        """
+        games that are cached are skipped, unless the index says they weren't final
+        when they were fetched.
+
+        `fetch_dir` can be a directory, or a GameArchive.
+        """
+        game = index.get_game(yahoo_game_id) if index is not None else None
+        if game is not None and game[1] is not None:
+            needed = game[0] not in game_index.FINAL_STATUSES
+        elif isinstance(fetch_dir, game_archive.GameArchive):
+            needed = yahoo_game_id not in fetch_dir
+        else:
+            needed = not os.path.exists(f"{fetch_dir}/{yahoo_game_id}.json")
+        self.metrics.count('cache', result='miss' if needed else 'hit')
+        return needed
+
+    def save_game_json(self, game_json, yahoo_game_id, fetch_dir, index=None, season=None):
+        if isinstance(fetch_dir, game_archive.GameArchive):
+            fetch_dir.write(yahoo_game_id, game_json)
+        else:
+            with open(f"{fetch_dir}/{yahoo_game_id}.json", "w") as f:
+                json.dump(game_json, f)
+        self.metrics.count('games_fetched')
+        if index is not None:
+            index.record_fetch(yahoo_game_id, self.LEAGUE, self.game_status(game_json), season)
+
+    def unsettled_dates(self, start, end, index=None, season=None):
+        """
+        dates from `start` to `end` that need to be checked for games. without an index,
+        that's all of them.
         """
         date_range = pd.date_range(start, end).strftime("%Y-%m-%d")
+        if index is None:
+            return list(date_range)
+        return [date for date in date_range if not index.is_date_settled(self.LEAGUE, date)]
 
-        # for each date, get the game ids for that day
-        for date in date_range:
-            print(f"STARTING {date}")
-            yahoo_ids = self.get_yahoo_ids_for_date(date)
-            time.sleep(2) # be polite
-            
-            # for each game id, fetch and save the game data if we don't already have it
-            for yahoo_game_id in yahoo_ids:
-                cache_path = f"{fetch_dir}/{yahoo_game_id}.json"
-                if not os.path.exists(cache_path):
-                    game_url = self.make_yahoo_json_url(yahoo_game_id)
-                    #print(f"fetching url {game_url}")
+    def index_cached_games(self, index, season, fetch_dir=None):
+        """
+        adds the games already cached for `season` to the index, for caches made before there was one.
+        """
+        fetch_dir = fetch_dir or f"{self.BASE_DIR}/{season}"
+        for filename in self.get_cached_filenames(fetch_dir):
+            with open(filename, 'r') as f:
+                game = json.load(f)['data']['games'][0]
+            fetched_at = datetime.datetime.fromtimestamp(os.path.getmtime(filename)).isoformat(timespec='seconds')
+            index.record_fetch(game['gameId'], self.LEAGUE, game.get('status'), season,
+                               game['startDate'][:10], fetched_at)
+
+    def fetch_game(self, yahoo_game_id, fetch_dir, retries, index=None, season=None):
+        """
+        fetches and saves one game. if that fails, the game goes in the `retries` queue (a GameIndex).
+        returns whether it was saved.
+        """
+        game_url = self.make_yahoo_json_url(yahoo_game_id)
+        try:
+            game_json = self.get_some_json(game_url)
+            self.save_game_json(game_json, yahoo_game_id, fetch_dir, index, season)
+        except throttle.CircuitOpen:
+            raise
+        except Exception as error:
+            print(f"failed on {game_url}: {error}")
+            self.metrics.count('games_failed')
+            retries.queue_retry(yahoo_game_id, self.LEAGUE, season, str(error), self.FAILURE_DELAY)
+            return False
+        retries.clear_retry(yahoo_game_id)
+        return True
+
+    def drain_retries(self, fetch_dir, retries, index=None, season=None, wait=True):
+        """
+        fetches the games in the retry queue for `season` as they come due. with `wait`, it sleeps
+        until the next one is due and keeps going until every game was either saved or failed
+        MAX_ATTEMPTS times; without it, only the games that are due now are tried.
+        returns the number of games saved.
+        """
+        saved = 0
+        while True:
+            due = retries.due_retries(self.LEAGUE, season, self.MAX_ATTEMPTS)
+            if not due:
+                wait_seconds = retries.next_retry_seconds(self.LEAGUE, season, self.MAX_ATTEMPTS)
+                if not wait or wait_seconds is None:
+                    break
+                self.pause(wait_seconds)
+                continue
+            for yahoo_game_id in due:
+                saved += self.fetch_game(yahoo_game_id, fetch_dir, retries, index, season)
+        return saved
+
+    def log_abandoned_retries(self, retries):
+        for (yahoo_game_id, season, error) in retries.abandoned_retries(self.LEAGUE, self.MAX_ATTEMPTS):
+            print(f"GAVE UP on {yahoo_game_id} ({season}) after {self.MAX_ATTEMPTS} attempts: {error}")
+
+    def fetch_yahoo_data(self, fetch_dir="nba_scrapes/2024", start=START_DATE, end=END_DATE, window_days=None,
+                         index=None, season=None):
+        """
+        fetches all data from `start` to `end` and saves them as JSON in the `dir` directory.
+
+        if `window_days` is set, the game ids are found up front with discover_game_ids,
+        instead of with one request per date.
+
+        if a GameIndex is passed as `index`, dates where every game was already fetched as final
+        are skipped without any requests, and games that weren't final yet are fetched again.
+
+        requests are paced by get_throttle(). games that fail go in a retry queue that's drained
+        at the end; with an index the queue is kept in it, so games that still haven't worked
+        are picked up again by the next run for the same season.
+        """
+        with self.metrics.stage('fetch') as stage:
+            retries = index if index is not None else game_index.GameIndex(":memory:")
+            # games left over from an earlier run
+            stage.items += self.drain_retries(fetch_dir, retries, index, season, wait=False)
+
+            date_range = self.unsettled_dates(start, end, index, season)
+            if window_days and date_range:
+                game_map = self.discover_game_ids(date_range[0], date_range[-1], window_days)
+
+            # for each date, get the game ids for that day
+            for date in date_range:
+                print(f"STARTING {date}")
+                if window_days:
+                    yahoo_ids = game_map.get(date, set())
+                else:
                     try:
-                        game_json = self.get_some_json(game_url)
-
-                        with open(cache_path, "w") as f:
-                            json.dump(game_json, f)
-                    except:
-                        # this condition happened 3 times in the course of scraping all 
-                        # 4 seasons. I didn't investigate why, and rerunning those days
-                        # was successful.
-                        print(f"failed on {game_url}")
-                        # I'm not sure if it's hitting rate limits or what, but might as well
-                        # take a little break.
-                        time.sleep(10)
-                    time.sleep(2) # be polite
-
-            print(f"DONE WITH {date}")
+                        yahoo_ids = self.keep_trying(self.get_yahoo_ids_for_date, date)
+                    except throttle.CircuitOpen:
+                        raise
+                    except Exception as error:
+                        # not recorded in the index, so the next run tries it again
+                        print(f"GAVE UP on {date}: {error}")
+                        continue
+                if index is not None:
+                    index.record_date(self.LEAGUE, season, date, yahoo_ids)
+            
+                # for each game id, fetch and save the game data if we don't already have it
+                for yahoo_game_id in yahoo_ids:
+                    if self.game_needs_fetch(yahoo_game_id, fetch_dir, index):
+                        stage.items += self.fetch_game(yahoo_game_id, fetch_dir, retries, index, season)
+
+                print(f"DONE WITH {date}")
+
+            stage.items += self.drain_retries(fetch_dir, retries, index, season)
+            self.log_abandoned_retries(retries)
+
+    def fetch_yahoo_data_async(self, fetch_dir="nba_scrapes/2024", start=START_DATE, end=END_DATE,
+                               concurrency=4, rate=0.5, batch_size=1, window_days=None,
+                               index=None, season=None):
+        """
+        same as fetch_yahoo_data, but with up to `concurrency` requests in flight over one
+        pooled session, starting at `rate` requests per second overall instead of fixed sleeps.
+        `batch_size` games are asked for in each gameOdds request.
+        `index` and `season` work the same as in fetch_yahoo_data.
+
+        returns the AsyncFetcher, which has counts of fetched/skipped games and the failed game ids.
+        """
+        fetcher = async_fetch.AsyncFetcher(self, concurrency=concurrency, rate=rate, batch_size=batch_size,
+                                           index=index, season=season)
+        return fetcher.run(fetch_dir, start, end, window_days)
+
+    def game_start_time(self, json_data):
+        """
+        when a game starts, as an aware datetime, or None if the document doesn't say
+        """
+        start_time = json_data['data']['games'][0].get('startTime')
+        return datetime.datetime.fromisoformat(start_time) if start_time else None
+
+    def extract_lines(self, json_data, parsed_rules):
+        """
+        the fields of a game that hasn't started, for poll_lines. unlike parse_yahoo_data, it
+        doesn't skip games without results or print the fields that are missing, since
+        upcoming games never have them.
+        """
+        row, _ = parsed_rules.extract(json_data)
+        try:
+            row = self.massage_yahoo_data(dict(row))
+        except Exception:
+            pass # the team ids didn't match up, so the lines stay as one/two
+        row['start_time'] = json_data['data']['games'][0].get('startTime')
+        return row
+
+    def get_upcoming_game_ids(self, now, horizon):
+        # yahoo dates games in US time, so start a day early to catch games that are already tomorrow in UTC
+        first_date = (now - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+        return self.extract_game_ids(self.get_text(self.make_date_url(first_date, horizon.strftime("%Y-%m-%d"))))
+
+    def poll_lines_once(self, logs, parsed_rules, start_times, now, hours=None, batch_size=None):
+        """
+        one round of poll_lines: finds the games starting between `now` and `hours` (POLL_HOURS by
+        default) from now and adds a snapshot of each to its log in `logs` (a line_history.LineLogs).
+        `start_times` keeps the start of every game seen so far, so games that start later aren't
+        fetched every round. returns the number of games whose lines changed.
+        """
+        hours = self.POLL_HOURS if hours is None else hours
+        batch_size = self.POLL_BATCH_SIZE if batch_size is None else batch_size
+        horizon = now + datetime.timedelta(hours=hours)
+        try:
+            game_ids = self.keep_trying(self.get_upcoming_game_ids, now, horizon)
+        except throttle.CircuitOpen:
+            raise
+        except Exception as error:
+            print(f"GAVE UP on this round: {error}")
+            return 0
+        to_fetch = []
+        for game_id in sorted(game_ids):
+            start_time = start_times.get(game_id)
+            # games that haven't been seen yet are fetched to find out when they start
+            if game_id not in start_times or start_time is None or now <= start_time <= horizon:
+                to_fetch.append(game_id)
+
+        changed = 0
+        for i in range(0, len(to_fetch), batch_size):
+            game_url = self.make_yahoo_json_url(to_fetch[i:i + batch_size])
+            try:
+                games = self.split_games_response(self.get_text(game_url, json.loads, 'odds'))
+            except throttle.CircuitOpen:
+                raise
+            except Exception as error:
+                print(f"failed on {game_url}: {error}")
+                continue
+
+            for game_id, json_data in games.items():
+                start_times[game_id] = start_time = self.game_start_time(json_data)
+                if start_time is not None and not (now <= start_time <= horizon):
+                    continue
+                if logs.append(game_id, now, self.extract_lines(json_data, parsed_rules)):
+                    changed += 1
+        self.metrics.count('lines_changed', changed)
+        return changed
+
+    def poll_lines(self, lines_dir=None, hours=None, interval=None, rounds=None, batch_size=None, clock=None):
+        """
+        keeps a log of the line movement of every game starting in the next `hours` hours, by
+        fetching them every `interval` seconds (see line_history.py). runs `rounds` times, or
+        until it's stopped. `hours`, `interval` and `batch_size` default to POLL_HOURS,
+        POLL_INTERVAL and POLL_BATCH_SIZE, `lines_dir` defaults to BASE_DIR/lines, and `clock`
+        returns the current UTC time.
+
+        read the logs back with line_history.read_line_history.
+        """
+        logs = line_history.LineLogs(lines_dir or f"{self.BASE_DIR}/lines")
+        parsed_rules = self.preparse_rules()
+        clock = clock or (lambda: datetime.datetime.now(datetime.timezone.utc))
+        interval = self.POLL_INTERVAL if interval is None else interval
+        start_times = {}
+        done = 0
+        while True:
+            now = clock()
+            changed = self.poll_lines_once(logs, parsed_rules, start_times, now, hours, batch_size)
+            print(f"{now:%Y-%m-%d %H:%M}: lines changed in {changed} games")
+            done += 1
+            if rounds is not None and done >= rounds:
+                return logs
+            self.pause(interval)
 
     def preparse_rules(self):
         """
-        turning the JSONPath expression into a function is costly, so it is
-        important to cache it.
+        compiles scrape_rules.RULES into a single extractor. compiling is costly
+        compared to extracting, so it is important to cache it.
         """
-        parsed = {}
-        for k, v in scrape_rules.RULES.items():
-            jsonpath_expression = parse(v)
-            parsed[k] = jsonpath_expression
-        return parsed
+        return rule_compiler.CompiledRules(scrape_rules.RULES, scrape_rules.GROUPS)
 
     def parse_yahoo_data(self, json_data, filename='', parsed_rules=None):
         """
         takes json data from a single game and parses it.
         """
-        row = {}
         if not parsed_rules:
             parsed_rules = self.preparse_rules()
 
-        for k, jsonpath_expression in parsed_rules.items():
-            try:
-                results = [item.value for item in jsonpath_expression.find(json_data)][0]
-                row[k] = results
-            except:
-                self.log_parse_error(filename, jsonpath_expression)
+        row, missing_groups, missing = parsed_rules.extract_grouped(json_data)
+        self.metrics.count('games_parsed')
+        for group in missing_groups:
+            self.metrics.count('group_misses', group=group)
+            self.log_missing_group(filename, group)
+        for k in missing:
+            self.metrics.count('rule_misses', rule=parsed_rules.expressions[k])
+            self.log_parse_error(filename, parsed_rules.expressions[k])
         return row
     
     def log_parse_error(self, filename, jsonpath_expression):
         print(f"file: {filename} failed on {jsonpath_expression}")
 
+    def log_missing_group(self, filename, group):
+        print(f"file: {filename} has no {group} data")
+
+    def log_group_misses(self, group_misses):
+        """
+        prints how many games were missing each group of rules (see scrape_rules.GROUPS)
+        """
+        if group_misses:
+            print("MISSING: " + ", ".join(f"{group} in {count} games" for group, count in group_misses.items()))
+
     def get_cached_filenames(self, cache_dir):
         """
         returns all filenames in a particular cache dir.
         """
         return list(glob.glob(f"{cache_dir}/*.json"))
 
+    def get_archive_path(self, season):
+        return f"{self.BASE_DIR}/{season}.pack"
+
+    def get_season_store(self, season):
+        """
+        where the raw games for a season are kept: the season's GameArchive if it has one,
+        otherwise the season's directory of JSON files.
+        """
+        archive_path = self.get_archive_path(season)
+        if os.path.exists(archive_path):
+            return game_archive.GameArchive(archive_path)
+        return f"{self.BASE_DIR}/{season}"
+
+    def get_cached_games(self, season):
+        """
+        returns a list of sources for every game cached for a season, for parse_files. these
+        are filenames, or (archive path, game id) pairs if the season has been packed.
+        """
+        archive_path = self.get_archive_path(season)
+        if os.path.exists(archive_path):
+            archive = game_archive.open_archive(archive_path)
+            archive.load_index()
+            return [(archive_path, game_id) for game_id in archive.game_ids()]
+        return self.get_cached_filenames(f"{self.BASE_DIR}/{season}")
+
+    def source_game_id(self, source):
+        if isinstance(source, tuple):
+            return source[1]
+        return os.path.basename(source)[:-len('.json')]
+
+    def source_fingerprint(self, source):
+        """
+        something that changes whenever the cached data for a game changes, without reading it:
+        mtime and size for files, and the record position for archived games.
+        """
+        if isinstance(source, tuple):
+            archive_path, game_id = source
+            return list(game_archive.open_archive(archive_path).offsets[game_id])
+        stat = os.stat(source)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def load_game_json(self, source, decoder=None):
+        """
+        loads a game from a file or (archive path, game id). with a game_decoder.GameDecoder,
+        only the parts of the game that the rules read are decoded.
+        """
+        if decoder is None:
+            if isinstance(source, tuple):
+                archive_path, game_id = source
+                return game_archive.open_archive(archive_path).read(game_id)
+            with open(source, 'r') as f:
+                return json.load(f)
+
+        if isinstance(source, tuple):
+            archive_path, game_id = source
+            return decoder.decode(game_archive.open_archive(archive_path).read_bytes(game_id))
+        with open(source, 'rb') as f:
+            return decoder.decode(f.read())
+
+    def get_game_decoder(self):
+        """
+        the decoder parse_files uses, or None to decode whole games with json.load
+        """
+        return game_decoder.get_decoder() if self.FAST_DECODE else None
+
+    def pack_seasons(self, check=True):
+        """
+        one-time migration of each season's directory of JSON files into a GameArchive.
+        the directories are left alone.
+        """
+        for season in self.SEASONS.keys():
+            season_dir = f"{self.BASE_DIR}/{season}"
+            if os.path.isdir(season_dir):
+                added = game_archive.migrate_directory(season_dir, self.get_archive_path(season), check)
+                print(f"packed {added} games from {season_dir}")
+
     def massage_yahoo_data(self, data, drop=True):
         """
         sometimes the first team in the 'money' bet section is the home team, sometimes it's the away team.
@@ -176,6 +764,10 @@ class ScrapeYahoo:
 
         drop controls whether the `*_one_*` and `*_two_*` keys should be deleted.
         """
+        with self.metrics.stage('massage', 1):
+            return self._massage_yahoo_data(data, drop)
+
+    def _massage_yahoo_data(self, data, drop):
         for bet_type in ["money", "spread"]:
             if f"{bet_type}_one_team_id" in data:
                 if data[f"{bet_type}_one_team_id"] == data['home_team_id']:
@@ -195,68 +787,382 @@ class ScrapeYahoo:
 
         return data
 
-    def make_dataframe(self, json_filenames):
+    def massage_yahoo_frame(self, df, drop=True):
         """
-        For each file in json_filenames, it parses the raw JSON data and applies scrape_rules, then returns
-        a pandas dataframe.
+        frame-level version of massage_yahoo_data, for the unmassaged rows of a whole season at once.
+
+        For each bet type, a boolean mask of whether the `one` team is the home team picks the
+        `*_home_*` and `*_away_*` values for every game in one go. Games where the `one` team id
+        matches neither team are left without home/away values (and keep their `*_one_*`/`*_two_*`
+        values), instead of stopping everything.
+
+        returns (massaged df, report), where report has a row for each mismatched game.
         """
-        dataframes = []
-        parsed_data = None
-        parsed_rules = self.preparse_rules()
+        with self.metrics.stage('massage_frame', len(df)):
+            return self._massage_yahoo_frame(df, drop)
 
-        for filename in json_filenames:
-            with open(filename, 'r') as f:
-                json_data = json.load(f)
-            parsed_data = self.parse_yahoo_data(json_data, filename, parsed_rules)
-            if parsed_data: # skip if bad/no data from this file
-                massaged = self.massage_yahoo_data(parsed_data)
-                dataframes.append(pd.DataFrame({k:[v] for k,v in massaged.items()}))
+    def _massage_yahoo_frame(self, df, drop):
+        columns = {c: df[c] for c in df.columns}
+        massaged = {}
+        problems = []
 
-        return pd.concat(dataframes)
+        for bet_type in ["money", "spread"]:
+            one_team_id = columns.get(f"{bet_type}_one_team_id")
+            if one_team_id is None:
+                continue
+
+            one_is_home = (one_team_id == df['home_team_id']).fillna(False).astype(bool)
+            one_is_away = (one_team_id == df['away_team_id']).fillna(False).astype(bool) & ~one_is_home
+            matched = one_is_home | one_is_away
+
+            mismatched = one_team_id.notna() & ~matched
+            if mismatched.any():
+                problems.append(pd.DataFrame({
+                    'game_id': df.loc[mismatched, 'game_id'],
+                    'bet_type': bet_type,
+                    'team_id': one_team_id[mismatched],
+                    'home_team_id': df.loc[mismatched, 'home_team_id'],
+                    'away_team_id': df.loc[mismatched, 'away_team_id'],
+                }))
+
+            suffixes = []
+            for cardinal in ["one", "two"]:
+                prefix = f"{bet_type}_{cardinal}_"
+                suffixes += [c[len(prefix):] for c in df.columns if c.startswith(prefix) and c[len(prefix):] not in suffixes]
+
+            missing = pd.Series(np.nan, index=df.index, dtype=object)
+            for side, when_one in [("home", one_is_home), ("away", one_is_away)]:
+                for suffix in suffixes:
+                    one = columns.get(f"{bet_type}_one_{suffix}", missing)
+                    two = columns.get(f"{bet_type}_two_{suffix}", missing)
+                    massaged[f"{bet_type}_{side}_{suffix}"] = one.where(when_one, two).where(matched)
+
+            for cardinal in ["one", "two"]:
+                for suffix in suffixes:
+                    column = f"{bet_type}_{cardinal}_{suffix}"
+                    if column not in columns:
+                        continue
+                    if drop:
+                        leftover = columns[column].where(~matched)
+                        if leftover.isna().all():
+                            del columns[column]
+                        else:
+                            columns[column] = leftover
+
+        columns.update(massaged)
+        report = pd.concat(problems, ignore_index=True) if problems else pd.DataFrame(
+            columns=['game_id', 'bet_type', 'team_id', 'home_team_id', 'away_team_id'])
+        return pd.DataFrame(columns, index=df.index), report
+
+    def make_season_dataframe(self, rows):
+        """
+        builds a dataframe from unmassaged rows and massages it with massage_yahoo_frame.
+        games that can't be massaged are printed.
+        """
+        df, report = self.massage_yahoo_frame(self.rows_to_dataframe(rows))
+        for problem in report.itertuples():
+            print(f"MASSAGE ERROR: {problem.game_id} {problem.bet_type} team {problem.team_id} "
+                  f"is neither {problem.home_team_id} nor {problem.away_team_id}")
+        return df
+
+    def parse_files(self, json_filenames, parsed_rules=None, massage=True):
+        """
+        parses and massages each file in json_filenames, and returns a list of row dicts.
+        files with bad/no data are skipped. archived games can be passed as (archive path, game id).
+
+        with massage=False, rows are returned as parsed, for massage_yahoo_frame.
+        """
+        rows = []
+        if not parsed_rules:
+            parsed_rules = self.preparse_rules()
+        decoder = self.get_game_decoder()
+
+        with self.metrics.stage('parse', len(json_filenames)):
+            for filename in json_filenames:
+                json_data = self.load_game_json(filename, decoder)
+                parsed_data = self.parse_yahoo_data(json_data, filename, parsed_rules)
+                if parsed_data: # skip if bad/no data from this file
+                    rows.append(self.massage_yahoo_data(parsed_data) if massage else parsed_data)
+        return rows
+
+    def make_parse_pool(self, workers):
+        """
+        returns a process pool where every worker has its own copy of this scraper
+        and the compiled rules.
+        """
+        return ProcessPoolExecutor(max_workers=workers,
+                                   initializer=_init_parse_worker,
+                                   initargs=(self,))
+
+    def parse_file_groups(self, filename_groups, workers=None, massage=True):
+        """
+        parses each list of filenames in filename_groups, and yields a list of rows per group,
+        in the same order. `massage` is passed on to parse_files.
+
+        If `workers` is set, files from all the groups are split into chunks of PARSE_CHUNK_SIZE
+        and spread across a pool of that many processes, so a small season doesn't leave
+        cores idle while a big one is still being parsed.
+        """
+        if not workers:
+            parsed_rules = self.preparse_rules()
+            for filenames in filename_groups:
+                parsed_rules.group_misses.clear()
+                rows = self.parse_files(filenames, parsed_rules, massage)
+                self.log_group_misses(parsed_rules.group_misses)
+                yield rows
+            return
+
+        with self.make_parse_pool(workers) as pool:
+            size = self.PARSE_CHUNK_SIZE
+            futures = [[pool.submit(_parse_chunk, filenames[i:i + size], massage)
+                        for i in range(0, len(filenames), size)]
+                       for filenames in filename_groups]
+            for group_futures in futures:
+                rows = []
+                group_misses = collections.Counter()
+                for future in group_futures:
+                    chunk_rows, chunk_misses, chunk_metrics = future.result()
+                    rows.extend(chunk_rows)
+                    group_misses.update(chunk_misses)
+                    self.metrics.merge(chunk_metrics)
+                self.log_group_misses(group_misses)
+                yield rows
+
+    def rows_to_dataframe(self, rows):
+        """
+        builds a single dataframe out of row dicts. rows don't need to have the same keys.
+        """
+        accumulator = scrape_utils.RowAccumulator()
+        accumulator.extend(rows)
+        return accumulator.to_dataframe()
+
+    def make_dataframe(self, json_filenames, workers=None):
+        """
+        For each file in json_filenames, it parses the raw JSON data and applies scrape_rules, then returns
+        a pandas dataframe. `workers` sets the number of processes to parse with.
+        """
+        with self.metrics.stage('make_dataframe', len(json_filenames)):
+            [rows] = self.parse_file_groups([json_filenames], workers, massage=False)
+            return self.make_season_dataframe(rows)
+
+    def read_summary_csv(self, path):
+        df = pd.read_csv(path)
+        # CSVs written before the index was dropped have it as an extra column
+        if 'Unnamed: 0' in df.columns:
+            df = df.drop(columns='Unnamed: 0')
+        return df
 
     def load_summary_csv(self):
         dataframes = []
         for year in self.SEASONS.keys():
-            df = pd.read_csv(f"{self.BASE_DIR}/csv/{year}_odds.csv")
+            df = self.read_summary_csv(f"{self.BASE_DIR}/csv/{year}_odds.csv")
             dataframes.append(df.set_index('game_id'))
-        joined = pd.concat(dataframes)
-        joined.drop('Unnamed: 0', axis=1, inplace=True)
-        return joined
+        return pd.concat(dataframes)
 
-    def scrape_pages(self):
+    def scrape_pages(self, index=None):
         for (season_name, season_range) in self.SEASONS.items():
-            base_dir = f"{self.BASE_DIR}/{season_name}"
-            self.fetch_yahoo_data(base_dir, season_range[0], season_range[1])      
+            store = self.get_season_store(season_name)
+            self.fetch_yahoo_data(store, season_range[0], season_range[1], index=index, season=season_name)
 
 
-    def rebuild_summary_csv(self):
+    def parse_seasons(self, workers=None):
+        """
+        yields (year, rows) for every season in SEASONS, in order.
+        """
+        years = list(self.SEASONS.keys())
+        filename_groups = [self.get_cached_games(year) for year in years]
+        return zip(years, self.parse_file_groups(filename_groups, workers, massage=False))
+
+    def rebuild_summary_csv(self, workers=None):
         """
         Re-generate data year by year, and save each year as a CSV file.
+
+        `workers` sets the number of processes to parse with; all seasons share one pool.
         """
         all_seasons = []
-        for year in self.SEASONS.keys():
+        _start = time.time()
+        for year, rows in self.parse_seasons(workers):
             print(f"doing {year}")
+
+            df = self.make_season_dataframe(rows)
+            with self.metrics.stage('write_csv', len(df)):
+                df.to_csv(f"{self.BASE_DIR}/csv/{year}_odds.csv", index=False)
+
+            print(f"took {time.time() - _start}")
             _start = time.time()
 
-            year_dir = f"{self.BASE_DIR}/{year}"
+            all_seasons.append(df)
 
-            filenames = self.get_cached_filenames(year_dir)
-            df = self.make_dataframe(filenames)
-            df.to_csv(f"{self.BASE_DIR}/csv/{year}_odds.csv")
+        all_seasons_df = pd.concat(all_seasons, ignore_index=True)
+        with self.metrics.stage('write_csv', len(all_seasons_df)):
+            all_seasons_df.to_csv(f"{self.BASE_DIR}/csv/all_odds.csv", index=False)
 
-            print(f"took {time.time() - _start}")# in practice, about 2 seconds per game
+    def rebuild_summary_parquet(self, workers=None):
+        """
+        Re-generate data year by year, and save each year as a typed Parquet partition under PARQUET_DIR.
+        """
+        for year, rows in self.parse_seasons(workers):
+            df = self.make_season_dataframe(rows)
+            with self.metrics.stage('write_parquet', len(df)):
+                path = summary_store.write_season(df, self.PARQUET_DIR, self.LEAGUE, year)
+            print(f"wrote {len(df)} games to {path}")
 
-            all_seasons.append(df)
+    def load_summary_parquet(self, seasons=None, columns=None):
+        """
+        loads the Parquet summary for this league, optionally only for some seasons and columns.
+        unlike load_summary_csv, the columns already have the right types.
+        """
+        df = summary_store.read_summary(self.PARQUET_DIR, leagues=[self.LEAGUE], seasons=seasons, columns=columns)
+        if 'game_id' in df.columns:
+            df = df.set_index('game_id')
+        return df
+
+    def get_summary_paths(self, year, output):
+        """
+        returns (summary path, manifest path) for a season's summary in `output` format.
+        """
+        if output == 'csv':
+            return f"{self.BASE_DIR}/csv/{year}_odds.csv", f"{self.BASE_DIR}/csv/{year}_manifest.json"
+        path = summary_store.partition_path(self.PARQUET_DIR, self.LEAGUE, year)
+        return path, os.path.join(os.path.dirname(path), "_manifest.json") # pyarrow skips files starting with _
+
+    def update_summary(self, output='csv', workers=None):
+        """
+        Incremental version of rebuild_summary_csv/rebuild_summary_parquet (`output` is 'csv' or 'parquet').
+
+        Each season's summary has a manifest of {game_id: fingerprint} for the games that went into it.
+        Only games that are new or whose fingerprint changed are parsed, and their rows replace any old
+        rows with the same game_id. Games that are no longer cached are dropped.
+        """
+        years = list(self.SEASONS.keys())
+        plans = []
+        for year in years:
+            summary_path, manifest_path = self.get_summary_paths(year, output)
+            manifest = {}
+            if os.path.exists(summary_path) and os.path.exists(manifest_path):
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
 
-        all_seasons_df = pd.concat(all_seasons)
-        all_seasons_df.to_csv(f"{self.BASE_DIR}/csv/all_odds.csv")
+            sources = {self.source_game_id(source): source for source in self.get_cached_games(year)}
+            fingerprints = {game_id: self.source_fingerprint(source) for game_id, source in sources.items()}
+            changed = [game_id for game_id, fingerprint in fingerprints.items() if manifest.get(game_id) != fingerprint]
+            stale = set(changed) | (set(manifest) - set(fingerprints))
+            plans.append((year, summary_path, manifest_path, fingerprints, stale,
+                          [sources[game_id] for game_id in changed]))
 
-    def get_all_data(self):
+        parsed = self.parse_file_groups([plan[-1] for plan in plans], workers, massage=False)
+        for (year, summary_path, manifest_path, fingerprints, stale, changed), rows in zip(plans, parsed):
+            if not stale and os.path.exists(summary_path):
+                print(f"{year}: up to date")
+                continue
+
+            new_rows = self.make_season_dataframe(rows)
+            if not len(new_rows) and not os.path.exists(summary_path):
+                print(f"{year}: no games")
+                continue
+            if len(new_rows):
+                # a game's rows are keyed by its gameId, which can differ from the cache name
+                stale |= set(new_rows['game_id'])
+            if os.path.exists(summary_path):
+                old = self.read_summary_csv(summary_path) if output == 'csv' else pd.read_parquet(summary_path)
+                kept = old[~old['game_id'].isin(stale)]
+                df = pd.concat([kept.astype(object), new_rows.astype(object)], ignore_index=True)
+            else:
+                df = new_rows
+
+            if output == 'csv':
+                os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+                df.to_csv(summary_path, index=False)
+            else:
+                summary_store.write_season(df, self.PARQUET_DIR, self.LEAGUE, year)
+            with open(manifest_path, 'w') as f:
+                json.dump(fingerprints, f)
+            print(f"{year}: parsed {len(changed)} games, {len(df)} total")
+
+        if output == 'csv':
+            summary_paths = [self.get_summary_paths(year, output)[0] for year in years]
+            all_seasons = [self.read_summary_csv(path) for path in summary_paths if os.path.exists(path)]
+            pd.concat(all_seasons, ignore_index=True).to_csv(f"{self.BASE_DIR}/csv/all_odds.csv", index=False)
+
+    def get_all_data(self, workers=None):
         dataframes = []
-        for year in self.SEASONS.keys():
-            filenames = self.get_cached_filenames(f"{self.BASE_DIR}/{year}")
-            df = self.make_dataframe(filenames)
+        for year, rows in self.parse_seasons(workers):
+            df = self.make_season_dataframe(rows)
             df['season'] = year
             dataframes.append(df)
 
-        return pd.concat(dataframes)
\ No newline at end of file
+        return pd.concat(dataframes, ignore_index=True)
+
+    def select_sources(self, season, start=None, end=None):
+        """
+        the cached games of a season (see get_cached_games) that are from `start` to `end`, going by
+        the dates in their game ids, so games outside the range are never opened. games whose id
+        doesn't have a date are kept, and checked once they're parsed.
+        """
+        start, end = _day(start), _day(end)
+        sources = self.get_cached_games(season)
+        if start is None and end is None:
+            return sources
+        selected = []
+        for source in sources:
+            game_date = self.game_id_date(self.source_game_id(source))
+            if game_date is None or ((start is None or game_date >= start) and (end is None or game_date <= end)):
+                selected.append(source)
+        return selected
+
+    def row_matches(self, row, start=None, end=None, teams=None):
+        """
+        whether a parsed row is from `start` to `end` (YYYY-MM-DD strings) and has one of `teams` playing
+        """
+        game_date = (row.get('game_date') or '')[:10]
+        if start is not None and game_date < start:
+            return False
+        if end is not None and game_date > end:
+            return False
+        return teams is None or row.get('home_team') in teams or row.get('away_team') in teams
+
+    def iter_games(self, seasons=None, start=None, end=None, teams=None, massage=True):
+        """
+        yields parsed games one at a time as row dicts, with their 'season', without holding on to
+        any of them. only the cached games of `seasons` (every season in SEASONS by default) from
+        `start` to `end` are opened, and games where neither team is in `teams` (display names, like
+        'Boston') are dropped before they're massaged.
+
+        with massage=False, rows are yielded as parsed. a row that can't be massaged is printed and
+        yielded with its one/two values, same as massage_yahoo_frame leaves it.
+        """
+        start, end = _day(start), _day(end)
+        teams = set(teams) if teams is not None else None
+        parsed_rules = self.preparse_rules()
+        decoder = self.get_game_decoder()
+
+        for season in (self.SEASONS if seasons is None else seasons):
+            parsed_rules.group_misses.clear()
+            for source in self.select_sources(season, start, end):
+                row = self.parse_yahoo_data(self.load_game_json(source, decoder), source, parsed_rules)
+                if not row or not self.row_matches(row, start, end, teams):
+                    continue
+                if massage:
+                    try:
+                        row = self.massage_yahoo_data(dict(row))
+                    except Exception:
+                        print(f"MASSAGE ERROR: {row.get('game_id')} teams don't match up")
+                row['season'] = season
+                yield row
+            self.log_group_misses(parsed_rules.group_misses)
+
+    def iter_frames(self, seasons=None, start=None, end=None, teams=None, chunk_size=None):
+        """
+        the same games as iter_games, as massaged DataFrames of up to `chunk_size` games
+        (STREAM_CHUNK_SIZE by default), so memory use depends on the chunk size instead of the
+        number of seasons. chunks only have the columns their games have.
+        """
+        chunk_size = chunk_size or self.STREAM_CHUNK_SIZE
+        rows = []
+        for row in self.iter_games(seasons, start, end, teams, massage=False):
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield self.make_season_dataframe(rows)
+                rows = []
+        if rows:
+            yield self.make_season_dataframe(rows)
@@ -13,21 +13,27 @@ class ScrapeYahooMLB(ScrapeYahoo):
         '2026': (datetime.datetime(2026, 3, 25), datetime.datetime(2026, 6, 12)), 
     }
 
-    def get_yahoo_ids_for_date(self, nice_date):
-        """
-        fetches date_url and extracts all game ids out of the HTML. expects
-        YYYY-MM-DD format for date.
-        """
-        date_url = self.make_date_url(nice_date)
-        date_html = self.get_scraper().get(date_url).text
-        game_ids = set(re.findall(r"mlb\.g\.4[\d]+", date_html))
-        return game_ids
+    def extract_game_ids(self, date_html):
+        return set(re.findall(r"mlb\.g\.4[\d]+", date_html))
+
+    def game_id_date(self, game_id):
+        # MLB game ids are 4, the last digit of the year, then MMDD
+        match = re.fullmatch(r"mlb\.g\.4(\d)(\d{2})(\d{2})\d+", game_id)
+        if not match:
+            return None
+        year, month, day = match.groups()
+        return f"202{year}-{month}-{day}"
     
     def log_parse_error(self, filename, jsonpath_expression):
         # suppress logging any parsing errors.. they are a lot due to lack of data
         # for most MLB games before a certain point.
         ...
 
+    def log_missing_group(self, filename, group):
+        # same here, most older games have no betting lines at all. they are
+        # still counted per group and reported once per season by log_group_misses
+        ...
+
 if __name__ == '__main__':
     # hacky manual fetching
     # START_CHUNK =  datetime.datetime(2026, 3, 25)
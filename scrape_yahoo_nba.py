@@ -41,13 +41,7 @@ class ScrapeYahooNBA(ScrapeYahoo):
 
         it returns None for postponed/non-completed games, and games with unrecognized teams (all star games)
         """
-        row = {}
-        for k, jsonpath_expression in parsed_rules.items():
-            try:
-                results = [item.value for item in jsonpath_expression.find(json_data)][0]
-                row[k] = results
-            except:
-                print(f"file: {filename} failed on {jsonpath_expression}")
+        row = super().parse_yahoo_data(json_data, filename, parsed_rules)
 
         # need to filter out all-star games and other nonsense
         if row['home_team'] not in self.TEAMS:
@@ -1,19 +1,26 @@
 from scrape_yahoo import *
 
+import nfl_results
+
 class ScrapeYahooNFL(ScrapeYahoo):
+    # kickoff through the super bowl
     SEASONS = {
-        '2021': None,
-        '2022': None,
-        '2023': None,
-        '2024': None,
-        '2025': None
+        '2021': (datetime.datetime(2021, 9, 9), datetime.datetime(2022, 2, 13)),
+        '2022': (datetime.datetime(2022, 9, 8), datetime.datetime(2023, 2, 12)),
+        '2023': (datetime.datetime(2023, 9, 7), datetime.datetime(2024, 2, 11)),
+        '2024': (datetime.datetime(2024, 9, 5), datetime.datetime(2025, 2, 9)),
+        '2025': (datetime.datetime(2025, 9, 4), datetime.datetime(2026, 2, 8)),
     }
 
     BASE_DIR = "nfl_scrapes"
+    LEAGUE = "nfl"
+
+    # regular season weeks. each has its own scoreboard page
+    WEEKS = 18
 
 
-    def make_date_url(week, year):
-        return f"https://sports.yahoo.com/nfl/scoreboard/?confId=&dateRange={week}&schedState=2&scoreboardSeason={year}"
+    def make_date_url(self, week, year):
+        return f"{self.YAHOO_BASE_URL}/nfl/scoreboard/?confId=&dateRange={week}&schedState=2&scoreboardSeason={year}"
 
     def get_yahoo_ids_for_date(self, week, year):
         """
@@ -22,12 +29,77 @@ class ScrapeYahooNFL(ScrapeYahoo):
         fetches date_url and extracts all game ids out of the HTML. takes week and year as args
         """
         date_url = self.make_date_url(week, year)
-        date_html = self.scraper.get(date_url).text
-        game_ids1 = set(re.findall(f"nfl\.g\.{year}[\d]+", date_html))
-        ## some games take place in the next calendar year
-        game_ids2 = set(re.findall(f"nfl\.g\.{year + 1}[\d]+", date_html))
+        return self.discovered_game_ids((week, year), self.get_text(date_url))
+
+    def extract_game_ids(self, date_html):
+        return set(re.findall(r"nfl\.g\.20[\d]+", date_html))
+
+    def discovered_game_ids(self, unit, text):
+        # only games from this season. some of them take place in the next calendar year
+        _, year = unit
+        return {game_id for game_id in self.extract_game_ids(text)
+                if game_id.startswith((f"nfl.g.{year}", f"nfl.g.{year + 1}"))}
+
+    def game_id_date(self, game_id):
+        match = re.fullmatch(r"nfl\.g\.(\d{4})(\d{2})(\d{2})\d+", game_id)
+        if not match:
+            return None
+        return "-".join(match.groups())
+
+    def week_dates(self, season, week):
+        """
+        the YYYY-MM-DD dates of a week of the season. weeks start on the day of the season's kickoff
+        """
+        start, _ = self.SEASONS[season]
+        first = start + datetime.timedelta(weeks=week - 1)
+        return [(first + datetime.timedelta(days=day)).strftime("%Y-%m-%d") for day in range(7)]
+
+    def discovery_units(self, season, today=None, index=None):
+        """
+        the (week, year) of every week in a season, up to the week `today` is in and leaving out
+        weeks where the index has settled every date
+        """
+        units = []
+        for week in range(1, self.WEEKS + 1):
+            dates = self.week_dates(season, week)
+            if today is not None and dates[0] > today.strftime("%Y-%m-%d"):
+                break
+            if index is None or not all(index.is_date_settled(self.LEAGUE, date) for date in dates):
+                units.append((week, int(season)))
+        return units
 
-        return game_ids1.union(game_ids2)
+    def get_upcoming_game_ids(self, now, horizon):
+        """
+        NFL VERSION
+
+        there's no page for a range of dates, so this fetches the scoreboard of every week from a day
+        before `now` thru `horizon`, and keeps the games dated in that range
+        """
+        first_date = (now - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+        last_date = horizon.strftime("%Y-%m-%d")
+        game_ids = set()
+        for season, (start, end) in self.SEASONS.items():
+            first_day, last_day = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+            if last_date < first_day or first_date > last_day:
+                continue
+            first_week = max(1, (datetime.date.fromisoformat(first_date) - start.date()).days // 7 + 1)
+            last_week = (datetime.date.fromisoformat(min(last_date, last_day)) - start.date()).days // 7 + 1
+            for week in range(first_week, last_week + 1):
+                game_ids |= {game_id for game_id in self.get_yahoo_ids_for_date(week, int(season))
+                             if first_date <= self.game_id_date(game_id) <= last_date}
+        return game_ids
+
+    def make_discovery_url(self, unit):
+        return self.make_date_url(*unit)
+
+    def record_discovery(self, index, season, unit, game_ids):
+        # the index keeps track of dates, not weeks, so every date of the week is recorded
+        week, _ = unit
+        by_date = {date: set() for date in self.week_dates(season, week)}
+        for game_id in game_ids:
+            by_date.setdefault(self.game_id_date(game_id), set()).add(game_id)
+        for game_date, date_game_ids in sorted(by_date.items()):
+            index.record_date(self.LEAGUE, season, game_date, date_game_ids)
 
 
     def fetch_yahoo_data(self, dir, year):
@@ -38,25 +110,36 @@ class ScrapeYahooNFL(ScrapeYahoo):
         unlike the NBA version, it doesn't need to crawl every daily page because there is a 
         page for each week in the season.
         """
-        for week in range(1, 19):
-            yahoo_ids = self.get_yahoo_ids_for_date(week, year)
-            time.sleep(2)
+        retries = game_index.GameIndex(":memory:")
+        for week in range(1, self.WEEKS + 1):
+            try:
+                yahoo_ids = self.keep_trying(self.get_yahoo_ids_for_date, week, year)
+            except throttle.CircuitOpen:
+                raise
+            except Exception as error:
+                print(f"GAVE UP on week {week}: {error}")
+                continue
 
             for yahoo_game_id in yahoo_ids:
-                cache_path = f"{dir}/{yahoo_game_id}.json"
-                if not os.path.exists(cache_path):
-                    game_url = self.make_yahoo_json_url(yahoo_game_id)
-                    #print(f"fetching url {game_url}")
-                    try:
-                        game_json = self.get_some_json(game_url)
-
-                        with open(cache_path, "w") as f:
-                            json.dump(game_json, f)
-                    except:
-                        print(f"failed on {game_url}")
-                        # I'm not sure if it's hitting rate limits or what, but might as well
-                        # take a little break.
-                        time.sleep(10)
-                    time.sleep(1) # be polite
+                if self.game_needs_fetch(yahoo_game_id, dir):
+                    self.fetch_game(yahoo_game_id, dir, retries)
 
             print(f"DONE WITH week {week}")
+
+        self.drain_retries(dir, retries)
+        self.log_abandoned_retries(retries)
+
+    def scrape_pages(self, index=None):
+        # seasons are fetched by week, so the index isn't used. the orchestrator does use it
+        for season in self.SEASONS:
+            self.fetch_yahoo_data(self.get_season_store(season), int(season))
+
+    def get_data_with_scores(self, workers=None):
+        """
+        get_all_data with each game's final score and margins attached (see nfl_results.attach_scores).
+        games that are only in the Yahoo data or only in the score tables are printed.
+        """
+        df, report = nfl_results.attach_scores(self.get_all_data(workers))
+        for game in report.itertuples():
+            print(f"NO MATCH: {game.away_team} @ {game.home_team} on {game.date} is only in the {game.source} data")
+        return df
@@ -0,0 +1,169 @@
+"""
+Resampling based confidence intervals and p-values for backtested strategies.
+
+`backtest.run_strategies` and `win_loss_report` only have the normal approximation, which is
+rough for long shot money lines where a few big payouts decide the ROI. These run thousands of
+resamples instead, all strategies at once:
+
+    bootstrap_roi      resamples the games with replacement, for a confidence interval on ROI
+    market_p_values    replays every bet with the market's vig-free win probability, for the
+                       chance of doing as well as the strategy did by luck alone
+
+Both work on the bets and strategy masks from `backtest`, so each resample is a row of weights
+or outcomes over all the bets, and a chunk of resamples times the (bets x strategies) matrix
+gives every strategy's result for the chunk in one matrix product. Chunks are sized so the
+resample matrix stays under `max_bytes`. Results are repeatable for the same seed and chunk size.
+
+The bootstrap draws games, not bets, and a drawn game brings all of its bets in the market
+along. Both sides of one game are never independent (one of them wins), so resampling bets
+on their own would make the intervals too narrow for strategies that bet both sides.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import backtest
+
+MAX_BYTES = 16 * 1024 * 1024
+
+
+def chunk_sizes(iters, n_bets, chunk_size=None, max_bytes=MAX_BYTES):
+    """
+    splits `iters` resamples into chunks of at most `chunk_size`, or however many rows of
+    `n_bets` floats fit in `max_bytes`.
+
+    >>> list(chunk_sizes(10, 100, chunk_size=4))
+    [4, 4, 2]
+    """
+    if chunk_size is None:
+        chunk_size = max(1, max_bytes // (8 * max(n_bets, 1)))
+    for start in range(0, iters, chunk_size):
+        yield min(chunk_size, iters - start)
+
+
+def bootstrap_weights(rng, size, n_bets):
+    """
+    how many times each bet is drawn in each of `size` bootstrap resamples, as a
+    (size x n_bets) matrix.
+    """
+    draws = rng.integers(0, n_bets, (size, n_bets))
+    draws += n_bets * np.arange(size)[:, None] # so each resample counts into its own row
+    return np.bincount(draws.ravel(), minlength=size * n_bets).reshape(size, n_bets).astype(np.float32)
+
+
+def game_weights(game_ids):
+    """
+    a make_rows for `resample` that draws games instead of bets: each bet gets the
+    bootstrap weight of its game.
+
+    >>> rows = game_weights(['a', 'a', 'b'])(np.random.default_rng(0), 4, 3)
+    >>> bool((rows[:, 0] == rows[:, 1]).all())
+    True
+    """
+    codes, games = pd.factorize(np.asarray(game_ids))
+
+    def make_rows(rng, size, n_bets):
+        return bootstrap_weights(rng, size, len(games))[:, codes]
+    return make_rows
+
+
+def resample(masks, make_rows, iters, seed, chunk_size, max_bytes, values):
+    """
+    runs `iters` resamples in chunks, returning (strategies x iters) matrices of the
+    resampled totals of each of `values` (vectors over the bets).
+
+    `make_rows(rng, size, n_bets)` makes a (size x n_bets) chunk of resamples. each chunk gets
+    its own generator spawned from `seed`.
+    """
+    n_bets = masks.shape[0]
+    sizes = list(chunk_sizes(iters, n_bets, chunk_size, max_bytes))
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(sizes))]
+    # lots of strategies make exactly the same bets, so only resample each set of bets once
+    masks, strategy_columns = np.unique(masks, axis=1, return_inverse=True)
+    weighted = [(masks * value[:, None]).astype(np.float32) for value in values]
+    totals = [np.empty((iters, masks.shape[1]), dtype=np.float32) for _ in values]
+
+    start = 0
+    for rng, size in zip(rngs, sizes):
+        rows = make_rows(rng, size, n_bets)
+        for total, matrix in zip(totals, weighted):
+            np.matmul(rows, matrix, out=total[start:start + size])
+        start += size
+    return [total.T[strategy_columns.ravel()] for total in totals]
+
+
+def bootstrap_market(market, names, bets, masks, iters=5000, alpha=0.05, seed=0, chunk_size=None, max_bytes=MAX_BYTES):
+    profit = backtest.bet_outcomes(bets)
+    totals, counts = resample(masks, game_weights(bets.game_id), iters, seed, chunk_size, max_bytes, [profit, np.ones(len(bets))])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = totals / counts
+        observed = (profit @ masks) / masks.sum(axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning) # strategies that never bet
+        low, high = np.nanquantile(roi, [alpha / 2, 1 - alpha / 2], axis=1)
+
+    return pd.DataFrame({
+        'market': market,
+        'roi': observed,
+        'roi_low': low,
+        'roi_high': high,
+        'prob_profit': (roi > 0).mean(axis=1),
+    }, index=pd.Index(names, name='strategy'))
+
+
+def simulate_market(market, names, bets, masks, iters=5000, seed=0, chunk_size=None, max_bytes=MAX_BYTES):
+    q = bets.fair_prob.to_numpy(dtype=np.float32)
+    payout = bets.payout.to_numpy()
+
+    def outcomes(rng, size, n_bets):
+        return (rng.random((size, n_bets), dtype=np.float32) < q).astype(np.float32)
+
+    # profit is payout for a win and -100 for a loss, so it's (payout + 100) * won - 100
+    (won_payouts,) = resample(masks, outcomes, iters, seed, chunk_size, max_bytes, [payout + 100])
+    simulated = won_payouts - 100 * masks.sum(axis=0)[:, None]
+    observed = backtest.bet_outcomes(bets) @ masks
+
+    # resamples are added up in float32, so count anything within 50 cents as a tie
+    p_values = (1 + (simulated >= observed[:, None] - 0.5).sum(axis=1)) / (1 + iters)
+    return pd.Series(p_values, index=pd.Index(names, name='strategy'), name='p_value')
+
+
+def bootstrap_roi(df, strategies, iters=5000, alpha=0.05, seed=0, chunk_size=None, max_bytes=MAX_BYTES):
+    """
+    bootstrap confidence intervals for the ROI (profit per $100 bet) of each strategy.
+
+    the games in a market are resampled together, along with all their bets, so strategies that
+    share bets are compared on the same resamples. returns, per strategy, the observed ROI, the
+    `alpha`/2 and 1 - `alpha`/2 quantiles of the resampled ROI, and the share of
+    resamples that made money.
+    """
+    results = [bootstrap_market(*market, iters, alpha, seed, chunk_size, max_bytes)
+               for market in backtest.market_masks(df, strategies)]
+    return pd.concat(results).loc[list(strategies)]
+
+
+def market_p_values(df, strategies, iters=5000, seed=0, chunk_size=None, max_bytes=MAX_BYTES):
+    """
+    Monte Carlo p-values for each strategy's profit, against every bet winning with the
+    market's vig-free probability. the p-value is the share of simulated seasons that made at
+    least as much as the strategy really did (counting the real season, so it's never 0).
+    """
+    results = [simulate_market(*market, iters, seed, chunk_size, max_bytes)
+               for market in backtest.market_masks(df, strategies)]
+    return pd.concat(results).loc[list(strategies)]
+
+
+def significance(df, strategies, iters=5000, alpha=0.05, seed=0, chunk_size=None, max_bytes=MAX_BYTES):
+    """
+    `backtest.run_strategies` with bootstrap ROI intervals and Monte Carlo p-values added.
+    """
+    results = []
+    for market in backtest.market_masks(df, strategies):
+        scores = backtest.score_strategies(*market)
+        intervals = bootstrap_market(*market, iters, alpha, seed, chunk_size, max_bytes)
+        scores[['roi_low', 'roi_high', 'prob_profit']] = intervals[['roi_low', 'roi_high', 'prob_profit']]
+        scores['mc_p_value'] = simulate_market(*market, iters, seed, chunk_size, max_bytes)
+        results.append(scores)
+    return pd.concat(results).loc[list(strategies)]
@@ -1,10 +1,30 @@
-import scrape_utils
+import numpy as np
 import pandas as pd
 
+import scrape_utils
+
+# which side of a bet something is on. missing values are NaN instead of None.
+SIDES = pd.CategoricalDtype(['HOME', 'AWAY'])
+HOME, AWAY, NEITHER = 0, 1, -1
+
+def sides(codes):
+    return pd.Categorical.from_codes(codes, dtype=SIDES)
+
+def popular_side(away_percentage):
+    """
+    AWAY if at least half the bets were on the away team, HOME if less, NEITHER if unknown
+    """
+    away_percentage = away_percentage.to_numpy(dtype=float)
+    return np.select([away_percentage >= 50, away_percentage < 50], [AWAY, HOME], NEITHER)
+
 def add_spread_columns(df):
     """
     adds additional columns related to betting against the spread
     from calculated results not in the original yahoo API
+
+    all the HOME/AWAY columns are categoricals, as are the new team name columns, which are
+    picked out of the home and away teams by code rather than by copying strings. the
+    categories are only the teams in `df`, and home_team/away_team keep the dtype they came in with.
     """
     ## convert fields that need to be numeric
     df = scrape_utils.numericize(df)
@@ -12,88 +32,64 @@ def add_spread_columns(df):
     ## parse the date as actual datetime
     df['game_date'] = pd.to_datetime(df['game_date'])
 
-    ## was the HOME or AWAY team the underdog against the spread?
-    df['spread_dog'] = None
-    # away underdogs
-    df.loc[df.spread_away_points > 0, 'spread_dog'] = 'AWAY'
-    # away favorites => home underdogs
-    df.loc[df.spread_away_points < 0, 'spread_dog'] = 'HOME'
-
-    ## did the HOME or AWAY team win against the spread?
-    df['spread_winner'] = None
-    df.loc[df.spread_away_won==True, 'spread_winner'] = "AWAY"
-    df.loc[df.spread_away_won==False, 'spread_winner'] = "HOME"
-
-    ## did the underdog win against the spread? T/F
-    df['spread_dog_won'] = False
-    # home dogs that won ATS
-    df.loc[(df.spread_dog == 'HOME') & (df.spread_winner == 'HOME'), 'spread_dog_won'] = True
-    # away dogs that won ATS
-    df.loc[(df.spread_dog == 'AWAY') & (df.spread_winner == 'AWAY'), 'spread_dog_won'] = True
-
-    ## which team got more bets placed on them, HOME or AWAY?
-    df['spread_most_popular'] = None
-    df.loc[df.spread_away_wager_percentage >= 50, 'spread_most_popular'] = 'AWAY'
-    df.loc[df.spread_away_wager_percentage < 50, 'spread_most_popular'] = 'HOME'
-
-    ## did the most popular team (by wager percentage) win against the spread?
-    df['spread_popular_won'] = False
-    df.loc[df.spread_most_popular == df.spread_winner, 'spread_popular_won'] = True
+    ## home and away team names share one set of codes so they can be swapped between them
+    codes, names = pd.factorize(np.concatenate([df.home_team.to_numpy(dtype=object),
+                                                df.away_team.to_numpy(dtype=object)]), sort=True)
+    teams = pd.CategoricalDtype(names)
+    home_team, away_team = codes[:len(df)], codes[len(df):]
 
-    ## when was the underdog against the spread the most popular team with bettors?
-    df['spread_popular_underdog'] = False
-    df.loc[df.spread_most_popular == df.spread_dog, 'spread_popular_underdog'] = True
+    def team_names(codes):
+        return pd.Categorical.from_codes(codes, dtype=teams)
 
-    ## sometimes wager_percentage and stake_percentage are significantly different.
-    ## might as well do the above for stake as well.
-    df['spread_stake_popular'] = None
-    df.loc[df.spread_away_stake_percentage >= 50, 'spread_stake_popular'] = 'AWAY'
-    df.loc[df.spread_away_stake_percentage < 50, 'spread_stake_popular'] = 'HOME'
-
-    ## did the most popular team (by wager percentage) win against the spread?
-    df['spread_stake_won'] = False
-    df.loc[df.spread_stake_popular == df.spread_winner, 'spread_stake_won'] = True
-
-    ## when was the underdog against the spread the most popular team with bettors?
-    df['spread_stake_underdog'] = False
-    df.loc[df.spread_stake_popular == df.spread_dog, 'spread_stake_underdog'] = True
-
-    ## add team names for various conditions
-
-    ## spread favorite/underdog team name
-    df['spread_favorite_team_name'] = None
-    df['spread_dog_team_name'] = None
-    # home favorites
-
-    # the home team was the favorite on the line, so should be `spread_favorite_team_name`
-    home_favorites = (df.spread_dog == "AWAY")
-    df.loc[home_favorites, "spread_favorite_team_name"] = df.loc[home_favorites, "home_team"]
-    df.loc[home_favorites, "spread_dog_team_name"] = df.loc[home_favorites, "away_team"]
-
-    # away team was the favorited
-    away_favorites = (df.spread_dog == "HOME")
-    df.loc[away_favorites, "spread_favorite_team_name"] = df.loc[away_favorites, "away_team"]
-    df.loc[away_favorites, "spread_dog_team_name"] = df.loc[away_favorites, "home_team"]
-
-    # spread winner/loser team names
-    df['spread_winner_team_name'] = None
-    df['spread_loser_team_name']  = None
-
-    spread_home_winners = (df.spread_home_won == True)
-    spread_home_losers = (df.spread_home_won == False)
-
-    df.loc[spread_home_winners, 'spread_winner_team_name'] = df.loc[spread_home_winners, 'home_team']
-    df.loc[spread_home_winners, 'spread_loser_team_name'] = df.loc[spread_home_winners, 'away_team']
-
-
-    df.loc[spread_home_losers, 'spread_winner_team_name'] = df.loc[spread_home_losers, 'away_team']
-    df.loc[spread_home_losers, 'spread_loser_team_name'] = df.loc[spread_home_losers, 'home_team']
-
-    # popular teams by name
-    df['spread_popular_team_name'] = None
-    popular_home = (df.spread_most_popular == "HOME")
+    ## was the HOME or AWAY team the underdog against the spread?
+    # away underdogs have positive points, away favorites => home underdogs
+    away_points = df.spread_away_points.to_numpy(dtype=float)
+    dog = np.select([away_points > 0, away_points < 0], [AWAY, HOME], NEITHER)
 
-    df.loc[popular_home, 'spread_popular_team_name'] = df.loc[popular_home, 'home_team']
-    df.loc[~popular_home, 'spread_popular_team_name'] = df.loc[~popular_home, 'away_team']
+    ## did the HOME or AWAY team win against the spread?
+    away_won = df.spread_away_won.to_numpy()
+    winner = np.select([away_won == True, away_won == False], [AWAY, HOME], NEITHER)
+
+    ## which team got more bets placed on them, HOME or AWAY? and more money?
+    most_popular = popular_side(df.spread_away_wager_percentage)
+    stake_popular = popular_side(df.spread_away_stake_percentage)
+
+    def same_side(a, b):
+        return (a == b) & (a != NEITHER)
+
+    home_won = df.spread_home_won.to_numpy()
+    home_winners = (home_won == True)
+    home_losers = (home_won == False)
+
+    new_columns = {
+        'spread_dog': sides(dog),
+        'spread_winner': sides(winner),
+        ## did the underdog win against the spread? T/F
+        'spread_dog_won': same_side(dog, winner),
+        'spread_most_popular': sides(most_popular),
+        ## did the most popular team (by wager percentage) win against the spread?
+        'spread_popular_won': same_side(most_popular, winner),
+        ## when was the underdog against the spread the most popular team with bettors?
+        'spread_popular_underdog': same_side(most_popular, dog),
+        ## sometimes wager_percentage and stake_percentage are significantly different.
+        ## might as well do the above for stake as well.
+        'spread_stake_popular': sides(stake_popular),
+        'spread_stake_won': same_side(stake_popular, winner),
+        'spread_stake_underdog': same_side(stake_popular, dog),
+
+        ## add team names for various conditions
+        # when the away team is the underdog, the home team was the favorite on the line
+        'spread_favorite_team_name': team_names(np.select([dog == AWAY, dog == HOME], [home_team, away_team], NEITHER)),
+        'spread_dog_team_name': team_names(np.select([dog == AWAY, dog == HOME], [away_team, home_team], NEITHER)),
+
+        # spread winner/loser team names
+        'spread_winner_team_name': team_names(np.select([home_winners, home_losers], [home_team, away_team], NEITHER)),
+        'spread_loser_team_name': team_names(np.select([home_winners, home_losers], [away_team, home_team], NEITHER)),
+
+        # popular teams by name
+        'spread_popular_team_name': team_names(np.where(most_popular == HOME, home_team, away_team)),
+    }
+    for column, values in new_columns.items():
+        df[column] = pd.Series(values, index=df.index)
 
     return df
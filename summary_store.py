@@ -0,0 +1,133 @@
+"""
+Typed Parquet output for the parsed summary data, partitioned by league and season.
+
+The CSVs written by `rebuild_summary_csv` come back as strings and floats, and
+`scrape_utils.numericize` has to guess which columns are numeric or boolean from their names.
+Here the column types are worked out from `scrape_rules.RULES` instead, by the field each rule
+reads, and stored with the data:
+
+    points, percentages, odds    float64
+    *_won                        nullable boolean
+    game_date                    timestamp
+    team names and team ids      categorical
+
+Files are laid out as `<root>/league=<league>/season=<season>/odds.parquet`, so one season or
+a few columns can be loaded without reading everything.
+
+Needs pyarrow, which is an optional dependency (`pip install scrape-yahoo-odds[parquet]`).
+"""
+
+import os
+
+import pandas as pd
+
+import scrape_rules
+
+# type for each field the rules read, by the last part of the JSONPath
+FIELD_TYPES = {
+    'gameId': 'string',
+    'startDate': 'datetime64[us]',
+    'displayName': 'category',
+    'teamId': 'category',
+    'teamIds[0]': 'category',
+    'pregameOddsDisplay': 'string',
+    'value': 'float64',
+    'stakePercentage': 'float64',
+    'wagerPercentage': 'float64',
+    'americanOdds': 'float64',
+    'decimalOdds': 'float64',
+    'isCorrect': 'boolean',
+}
+
+
+def massaged_columns(column):
+    """
+    the column names a rule ends up as after `ScrapeYahoo.massage_yahoo_data`.
+
+    >>> massaged_columns('money_one_odds')
+    ['money_home_odds', 'money_away_odds']
+    >>> massaged_columns('total_over_odds')
+    ['total_over_odds']
+    """
+    for bet_type in ['money', 'spread']:
+        for cardinal in ['one', 'two']:
+            prefix = f"{bet_type}_{cardinal}_"
+            if column.startswith(prefix):
+                return [column.replace(prefix, f"{bet_type}_{side}_") for side in ['home', 'away']]
+    return [column]
+
+
+def make_schema(rules=scrape_rules.RULES):
+    """
+    returns {column name: dtype} for the columns in the massaged rows.
+    """
+    schema = {}
+    for column, expression in rules.items():
+        dtype = FIELD_TYPES[expression.rsplit('.', 1)[1]]
+        for name in massaged_columns(column):
+            schema[name] = dtype
+    return schema
+
+
+SCHEMA = make_schema()
+
+
+def apply_schema(df, schema=SCHEMA):
+    """
+    returns a copy of df with each column in `schema` converted to its type.
+    columns that aren't in the schema are left alone.
+    """
+    df = df.copy()
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == 'datetime64[us]':
+            df[column] = pd.to_datetime(df[column])
+        elif dtype == 'float64':
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+        elif dtype == 'boolean':
+            df[column] = df[column].astype('boolean')
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def partition_path(root, league, season):
+    return os.path.join(root, f"league={league}", f"season={season}", "odds.parquet")
+
+
+def write_season(df, root, league, season):
+    """
+    writes one league/season partition, replacing whatever was there.
+    """
+    path = partition_path(root, league, season)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    typed = apply_schema(df.drop(columns=['league', 'season'], errors='ignore'))
+    typed.to_parquet(path, index=False)
+    return path
+
+
+def read_summary(root, leagues=None, seasons=None, columns=None):
+    """
+    loads the partitions under `root`, optionally only for some leagues/seasons and columns.
+    `league` and `season` come back as categorical columns.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # otherwise pyarrow would guess that seasons are integers
+    partitioning = ds.partitioning(pa.schema([('league', pa.string()), ('season', pa.string())]), flavor='hive')
+
+    filters = []
+    if leagues is not None:
+        filters.append(('league', 'in', list(leagues)))
+    if seasons is not None:
+        filters.append(('season', 'in', [str(season) for season in seasons]))
+    if columns is not None:
+        columns = list(columns) + [c for c in ['league', 'season'] if c not in columns]
+
+    df = pd.read_parquet(root, columns=columns, filters=filters or None, partitioning=partitioning)
+    for column in ['league', 'season']:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
@@ -0,0 +1,229 @@
+"""
+Generates realistic, made up gameOdds documents for benchmarks and local testing.
+
+The documents have the same layout as the real ones in `test/fixtures/` (one game under
+`data.games`, team objects, an odds summary, PREGAME and LIVE six-pack entries and the empty
+quarter/half/period six-packs), so they go through `scrape_rules.RULES` and the massaging the
+same way real games do. Each league gets its own kind of game id, team names, totals and
+spreads.
+
+`missing_rate` is the chance each of the OVER_UNDER, MONEY_LINE and SPREAD markets is left
+out of a game, and `sparse_rate` the chance a game has no six-pack data at all, like most
+older MLB games.
+"""
+
+import datetime
+import json
+import random
+
+import game_archive
+import scrape_utils
+from scrape_yahoo_nba import ScrapeYahooNBA
+
+LEAGUES = {
+    # teams, typical total and its spread, possible spread points, games per day
+    'nba': {'teams': sorted(ScrapeYahooNBA.TEAMS), 'total': (225, 12), 'points': [1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, 9.5, 12.5], 'per_day': 8},
+    'mlb': {'teams': [f"MLB Team {n}" for n in range(1, 31)], 'total': (8.5, 1), 'points': [1.5], 'per_day': 15},
+    'nfl': {'teams': [f"NFL Team {n}" for n in range(1, 33)], 'total': (44.5, 4), 'points': [1.5, 2.5, 3, 3.5, 6.5, 7, 7.5, 10], 'per_day': 14},
+}
+
+MARKETS = ['MONEY_LINE', 'SPREAD', 'OVER_UNDER']
+SIX_PACKS = ['firstQuarterSixPack', 'secondQuarterSixPack', 'thirdQuarterSixPack', 'fourthQuarterSixPack',
+             'firstHalfSixPack', 'secondHalfSixPack', 'firstPeriodSixPack', 'secondPeriodSixPack',
+             'thirdPeriodSixPack', 'fiveInningsSixPack']
+
+
+def make_game_id(league, date, number):
+    """
+    >>> make_game_id('mlb', datetime.date(2026, 6, 10), 128)
+    'mlb.g.460610128'
+    >>> make_game_id('nba', datetime.date(2024, 10, 22), 3)
+    'nba.g.2024102203'
+    """
+    if league == 'mlb':
+        return f"mlb.g.4{date.year % 10}{date:%m%d}{number:03d}"
+    return f"{league}.g.{date:%Y%m%d}{number:02d}"
+
+
+def make_team(league, teams, n):
+    abbreviation = ''.join(word[0] for word in teams[n].split()).upper()[:3]
+    return {
+        'teamId': f"{league}.t.{n + 1}",
+        'abbreviation': abbreviation,
+        'displayName': teams[n],
+        'nickname': teams[n].split()[-1],
+        'location': teams[n],
+        'primaryColor': 'a71930',
+        'secondaryColor': '00c2cf',
+        'teamLogo': {'url': f"https://s.yimg.com/cv/apiv2/default/{league}/500px/{abbreviation.lower()}_wbg.png"},
+    }
+
+
+def percentages(rng, missing=0.1):
+    """
+    a (stake, wager) pair of percentage strings for each side, or Nones
+    """
+    if rng.random() < missing:
+        return [(None, None), (None, None)]
+    stake = round(rng.uniform(2, 98), 2)
+    wager = round(min(98, max(2, stake + rng.gauss(0, 10))), 2)
+    return [(f"{stake:.2f}", f"{wager:.2f}"), (f"{100 - stake:.2f}", f"{100 - wager:.2f}")]
+
+
+def make_option(rng, name, odds, team_ids, is_correct, details, stake, wager):
+    odds = int(round(odds))
+    return {
+        'id': rng.randrange(10**8, 10**9),
+        'name': name,
+        'americanOdds': odds,
+        'decimalOdds': None,
+        'shortName': f"{odds:+d}",
+        'displayName': f"{odds:+d}",
+        'status': 'CLOSED',
+        'teamIds': team_ids,
+        'isCorrect': is_correct,
+        'optionDetails': details,
+        'stakePercentage': stake,
+        'wagerPercentage': wager,
+    }
+
+
+def make_entry(rng, market, event_state, options):
+    names = {'MONEY_LINE': 'winner', 'SPREAD': 'handicap', 'OVER_UNDER': 'total'}
+    return {
+        'id': rng.randrange(10**8, 10**9),
+        'name': names[market] if event_state == 'PREGAME' else f"{names[market]}_live",
+        'status': 'CLOSED',
+        'type': market,
+        'period': 'FULL_GAME',
+        'eventState': event_state,
+        'baseCategory': 'TOTALS' if market == 'OVER_UNDER' else market,
+        'options': options,
+    }
+
+
+def line(probability, vig=0.025):
+    """
+    an American line for a side with this chance of winning, with some juice on top
+
+    >>> line(0.5, vig=0)
+    100.0
+    >>> round(line(0.8, vig=0))
+    -400
+    """
+    return scrape_utils.convert_prob_to_line(min(0.97, probability + vig))
+
+
+def make_game(rng, league='mlb', date=datetime.date(2026, 6, 10), number=0, missing_rate=0.0, sparse_rate=0.0):
+    """
+    returns one made up gameOdds document. `rng` is a random.Random.
+    """
+    info = LEAGUES[league]
+    teams = info['teams']
+    home, away = rng.sample(range(len(teams)), 2)
+    home_team, away_team = make_team(league, teams, home), make_team(league, teams, away)
+    home_id, away_id = home_team['teamId'], away_team['teamId']
+
+    home_prob = rng.uniform(0.25, 0.75)
+    home_won = rng.random() < home_prob
+    points = rng.choice(info['points'])
+    home_points = -points if home_prob > 0.5 else points
+    # about one in twenty games with whole number spreads is a push
+    push = points == int(points) and rng.random() < 0.05
+    home_covered = (rng.random() < 0.5) and not push
+    total = round(rng.gauss(*info['total']) * 2) / 2
+    over = rng.random() < 0.5
+
+    markets = {}
+    sides = [(home_id, home_team, home_prob, home_won, home_points, home_covered),
+             (away_id, away_team, 1 - home_prob, not home_won, -home_points, not home_covered and not push)]
+    if rng.random() < 0.5:
+        sides.reverse() # yahoo lists the home team first in some games and second in others
+
+    money_percentages = percentages(rng)
+    markets['MONEY_LINE'] = [
+        make_option(rng, team['nickname'], line(prob), [team_id], won, [], *pct)
+        for (team_id, team, prob, won, _, _), pct in zip(sides, money_percentages)
+    ]
+    spread_percentages = percentages(rng, missing=0.3)
+    markets['SPREAD'] = [
+        make_option(rng, f"{team['nickname']} {side_points:+g}", line(0.5) + rng.choice([-10, 0, 0, 10]), [team_id],
+                    covered, [{'key': 'points', 'value': f"{side_points:g}"}], *pct)
+        for (team_id, team, _, _, side_points, covered), pct in zip(sides, spread_percentages)
+    ]
+    total_percentages = percentages(rng)
+    markets['OVER_UNDER'] = [
+        make_option(rng, f"Under {total:g}", line(0.5), [], not over, [{'key': 'under', 'value': f"{total:g}"}], *total_percentages[0]),
+        make_option(rng, f"Over {total:g}", line(0.5), [], over, [{'key': 'over', 'value': f"{total:g}"}], *total_percentages[1]),
+    ]
+
+    six_pack = []
+    if rng.random() >= sparse_rate:
+        for market in MARKETS:
+            if rng.random() >= missing_rate:
+                six_pack.append(make_entry(rng, market, 'PREGAME', markets[market]))
+        for market in MARKETS:
+            six_pack.append(make_entry(rng, market, 'LIVE', []))
+
+    favorite = home_id if home_prob > 0.5 else away_id
+    game = {
+        'gameId': make_game_id(league, date, number),
+        'status': 'FINAL',
+        'startDate': f"{date:%Y-%m-%d}-10:00",
+        'startTime': f"{date:%Y-%m-%d}T19:10:00-10:00",
+        'gameOddsSummary': {
+            'pregameOddsDisplay': f"{markets['MONEY_LINE'][0]['americanOdds']:+d}, O/U {total:g}",
+            'favoriteId': favorite,
+            'underdogTeamPredictedScore': None,
+            'favoriteTeamPredictedScore': None,
+        },
+        'playoffSeries': {},
+        'league': {'shortName': league.upper()},
+        'awayTeam': away_team,
+        'homeTeam': home_team,
+        'activePropBets': [],
+        'closedPropBets': [],
+        'gameLineSixPack': six_pack,
+    }
+    for name in SIX_PACKS:
+        game[name] = []
+    game['gameNotes'] = []
+    return {'data': {'games': [game]}, 'extensions': {}}
+
+
+def make_games(n, league='mlb', seed=0, missing_rate=0.0, sparse_rate=0.0, start=datetime.date(2026, 3, 25)):
+    """
+    yields (game id, document) for `n` games, `LEAGUES[league]['per_day']` a day from `start`.
+    the same seed always gives the same games.
+    """
+    rng = random.Random(seed)
+    per_day = LEAGUES[league]['per_day']
+    for i in range(n):
+        date = start + datetime.timedelta(days=i // per_day)
+        game = make_game(rng, league, date, i % per_day, missing_rate, sparse_rate)
+        yield game['data']['games'][0]['gameId'], game
+
+
+def write_archive(path, games):
+    """
+    packs (game id, document) pairs into a GameArchive, and returns the game ids in order.
+    """
+    game_ids = []
+    with game_archive.GameArchive(path) as archive:
+        for game_id, game in games:
+            archive.write(game_id, game)
+            game_ids.append(game_id)
+    return game_ids
+
+
+def write_files(json_dir, games):
+    """
+    writes (game id, document) pairs as one JSON file per game, and returns the filenames.
+    """
+    filenames = []
+    for game_id, game in games:
+        filename = f"{json_dir}/{game_id}.json"
+        with open(filename, 'w') as f:
+            json.dump(game, f)
+        filenames.append(filename)
+    return filenames
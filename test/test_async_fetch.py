@@ -0,0 +1,171 @@
+import asyncio
+import datetime
+import json
+import os
+import re
+import time
+import urllib.parse
+
+import cloudscraper
+import pytest
+from async_fetch import TokenBucket, make_session
+from game_index import GameIndex
+from scrape_yahoo_mlb import ScrapeYahooMLB
+from yahoo_stand_in import StandInYahoo
+
+GAMES = {
+    '2026-06-10': ['mlb.g.460610128'],
+    '2026-06-11': ['mlb.g.460611101', 'mlb.g.460611102'],
+    '2026-06-12': ['mlb.g.460612101', 'mlb.g.460612102', 'mlb.g.460612103', 'mlb.g.460612104'],
+}
+
+# left out of any response that asks for more than one game, to exercise the batch splitting
+DROPPED_FROM_BATCHES = 'mlb.g.460612103'
+
+
+class BatchDroppingYahoo(StandInYahoo):
+    """
+    the stand-in, keeping every request path and dropping DROPPED_FROM_BATCHES from batches
+    """
+
+    def __init__(self, games):
+        super().__init__(games)
+        self.requests_seen = []
+
+    def handle(self, path):
+        self.requests_seen.append(path)
+        return super().handle(path)
+
+    def odds_body(self, game_ids):
+        if len(game_ids) > 1:
+            game_ids = [game_id for game_id in game_ids if game_id != DROPPED_FROM_BATCHES]
+        return super().odds_body(game_ids)
+
+    def odds_requests(self):
+        return [re.search(r"gameIds=([^;/?]*)", path).group(1).split(',')
+                for path in self.requests_seen if 'gameOdds' in path]
+
+    def date_requests(self):
+        queries = [dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(path).query))
+                   for path in self.requests_seen if 'leagueGameIdsByDate' in path]
+        return [(query['startRange'], query['endRange']) for query in queries]
+
+
+def make_games():
+    with open("test/fixtures/fixture1.json", "r") as f:
+        document = json.load(f)
+    template = document['data']['games'][0]
+    return {game_id: dict(document, data=dict(document['data'], games=[dict(template, gameId=game_id,
+                                                                             startDate=f"{date}-10:00")]))
+            for date, game_ids in GAMES.items() for game_id in game_ids}
+
+
+@pytest.fixture
+def server():
+    with BatchDroppingYahoo(make_games()) as server:
+        yield server
+
+
+@pytest.fixture
+def scraper(server):
+    return server.configure(ScrapeYahooMLB())
+
+
+def test_fetch_and_skip_cached(server, scraper, tmp_path):
+    cached = tmp_path / "mlb.g.460611101.json"
+    cached.write_text("{}")
+
+    fetcher = scraper.fetch_yahoo_data_async(str(tmp_path),
+                                             datetime.datetime(2026, 6, 10),
+                                             datetime.datetime(2026, 6, 11),
+                                             concurrency=2, rate=100)
+
+    assert sorted(os.listdir(tmp_path)) == ['mlb.g.460610128.json', 'mlb.g.460611101.json',
+                                            'mlb.g.460611102.json']
+    assert cached.read_text() == "{}"
+    assert (fetcher.fetched, fetcher.skipped, fetcher.failed) == (2, 1, [])
+    assert ['mlb.g.460611101'] not in server.odds_requests()
+
+
+def test_token_bucket_limits_rate():
+    async def acquire_all():
+        bucket = TokenBucket(rate=50, capacity=1)
+        for _ in range(6):
+            await bucket.acquire()
+        return bucket
+
+    start = time.monotonic()
+    bucket = asyncio.run(acquire_all())
+    assert time.monotonic() - start >= 0.09
+    assert bucket.slept > 0
+
+
+def test_batched_fetch_splits_and_retries(server, scraper, tmp_path):
+    fetcher = scraper.fetch_yahoo_data_async(str(tmp_path),
+                                             datetime.datetime(2026, 6, 12),
+                                             datetime.datetime(2026, 6, 12),
+                                             rate=100, batch_size=3)
+
+    assert sorted(os.listdir(tmp_path)) == [f"{game_id}.json" for game_id in GAMES['2026-06-12']]
+    assert (fetcher.fetched, fetcher.failed) == (4, [])
+    with open(tmp_path / "mlb.g.460612102.json", "r") as f:
+        saved = json.load(f)
+    assert [game['gameId'] for game in saved['data']['games']] == ['mlb.g.460612102']
+    assert 'extensions' in saved
+
+    assert server.odds_requests() == [['mlb.g.460612101', 'mlb.g.460612102', 'mlb.g.460612103'],
+                                      ['mlb.g.460612104'],
+                                      ['mlb.g.460612103']]
+
+
+def test_discovery_by_date_range(server, scraper, tmp_path):
+    scraper.DISCOVERY_MAX_IDS = 5
+    fetcher = scraper.fetch_yahoo_data_async(str(tmp_path),
+                                             datetime.datetime(2026, 6, 10),
+                                             datetime.datetime(2026, 6, 12),
+                                             rate=100, window_days=7)
+
+    # 7 games is too many for one response, so the window gets split in half. 2026-06-10 has
+    # 1 game, and 2026-06-11 thru 2026-06-12 has 6 so it's split again.
+    assert sorted(server.date_requests()) == [('2026-06-10', '2026-06-10'),
+                                              ('2026-06-10', '2026-06-12'),
+                                              ('2026-06-11', '2026-06-11'),
+                                              ('2026-06-11', '2026-06-12'),
+                                              ('2026-06-12', '2026-06-12')]
+    assert fetcher.fetched == 7
+
+
+def test_assign_game_dates(scraper):
+    date_html = json.dumps({"games": ['mlb.g.460610128', 'mlb.g.460611101']})
+    assert scraper.assign_game_dates(date_html, '2026-06-10', '2026-06-16') == {
+        '2026-06-10': {'mlb.g.460610128'},
+        '2026-06-11': {'mlb.g.460611101'},
+    }
+    # truncated response
+    assert scraper.assign_game_dates(date_html[:-5], '2026-06-10', '2026-06-16') is None
+    # a game outside of the window
+    assert scraper.assign_game_dates(date_html, '2026-06-11', '2026-06-16') is None
+
+
+def test_index_skips_settled_dates(server, scraper, tmp_path):
+    with GameIndex(str(tmp_path / "index.sqlite")) as index:
+        fetch_dir = tmp_path / "2026"
+        fetch_dir.mkdir()
+        args = (str(fetch_dir), datetime.datetime(2026, 6, 10), datetime.datetime(2026, 6, 11))
+        first = scraper.fetch_yahoo_data_async(*args, rate=100, index=index, season='2026')
+        assert first.fetched == 3
+        assert index.is_date_settled('mlb', '2026-06-11')
+
+        server.requests_seen = []
+        second = scraper.fetch_yahoo_data_async(*args, rate=100, index=index, season='2026')
+        assert server.requests_seen == []
+        assert second.fetched == 0
+
+
+def test_session_keeps_cloudscrapers_tls(scraper):
+    session = make_session(scraper, 8)
+    adapter = session.get_adapter("https://sports.yahoo.com")
+    assert isinstance(adapter, cloudscraper.CipherSuiteAdapter)
+    assert adapter.cipherSuite == session.cipherSuite
+    assert adapter.ecdhCurve == session.ecdhCurve
+    assert adapter._pool_maxsize == 8
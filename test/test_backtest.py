@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import scrape_utils
+
+
+@pytest.fixture
+def games():
+    rng = np.random.default_rng(7)
+    n = 200
+    home_odds = rng.choice([-300, -200, -150, -110, 105, 140, 250], n)
+    away_odds = -home_odds - 20
+    home_won = rng.random(n) < 0.5
+    points = rng.choice([-7.5, -3, -1.5, 1.5, 3, 7.5], n)
+    spread_home_won = rng.random(n) < 0.5
+    push = rng.random(n) < 0.05
+    wager = rng.choice([20, 50, 65, 80], n).astype(float)
+    stake = rng.choice([30, 50, 55, 90], n).astype(float)
+    wager[:5] = np.nan
+    return pd.DataFrame({
+        'game_id': [f"mlb.g.{i}" for i in range(n)],
+        'money_home_odds': home_odds,
+        'money_away_odds': away_odds,
+        'money_home_won': home_won,
+        'money_away_won': ~home_won,
+        'money_home_wager_percentage': wager,
+        'money_away_wager_percentage': 100 - wager,
+        'money_home_stake_percentage': stake,
+        'money_away_stake_percentage': 100 - stake,
+        'spread_home_points': points,
+        'spread_away_points': -points,
+        'spread_home_odds': -110,
+        'spread_away_odds': -110,
+        'spread_home_won': spread_home_won & ~push,
+        'spread_away_won': ~spread_home_won & ~push,
+        'spread_home_wager_percentage': wager,
+        'spread_away_wager_percentage': 100 - wager,
+        'spread_home_stake_percentage': stake,
+        'spread_away_stake_percentage': 100 - stake,
+    })
+
+
+def loop_record(df, market, strategy):
+    """
+    the notebook way: go through the games one at a time
+    """
+    wins = losses = 0
+    profit = 0.0
+    for _, row in df.iterrows():
+        for side, other in [('home', 'away'), ('away', 'home')]:
+            odds = row[f"{market}_{side}_odds"]
+            low, high = strategy.get('odds', (-np.inf, np.inf))
+            if not low <= odds < high:
+                continue
+            if strategy.get('side', side) != side:
+                continue
+            if 'role' in strategy:
+                if market == 'spread':
+                    dog = row[f"spread_{side}_points"] > 0
+                else:
+                    dog = odds > row[f"{market}_{other}_odds"]
+                if dog != (strategy['role'] == 'dog'):
+                    continue
+            if 'public' in strategy:
+                pct = row[f"{market}_{side}_{strategy.get('by', 'wager')}_percentage"]
+                if np.isnan(pct):
+                    continue
+                popular = pct > 50 or (pct == 50 and side == 'away')
+                if popular != (strategy['public'] == 'popular'):
+                    continue
+            if row[f"{market}_{side}_won"]:
+                wins += 1
+                profit += scrape_utils.payout(odds)
+            elif row[f"{market}_{other}_won"]:
+                losses += 1
+                profit -= 100
+    return wins, losses, profit
+
+
+def test_matches_loop(games):
+    strategies = backtest.strategy_grid(roles=(None, 'dog'), buckets={'all': [-9999, 9999], 'favorites': [-9999, -1]})
+    strategies.update(backtest.odds_buckets({'mild dogs': [1, 200], 'heavy favorites': [-400, -200]}))
+    results = backtest.run_strategies(games, strategies)
+
+    assert list(results.index) == list(strategies)
+    for name, strategy in strategies.items():
+        wins, losses, profit = loop_record(games, strategy.get('market', 'money'), strategy)
+        assert (results.loc[name, 'wins'], results.loc[name, 'losses']) == (wins, losses), name
+        assert results.loc[name, 'profit'] == pytest.approx(profit), name
+
+
+def test_spread_z_score_matches_win_loss_report(games):
+    results = backtest.run_strategies(games, {'home': {'market': 'spread', 'side': 'home'}})
+    report = backtest.win_loss_report(results.wins, results.losses)
+
+    assert results.z_score.to_numpy() == pytest.approx(report['z test'])
+    assert results.p_value.to_numpy() == pytest.approx(report['p-value'])
+
+
+def test_normal_sf():
+    assert backtest.normal_sf([0, -np.inf, np.inf]).tolist() == [0.5, 1.0, 0.0]
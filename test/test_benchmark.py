@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+import benchmark
+import rule_compiler
+import scrape_rules
+import synthetic_games
+
+
+def test_synthetic_games_have_every_rule():
+    compiled = rule_compiler.CompiledRules(scrape_rules.RULES, scrape_rules.GROUPS)
+    for league in synthetic_games.LEAGUES:
+        for game_id, game in synthetic_games.make_games(20, league, seed=1):
+            row, missing_groups, missing = compiled.extract_grouped(game)
+            assert (missing_groups, missing) == ([], [])
+            assert row['game_id'] == game_id
+            assert row['home_team_id'] in (row['money_one_team_id'], row['money_two_team_id'])
+
+
+def test_missing_and_sparse_rates():
+    compiled = rule_compiler.CompiledRules(scrape_rules.RULES, scrape_rules.GROUPS)
+    for _, game in synthetic_games.make_games(10, 'mlb', missing_rate=1.0):
+        assert sorted(compiled.extract_grouped(game)[1]) == sorted(scrape_rules.GROUPS)
+    for _, game in synthetic_games.make_games(10, 'mlb', sparse_rate=1.0):
+        assert game['data']['games'][0]['gameLineSixPack'] == []
+
+
+def test_same_seed_same_games():
+    assert list(synthetic_games.make_games(5, 'nfl', seed=3)) == list(synthetic_games.make_games(5, 'nfl', seed=3))
+
+
+@pytest.mark.parametrize('store', benchmark.STORES)
+def test_benchmark_output(tmp_path, store):
+    output = tmp_path / "bench.json"
+    benchmark.main(['--league', 'nba', '--games', '50', '--store', store, '--output', str(output)])
+
+    results = json.loads(output.read_text())
+    [run] = results['runs']
+    assert (run['games'], run['store']) == (50, store)
+    assert 0 < run['rows'] <= 50
+    for stage in ['parse', 'assemble', 'massage', 'spread_columns', 'money_columns', 'significance', 'summary_csv']:
+        assert run['stages'][stage]['seconds'] > 0
+    for stage in ['parse', 'assemble', 'massage', 'spread_columns', 'money_columns', 'summary_csv']:
+        assert run['stages'][stage]['peak_bytes'] > 0
+    # the bootstrap isn't run a second time for its memory
+    assert 'peak_bytes' not in run['stages']['significance']
+    assert results['environment']['pandas']
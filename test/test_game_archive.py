@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+
+import pytest
+from game_archive import GameArchive, migrate_directory
+from scrape_yahoo_mlb import ScrapeYahooMLB
+
+
+@pytest.fixture
+def fixtures():
+    games = {}
+    for fixture_name in ["fixture1", "fixture2"]:
+        with open(f"test/fixtures/{fixture_name}.json", "r") as f:
+            json_data = json.load(f)
+        games[json_data['data']['games'][0]['gameId']] = json_data
+    return games
+
+
+def test_write_and_read(tmp_path, fixtures):
+    path = str(tmp_path / "2026.pack")
+    with GameArchive(path) as archive:
+        for game_id, json_data in fixtures.items():
+            archive.write(game_id, json_data)
+        assert archive.read('mlb.g.460610128') == fixtures['mlb.g.460610128']
+
+        # a newer copy of a game replaces the old one
+        updated = dict(fixtures['mlb.g.460501120'], extensions={})
+        archive.write('mlb.g.460501120', updated)
+
+    os.remove(f"{path}.idx")
+    with GameArchive(path) as archive:
+        assert len(archive) == 2
+        assert archive.game_ids() == ['mlb.g.460610128', 'mlb.g.460501120']
+        assert archive.read('mlb.g.460501120') == updated
+        assert dict(archive.items())['mlb.g.460610128'] == fixtures['mlb.g.460610128']
+
+
+def test_migrated_seasons_parse_the_same(tmp_path):
+    scraper = ScrapeYahooMLB()
+    scraper.BASE_DIR = str(tmp_path)
+    scraper.SEASONS = {'2026': None}
+    (tmp_path / "2026").mkdir()
+    for fixture_name in ["fixture1", "fixture2"]:
+        shutil.copy(f"test/fixtures/{fixture_name}.json", tmp_path / "2026" / f"{fixture_name}.json")
+
+    from_files = scraper.get_all_data().sort_values('game_id', ignore_index=True)
+    assert migrate_directory(str(tmp_path / "2026"), scraper.get_archive_path('2026')) == 2
+    assert migrate_directory(str(tmp_path / "2026"), scraper.get_archive_path('2026')) == 0
+
+    assert scraper.get_cached_games('2026')[0][0] == scraper.get_archive_path('2026')
+    from_archive = scraper.get_all_data().sort_values('game_id', ignore_index=True)
+    assert from_archive.equals(from_files)
+
+
+def test_append_after_an_interrupted_write(tmp_path, fixtures):
+    path = str(tmp_path / "2026.pack")
+    with GameArchive(path) as archive:
+        archive.write('mlb.g.460610128', fixtures['mlb.g.460610128'])
+    good_size = os.path.getsize(path)
+    # the write of the next game stopped halfway through
+    with open(path, 'ab') as f:
+        f.write(b'\x0f\x00\xff\xff\x00\x00mlb.g.46')
+
+    with GameArchive(path) as archive:
+        assert archive.game_ids() == ['mlb.g.460610128']
+        archive.write('mlb.g.460501120', fixtures['mlb.g.460501120'])
+    assert os.path.getsize(path) > good_size
+
+    os.remove(f"{path}.idx")
+    with GameArchive(path) as archive:
+        assert archive.game_ids() == ['mlb.g.460610128', 'mlb.g.460501120']
+        assert archive.read('mlb.g.460501120') == fixtures['mlb.g.460501120']
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import game_decoder
+import rule_compiler
+import scrape_rules
+from scrape_yahoo_mlb import ScrapeYahooMLB
+
+pytest.importorskip("msgspec")
+
+
+@pytest.fixture
+def compiled():
+    return rule_compiler.CompiledRules(scrape_rules.RULES, scrape_rules.GROUPS)
+
+
+@pytest.mark.parametrize("fixture_name", ["fixture1", "fixture2"])
+def test_same_rows_as_json_load(compiled, fixture_name):
+    with open(f"test/fixtures/{fixture_name}.json", "rb") as f:
+        data = f.read()
+    decoder = game_decoder.GameDecoder()
+
+    assert compiled.extract_grouped(decoder.decode(data)) == compiled.extract_grouped(json.loads(data))
+    assert decoder.fallbacks == 0
+
+
+def test_missing_and_null_fields(compiled):
+    with open("test/fixtures/fixture1.json", "r") as f:
+        json_data = json.load(f)
+    game = json_data['data']['games'][0]
+    del game['homeTeam']['displayName']
+    game['awayTeam']['displayName'] = None
+    game['gameLineSixPack'] = [entry for entry in game['gameLineSixPack'] if entry['type'] != 'MONEY_LINE']
+
+    decoded = game_decoder.GameDecoder().decode(json.dumps(json_data).encode())
+    assert compiled.extract_grouped(decoded) == compiled.extract_grouped(json_data)
+    assert 'home_team' not in compiled.extract(decoded)[0]
+    assert compiled.extract(decoded)[0]['away_team'] is None
+
+
+def test_falls_back_when_the_schema_doesnt_fit(compiled):
+    with open("test/fixtures/fixture2.json", "r") as f:
+        json_data = json.load(f)
+    # jsonpath filters work on the values of an object too
+    six_pack = json_data['data']['games'][0]['gameLineSixPack']
+    json_data['data']['games'][0]['gameLineSixPack'] = {str(i): entry for i, entry in enumerate(six_pack)}
+
+    decoder = game_decoder.GameDecoder()
+    decoded = decoder.decode(json.dumps(json_data).encode())
+    assert decoder.fallbacks == 1
+    assert decoded == json_data
+
+
+def test_make_shape_rejects_conflicting_rules():
+    with pytest.raises(ValueError):
+        game_decoder.make_shape({'a': '$.x[0]', 'b': '$.x.y'})
+    with pytest.raises(ValueError):
+        game_decoder.make_shape({'a': '$.x.y', 'b': '$.x[0]'})
+
+
+def test_make_dataframe_matches_json_load(monkeypatch):
+    filenames = ["test/fixtures/fixture1.json", "test/fixtures/fixture2.json"]
+    fast = ScrapeYahooMLB().make_dataframe(filenames)
+    monkeypatch.setattr(ScrapeYahooMLB, 'FAST_DECODE', False)
+    slow = ScrapeYahooMLB().make_dataframe(filenames)
+    assert fast.equals(slow)
@@ -0,0 +1,54 @@
+import pytest
+from game_index import GameIndex
+
+
+@pytest.fixture
+def index():
+    with GameIndex(":memory:") as index:
+        yield index
+
+
+def test_settled_dates(index):
+    index.record_date('mlb', '2026', '2026-06-10', ['mlb.g.460610128', 'mlb.g.460610129'])
+    assert not index.is_date_settled('mlb', '2026-06-10')
+    assert not index.is_date_settled('mlb', '2026-06-11')
+    assert index.missing_games('mlb') == ['mlb.g.460610128', 'mlb.g.460610129']
+
+    index.record_fetch('mlb.g.460610128', 'mlb', 'FINAL')
+    index.record_fetch('mlb.g.460610129', 'mlb', 'STATUS_TYPE_PREGAME')
+    assert not index.is_date_settled('mlb', '2026-06-10')
+    assert index.missing_games('mlb', '2026') == []
+    assert index.unfinished_games('mlb', '2026') == ['mlb.g.460610129']
+    assert index.is_final('mlb.g.460610128')
+    assert not index.is_final('mlb.g.460610129')
+
+    index.record_fetch('mlb.g.460610129', 'mlb', 'FINAL')
+    assert index.is_date_settled('mlb', '2026-06-10')
+    # the date and season from discovery are kept
+    assert index.connection.execute(
+        "SELECT season, game_date FROM games WHERE game_id = 'mlb.g.460610129'").fetchone() == ('2026', '2026-06-10')
+
+
+def test_empty_date_settles_after_the_fact(index):
+    index.record_date('nba', '2024', '2024-12-24', [])
+    assert index.is_date_settled('nba', '2024-12-24')
+
+    index.record_date('nba', '2099', '2099-12-24', [])
+    assert not index.is_date_settled('nba', '2099-12-24')
+
+
+def test_retry_queue(index):
+    assert index.queue_retry('mlb.g.460610128', 'mlb', '2026', '500 from ...', 0) == 1
+    assert index.queue_retry('mlb.g.460610129', 'mlb', '2026', '500 from ...', 3600) == 1
+    assert index.due_retries('mlb', '2026', max_attempts=2) == ['mlb.g.460610128']
+    assert index.due_retries('mlb', '2025', max_attempts=2) == []
+    assert index.next_retry_seconds('mlb', '2026', max_attempts=2) == 0
+
+    assert index.queue_retry('mlb.g.460610128', 'mlb', '2026', 'bad JSON', 0) == 2
+    assert index.due_retries('mlb', '2026', max_attempts=2) == []
+    assert index.abandoned_retries('mlb', max_attempts=2) == [('mlb.g.460610128', '2026', 'bad JSON')]
+    assert 3590 < index.next_retry_seconds('mlb', '2026', max_attempts=2) <= 3600
+
+    # fetching a game takes it out of the queue
+    index.record_fetch('mlb.g.460610129', 'mlb', 'FINAL', '2026')
+    assert index.next_retry_seconds('mlb', '2026', max_attempts=2) is None
@@ -0,0 +1,86 @@
+import datetime
+
+import pandas as pd
+
+import line_history
+import yahoo_stand_in
+from scrape_yahoo_mlb import ScrapeYahooMLB
+from scrape_yahoo_nfl import ScrapeYahooNFL
+
+
+def test_log_only_keeps_changes(tmp_path):
+    log = line_history.LineLog(str(tmp_path / "mlb.g.460610128.jsonl"))
+    assert log.append("2026-06-10T18:00:00+00:00", {'odds': -150, 'points': 1.5, 'stake': None})
+    assert not log.append("2026-06-10T18:10:00+00:00", {'odds': -150, 'points': 1.5})
+    assert log.append("2026-06-10T18:20:00+00:00", {'odds': -155})
+
+    assert (tmp_path / "mlb.g.460610128.jsonl").read_text().splitlines() == [
+        '{"at":"2026-06-10T18:00:00+00:00","set":{"odds":-150,"points":1.5}}',
+        '{"at":"2026-06-10T18:20:00+00:00","set":{"odds":-155},"unset":["points"]}',
+    ]
+    # a new LineLog picks up where the file left off
+    reopened = line_history.LineLog(log.path)
+    assert not reopened.append("2026-06-10T18:30:00+00:00", {'odds': -155})
+    assert list(reopened.read())[-1] == ("2026-06-10T18:20:00+00:00", {'odds': -155})
+
+
+def test_poll_lines(tmp_path):
+    server = yahoo_stand_in.StandInYahoo.from_synthetic(30, 'mlb', start=datetime.date(2026, 6, 10))
+    # the first day's games start at 2026-06-11 05:10 UTC, the second day's a day later
+    first_day = sorted(server.dates['2026-06-10'])
+    now = datetime.datetime(2026, 6, 11, 0, 0, tzinfo=datetime.timezone.utc)
+
+    def clock():
+        # the line moves on one game between the first and second round
+        if clock.rounds == 1:
+            moved = server.games[first_day[0]]['data']['games'][0]['gameLineSixPack'][0]['options'][0]
+            moved['americanOdds'] -= 20
+            moved['stakePercentage'] = '77.00'
+        clock.rounds += 1
+        return now + datetime.timedelta(minutes=10) * (clock.rounds - 1)
+    clock.rounds = 0
+
+    with server:
+        scraper = server.configure(ScrapeYahooMLB())
+        scraper.POLITE_DELAY = 0
+        scraper.MAX_RATE = 1000
+        scraper.POLL_INTERVAL = 0
+        scraper.POLL_BATCH_SIZE = 10
+        logs = scraper.poll_lines(str(tmp_path), hours=6, rounds=2, clock=clock)
+
+    assert sorted(path.name[:-len('.jsonl')] for path in tmp_path.iterdir()) == first_day
+    # the second day's games were only fetched once, to find out when they start
+    odds_requests = server.stats[('odds', 200)]
+    assert odds_requests == 3 + 2 # 15 + 15 games in batches of 10, then only the first day's 15
+
+    history = line_history.read_line_history(str(tmp_path))
+    assert len(history) == len(first_day) + 1
+    game = history[history.game_id == first_day[0]]
+    assert list(game.polled_at) == [pd.Timestamp(now), pd.Timestamp(now + datetime.timedelta(minutes=10))]
+    assert game.hours_before_start.iloc[0] == 5 + 10 / 60
+    changed = [column for column in game.columns
+               if column not in ('polled_at', 'hours_before_start') and game[column].nunique(dropna=False) > 1]
+    assert len(changed) == 2 and all(column.startswith('money_') for column in changed)
+    current = logs.get(first_day[0]).current()
+    assert {field: game[field].iloc[-1] for field in current} == current
+
+    assert line_history.read_line_history(str(tmp_path), first_day[:2]).game_id.nunique() == 2
+
+
+def test_poll_nfl_lines_by_week(tmp_path):
+    # 14 games a day from the 2025 kickoff, so 2025-09-10 is in week 1 and 2025-09-11 in week 2
+    server = yahoo_stand_in.StandInYahoo.from_synthetic(140, 'nfl', start=datetime.date(2025, 9, 4))
+    now = datetime.datetime(2025, 9, 11, 0, 0, tzinfo=datetime.timezone.utc)
+
+    with server:
+        scraper = server.configure(ScrapeYahooNFL())
+        scraper.POLITE_DELAY = 0
+        scraper.MAX_RATE = 1000
+        scraper.POLL_INTERVAL = 0
+        scraper.POLL_BATCH_SIZE = 10
+        scraper.poll_lines(str(tmp_path), hours=6, rounds=1, clock=lambda: now)
+
+    # the games dated 2025-09-10 start at 05:10 UTC on the 11th
+    assert sorted(path.name[:-len('.jsonl')] for path in tmp_path.iterdir()) == sorted(server.dates['2025-09-10'])
+    assert server.stats[('scoreboard', 200)] == 2
+    assert server.stats[('odds', 200)] == 3 # the 28 games dated the 10th and 11th, in batches of 10
@@ -0,0 +1,35 @@
+import shutil
+import pytest
+from scrape_yahoo_mlb import ScrapeYahooMLB
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    scraper = ScrapeYahooMLB()
+    scraper.BASE_DIR = str(tmp_path)
+    scraper.SEASONS = {'2025': None, '2026': None}
+    scraper.PARSE_CHUNK_SIZE = 1
+    for year, fixture_name in [('2025', 'fixture2'), ('2026', 'fixture1')]:
+        (tmp_path / year).mkdir()
+        shutil.copy(f"test/fixtures/{fixture_name}.json", tmp_path / year / f"{fixture_name}.json")
+    return scraper
+
+
+def test_parallel_matches_serial(scraper):
+    serial = scraper.get_all_data()
+    parallel = scraper.get_all_data(workers=2)
+
+    assert list(parallel.columns) == list(serial.columns)
+    assert list(parallel.season) == ['2025', '2026']
+    assert parallel.equals(serial)
+
+
+def test_rows_to_dataframe_fills_missing_fields(scraper):
+    df = scraper.rows_to_dataframe([{'game_id': 'a', 'money_home_odds': -110},
+                                    {'game_id': 'b', 'total_over_points': '8.5'}])
+
+    assert list(df.columns) == ['game_id', 'money_home_odds', 'total_over_points']
+    assert list(df.index) == [0, 1]
+    assert df.money_home_odds.dtype == 'float64'
+    assert df.money_home_odds.isna().tolist() == [False, True]
+    assert df.total_over_points.isna().tolist() == [True, False]
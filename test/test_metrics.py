@@ -0,0 +1,103 @@
+import json
+
+import metrics
+import scrape_rules
+import synthetic_games
+import yahoo_stand_in
+from scrape_yahoo_mlb import ScrapeYahooMLB
+from scrape_yahoo_nba import ScrapeYahooNBA
+
+
+def test_counters_histograms_and_stages():
+    recorded = metrics.Metrics()
+    recorded.count('requests', endpoint='odds', status='ok')
+    recorded.count('requests', 2, endpoint='odds', status=429)
+    for seconds in [0.004, 0.03, 0.03, 20]:
+        recorded.observe('request_seconds', seconds, endpoint='odds')
+    with recorded.stage('parse', 10):
+        pass
+
+    worker = metrics.Metrics()
+    worker.count('requests', endpoint='odds', status='ok')
+    worker.observe('request_seconds', 0.004, endpoint='odds')
+    with worker.stage('parse') as stage:
+        stage.items = 5
+    recorded.merge(worker)
+
+    snapshot = recorded.snapshot()
+    assert snapshot['counters'] == [
+        {'name': 'requests', 'labels': {'endpoint': 'odds', 'status': '429'}, 'value': 2},
+        {'name': 'requests', 'labels': {'endpoint': 'odds', 'status': 'ok'}, 'value': 2},
+    ]
+    [histogram] = snapshot['histograms']
+    assert (histogram['count'], histogram['counts'][0], histogram['counts'][3], histogram['counts'][-1]) == (5, 2, 2, 1)
+    assert (snapshot['stages']['parse']['calls'], snapshot['stages']['parse']['items']) == (2, 15)
+
+    text = recorded.prometheus()
+    assert 'scrape_yahoo_requests_total{endpoint="odds",status="429"} 2' in text
+    assert 'scrape_yahoo_request_seconds_bucket{endpoint="odds",le="0.05"} 4' in text
+    assert 'scrape_yahoo_request_seconds_bucket{endpoint="odds",le="+Inf"} 5' in text
+    assert 'scrape_yahoo_stage_items{stage="parse"} 15' in text
+
+
+def test_disabled_records_nothing():
+    with metrics.DISABLED.stage('parse') as stage:
+        stage.items = 5
+    metrics.DISABLED.count('requests')
+    metrics.DISABLED.observe('request_seconds', 1)
+    assert metrics.DISABLED.snapshot()['counters'] == []
+    assert metrics.DISABLED.stages == {}
+
+
+def test_scraper_metrics(tmp_path):
+    with yahoo_stand_in.StandInYahoo.from_synthetic(20, 'mlb', error_rate=0.2, seed=3) as server:
+        scraper = server.configure(ScrapeYahooMLB())
+        scraper.POLITE_DELAY = scraper.FAILURE_DELAY = scraper.BREAKER_COOLDOWN = 0
+        scraper.MIN_RATE, scraper.MAX_RATE = 100, 1000
+        scraper.metrics = metrics.Metrics()
+        dates = sorted(server.dates)
+        scraper.fetch_yahoo_data(str(tmp_path), dates[0], dates[-1])
+
+    filenames = sorted(str(path) for path in tmp_path.iterdir())
+    scraper.make_dataframe(filenames, workers=2)
+    scraper.metrics.write(str(tmp_path / "metrics.json"))
+    scraper.metrics.write(str(tmp_path / "metrics.prom"))
+
+    with open(tmp_path / "metrics.json") as f:
+        snapshot = json.load(f)
+    counters = {(counter['name'], tuple(counter['labels'].items())): counter['value'] for counter in snapshot['counters']}
+    assert counters[('requests', (('endpoint', 'odds'), ('status', 'ok')))] == 20
+    assert counters[('requests', (('endpoint', 'odds'), ('status', '500')))] == server.stats[('odds', 500)]
+    assert counters[('cache', (('result', 'miss'),))] == 20
+    assert counters[('games_fetched', ())] == 20
+    assert counters[('fetched_bytes', (('endpoint', 'odds'),))] > 0
+    # the parsing happened in worker processes
+    assert counters[('games_parsed', ())] == 20
+    assert snapshot['stages']['parse']['items'] == 20
+    assert snapshot['stages']['fetch']['items'] == 20
+    assert snapshot['stages']['fetch']['items_per_second'] > 0
+    assert 'scrape_yahoo_games_parsed_total 20' in (tmp_path / "metrics.prom").read_text()
+
+
+def test_misses_are_counted_when_muted():
+    scraper = ScrapeYahooMLB()
+    scraper.metrics = metrics.Metrics()
+    rng = synthetic_games.random.Random(0)
+    scraper.parse_yahoo_data(synthetic_games.make_game(rng, missing_rate=1.0))
+    groups = {labels[0][1] for (name, labels) in scraper.metrics.counters if name == 'group_misses'}
+    assert groups == {'OVER_UNDER', 'MONEY_LINE', 'SPREAD'}
+
+
+def test_nba_scraper_counts_misses():
+    scraper = ScrapeYahooNBA()
+    scraper.metrics = metrics.Metrics()
+    rng = synthetic_games.random.Random(0)
+    game = synthetic_games.make_game(rng, 'nba', missing_rate=1.0)
+    del game['data']['games'][0]['gameOddsSummary']
+    assert scraper.parse_yahoo_data(game) is None # no lines, so nobody won
+
+    counters = scraper.metrics.counters
+    assert counters[('games_parsed', ())] == 1
+    assert {labels[0][1] for (name, labels) in counters if name == 'group_misses'} == {'OVER_UNDER', 'MONEY_LINE',
+                                                                                       'SPREAD'}
+    assert counters[('rule_misses', (('rule', scrape_rules.RULES['pregame_odds']),))] == 1
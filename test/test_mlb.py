@@ -25,3 +25,30 @@ def test_massage_yahoo_data(scraper, parsed):
 
     assert massaged["spread_home_team_id"] == massaged["home_team_id"]
     assert massaged["spread_home_odds"] == massaged["spread_one_odds"]
+
+
+def test_massage_yahoo_frame_matches_rows(scraper):
+    rows = []
+    for fixture_name in ["fixture1", "fixture2"]:
+        with open(f"test/fixtures/{fixture_name}.json", "r") as f:
+            rows.append(scraper.parse_yahoo_data(json.load(f)))
+
+    for drop in [True, False]:
+        df, report = scraper.massage_yahoo_frame(scraper.rows_to_dataframe([dict(row) for row in rows]), drop=drop)
+        expected = scraper.rows_to_dataframe([scraper.massage_yahoo_data(dict(row), drop=drop) for row in rows])
+
+        assert report.empty
+        assert set(df.columns) == set(expected.columns)
+        for column in expected.columns:
+            assert df[column].tolist() == expected[column].tolist(), column
+
+
+def test_massage_yahoo_frame_reports_mismatches(scraper, parsed):
+    bad = dict(parsed, money_one_team_id='mlb.t.1')
+    df, report = scraper.massage_yahoo_frame(scraper.rows_to_dataframe([parsed, bad]))
+
+    assert report.game_id.tolist() == [parsed['game_id']]
+    assert report.bet_type.tolist() == ['money']
+    assert df.money_home_odds.isna().tolist() == [False, True]
+    assert df.money_one_team_id.tolist()[1] == 'mlb.t.1'
+    assert df.spread_home_odds.notna().all()
@@ -0,0 +1,37 @@
+import pandas as pd
+
+import nfl_results
+
+
+def test_load_scores():
+    scores = nfl_results.load_scores()
+    assert scores.groupby('season').size().to_dict() == {'2021': 272, '2022': 271, '2023': 272, '2024': 272,
+                                                          '2025': 272}
+    assert set(scores['home_team']) == set(nfl_results.TEAM_NAMES.values())
+    # Dallas won at Tampa Bay, and Philadelphia won at Atlanta (an @ in the table)
+    first = scores.iloc[:2][['date', 'home_team', 'away_team', 'home_score', 'away_score']].values.tolist()
+    assert first == [['2021-09-09', 'Tampa Bay', 'Dallas', 31, 29], ['2021-09-12', 'Atlanta', 'Philadelphia', 6, 32]]
+
+
+def test_attach_scores():
+    scores = nfl_results.load_scores(['2021'])
+    yahoo = pd.DataFrame({
+        'game_id': ['nfl.g.2021090927', 'nfl.g.2021091201', 'nfl.g.2021091202', 'nfl.g.2099010101'],
+        'game_date': pd.to_datetime(['2021-09-09', '2021-09-12', '2021-09-12', '2099-01-01']),
+        # the second game has its teams the other way around
+        'home_team': ['Tampa Bay', 'Philadelphia', 'Buffalo', 'Nowhere'],
+        'away_team': ['Dallas', 'Atlanta', 'Pittsburgh', 'Somewhere'],
+        'spread_home_points': ['-8.5', '3.5', '-6.5', None],
+        'total_over_points': [52.5, 48.5, 48.0, None],
+    })
+    df, report = nfl_results.attach_scores(yahoo, scores)
+
+    assert df['home_score'].tolist()[:3] == [31, 32, 16]
+    assert df['away_score'].tolist()[:3] == [29, 6, 23]
+    assert df['home_margin'].tolist()[:3] == [2, 26, -7]
+    assert df['spread_error'].tolist()[:3] == [-6.5, 29.5, -13.5]
+    assert df['total_error'].tolist()[:3] == [7.5, -10.5, -9]
+    assert df.iloc[3][['home_score', 'home_margin', 'spread_error']].isna().all()
+
+    assert report[report.source == 'yahoo']['game_id'].tolist() == ['nfl.g.2099010101']
+    assert (report.source == 'scores').sum() == len(scores) - 3
@@ -0,0 +1,82 @@
+import datetime
+import itertools
+
+import pytest
+
+import leagues
+import synthetic_games
+import yahoo_stand_in
+from orchestrator import Orchestrator
+
+TODAY = datetime.datetime(2026, 3, 28)
+
+
+def make_server():
+    games = itertools.chain(
+        synthetic_games.make_games(45, 'mlb', start=datetime.date(2026, 3, 25)),
+        synthetic_games.make_games(16, 'nba', start=datetime.date(2024, 10, 22)),
+        synthetic_games.make_games(16, 'nba', seed=1, start=datetime.date(2023, 10, 24)),
+        synthetic_games.make_games(28, 'nfl', start=datetime.date(2025, 9, 4)),
+    )
+    return yahoo_stand_in.StandInYahoo(dict(games))
+
+
+def make_scrapers(server, tmp_path):
+    scrapers = {league: server.configure(leagues.make_scraper(league)) for league in ['nba', 'mlb', 'nfl']}
+    for league, scraper in scrapers.items():
+        scraper.BASE_DIR = str(tmp_path / league)
+        scraper.MAX_RATE = 1000
+    scrapers['mlb'].SEASONS = {'2026': (datetime.datetime(2026, 3, 25), datetime.datetime(2026, 4, 30))}
+    scrapers['nba'].SEASONS = {
+        '2023': (datetime.datetime(2023, 10, 24), datetime.datetime(2023, 10, 26)),
+        '2024': (datetime.datetime(2024, 10, 22), datetime.datetime(2024, 10, 24)),
+    }
+    scrapers['nfl'].SEASONS = {'2025': (datetime.datetime(2025, 9, 4), datetime.datetime(2026, 2, 8))}
+    scrapers['nfl'].WEEKS = 2
+    return scrapers
+
+
+def cached_games(tmp_path, league, season):
+    return sorted(path.name[:-len('.json')] for path in (tmp_path / league / season).iterdir())
+
+
+def test_make_scraper():
+    assert leagues.make_scraper('nfl').LEAGUE == 'nfl'
+    with pytest.raises(ValueError):
+        leagues.make_scraper('nhl')
+
+
+def test_fetches_every_league(tmp_path):
+    server = make_server()
+    requests = []
+    handle = server.handle
+
+    def recording_handle(path):
+        requests.append(path)
+        return handle(path)
+
+    server.handle = recording_handle
+    with server:
+        scrapers = make_scrapers(server, tmp_path)
+        summary = Orchestrator(scrapers, concurrency=1, rate=100, today=TODAY).run()
+
+        for league, season in [('mlb', '2026'), ('nba', '2024'), ('nba', '2023'), ('nfl', '2025')]:
+            start, end = scrapers[league].SEASONS[season]
+            expected = sorted(game_id for game_id, document in server.games.items() if game_id.startswith(league) and
+                              f"{start:%Y-%m-%d}" <= server.game_date(document) <= f"{end:%Y-%m-%d}")
+            assert cached_games(tmp_path, league, season) == expected
+            assert summary[(league, season)] == {'fetched': len(expected), 'skipped': 0, 'failed': 0}
+
+        # in season first, then backfills from the newest season
+        first = [next(i for i, path in enumerate(requests) if marker in path)
+                 for marker in ['startRange=2026-03-25', 'scoreboardSeason=2025', 'startRange=2024-10-22',
+                                'startRange=2023-10-24']]
+        assert first == sorted(first)
+        # discovery stops at today
+        assert not any('2026-03-29' in path for path in requests)
+
+        # everything is settled in the indexes now, so a second run doesn't need to ask for anything
+        requests.clear()
+        summary = Orchestrator(make_scrapers(server, tmp_path), rate=100, today=TODAY).run()
+        assert requests == []
+        assert all(counts['fetched'] == 0 for counts in summary.values())
@@ -0,0 +1,88 @@
+import json
+import pytest
+from jsonpath_ng.ext import parse
+
+import rule_compiler
+import scrape_rules
+
+
+def jsonpath_row(json_data):
+    """the original rule-by-rule evaluation, kept as the reference"""
+    row = {}
+    for k, v in scrape_rules.RULES.items():
+        matches = [item.value for item in parse(v).find(json_data)]
+        if matches:
+            row[k] = matches[0]
+    return row
+
+
+@pytest.fixture
+def compiled():
+    return rule_compiler.CompiledRules(scrape_rules.RULES)
+
+
+@pytest.mark.parametrize("fixture_name", ["fixture1", "fixture2"])
+def test_matches_jsonpath(compiled, fixture_name):
+    with open(f"test/fixtures/{fixture_name}.json", "r") as f:
+        json_data = json.load(f)
+
+    row, missing = compiled.extract(json_data)
+    expected = jsonpath_row(json_data)
+
+    assert row == expected
+    assert list(row.keys()) == list(expected.keys())
+    assert set(missing) == set(scrape_rules.RULES) - set(expected)
+
+
+def test_missing_markets(compiled):
+    with open("test/fixtures/fixture1.json", "r") as f:
+        json_data = json.load(f)
+    json_data['data']['games'][0]['gameLineSixPack'] = []
+
+    row, missing = compiled.extract(json_data)
+
+    assert row == jsonpath_row(json_data)
+    assert 'money_one_odds' in missing
+    assert row['game_id'] == 'mlb.g.460610128'
+
+
+def test_missing_groups_skip_their_rules():
+    compiled = rule_compiler.CompiledRules(scrape_rules.RULES, scrape_rules.GROUPS)
+    with open("test/fixtures/fixture1.json", "r") as f:
+        json_data = json.load(f)
+    json_data['data']['games'][0]['gameLineSixPack'] = [
+        entry for entry in json_data['data']['games'][0]['gameLineSixPack'] if entry['type'] != 'SPREAD'
+    ]
+
+    row, missing_groups, missing = compiled.extract_grouped(json_data)
+
+    assert row == jsonpath_row(json_data)
+    assert missing_groups == ['SPREAD']
+    assert not any(name.startswith('spread_') for name in missing)
+    assert compiled.group_misses == {'SPREAD': 1}
+    assert set(compiled.group_rules['SPREAD']) == {name for name in scrape_rules.RULES if name.startswith('spread_')}
+
+    # plain extract still lists every rule that matched nothing
+    _, all_missing = compiled.extract(json_data)
+    assert set(all_missing) == set(scrape_rules.RULES) - set(row)
+    assert compiled.group_misses == {'SPREAD': 2}
+
+
+@pytest.mark.parametrize("remove", ["six_pack", "games"])
+def test_missing_parents_report_every_group_below(remove):
+    compiled = rule_compiler.CompiledRules(scrape_rules.RULES, scrape_rules.GROUPS)
+    with open("test/fixtures/fixture1.json", "r") as f:
+        json_data = json.load(f)
+    if remove == "six_pack":
+        del json_data['data']['games'][0]['gameLineSixPack']
+    else:
+        json_data['data']['games'] = []
+
+    row, missing_groups, missing = compiled.extract_grouped(json_data)
+
+    assert row == jsonpath_row(json_data)
+    assert missing_groups == list(scrape_rules.GROUPS)
+    # only the rules outside of the groups are missing one by one
+    grouped = {name for rules in compiled.group_rules.values() for name in rules}
+    assert not grouped & set(missing)
+    assert set(missing) == set(scrape_rules.RULES) - set(row) - grouped
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import significance
+
+
+@pytest.fixture
+def season():
+    # about an MLB season of games on a fair -110/-110 spread and a skewed money line
+    rng = np.random.default_rng(3)
+    n = 2400
+    home_odds = rng.choice([-250, -160, -120, 110, 150, 220], n).astype(float)
+    away_odds = -home_odds - 20
+    q_home = backtest.scrape_utils.vig_free_probs(home_odds, away_odds)[0]
+    home_won = rng.random(n) < q_home
+    spread_home_won = rng.random(n) < 0.5
+    wager = rng.uniform(10, 90, n)
+    return pd.DataFrame({
+        'game_id': np.arange(n),
+        'money_home_odds': home_odds,
+        'money_away_odds': away_odds,
+        'money_home_won': home_won,
+        'money_away_won': ~home_won,
+        'money_home_wager_percentage': wager,
+        'money_away_wager_percentage': 100 - wager,
+        'money_home_stake_percentage': wager,
+        'money_away_stake_percentage': 100 - wager,
+        'spread_home_points': np.where(home_odds < 0, -1.5, 1.5),
+        'spread_away_points': np.where(home_odds < 0, 1.5, -1.5),
+        'spread_home_odds': -110,
+        'spread_away_odds': -110,
+        'spread_home_won': spread_home_won,
+        'spread_away_won': ~spread_home_won,
+        'spread_home_wager_percentage': wager,
+        'spread_away_wager_percentage': 100 - wager,
+        'spread_home_stake_percentage': wager,
+        'spread_away_stake_percentage': 100 - wager,
+    })
+
+
+def test_bootstrap_weights_draw_every_bet_n_times():
+    weights = significance.bootstrap_weights(np.random.default_rng(0), 5, 50)
+    assert weights.shape == (5, 50)
+    assert (weights.sum(axis=1) == 50).all()
+
+
+def test_bootstrap_draws_whole_games(season):
+    # betting both sides of a -110/-110 spread loses the same on every game, whichever games are drawn
+    both_sides = {'both': {'market': 'spread'}, 'home': {'market': 'spread', 'side': 'home'}}
+    intervals = significance.bootstrap_roi(season, both_sides, iters=200)
+    both = intervals.loc['both']
+    assert both.roi == pytest.approx(100 / 110 * 50 - 50)
+    assert both.roi_high - both.roi_low == pytest.approx(0, abs=1e-3)
+    home = intervals.loc['home']
+    assert home.roi_high - home.roi_low > 5
+
+
+def test_seeded_and_bounded(season):
+    strategies = backtest.strategy_grid(publics=(None,))
+    small = significance.bootstrap_roi(season, strategies, iters=500, seed=1, chunk_size=64)
+    again = significance.bootstrap_roi(season, strategies, iters=500, seed=1, chunk_size=64)
+    pd.testing.assert_frame_equal(small, again)
+
+    assert (small.roi_low <= small.roi).all()
+    assert (small.roi <= small.roi_high).all()
+
+
+def test_market_p_values_are_uniform_under_the_null(season):
+    # the fixture's games are played out at the market's own odds, so nothing should stand out
+    strategies = backtest.strategy_grid()
+    p_values = significance.market_p_values(season, strategies, iters=2000, seed=2)
+    assert ((p_values > 0) & (p_values <= 1)).all()
+    assert 0.2 < p_values.median() < 0.8
+
+
+def test_full_season(season):
+    # how long this takes is tracked by the significance stage in benchmark.py
+    strategies = backtest.strategy_grid(buckets={'favorites': [-9999, -1], 'dogs': [1, 9999]})
+    results = significance.significance(season, strategies)
+    assert list(results.index) == list(strategies)
+    assert {'roi_low', 'roi_high', 'prob_profit', 'mc_p_value'} <= set(results.columns)
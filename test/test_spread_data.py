@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import scrape_utils
+import spread_data
+from scrape_yahoo_mlb import ScrapeYahooMLB
+
+
+def add_spread_columns_reference(df):
+    """
+    the previous, one .loc assignment at a time, version of add_spread_columns
+    """
+    df = scrape_utils.numericize(df)
+    df['game_date'] = pd.to_datetime(df['game_date'])
+
+    df['spread_dog'] = None
+    df.loc[df.spread_away_points > 0, 'spread_dog'] = 'AWAY'
+    df.loc[df.spread_away_points < 0, 'spread_dog'] = 'HOME'
+
+    df['spread_winner'] = None
+    df.loc[df.spread_away_won==True, 'spread_winner'] = "AWAY"
+    df.loc[df.spread_away_won==False, 'spread_winner'] = "HOME"
+
+    df['spread_dog_won'] = False
+    df.loc[(df.spread_dog == 'HOME') & (df.spread_winner == 'HOME'), 'spread_dog_won'] = True
+    df.loc[(df.spread_dog == 'AWAY') & (df.spread_winner == 'AWAY'), 'spread_dog_won'] = True
+
+    df['spread_most_popular'] = None
+    df.loc[df.spread_away_wager_percentage >= 50, 'spread_most_popular'] = 'AWAY'
+    df.loc[df.spread_away_wager_percentage < 50, 'spread_most_popular'] = 'HOME'
+
+    df['spread_popular_won'] = False
+    df.loc[df.spread_most_popular == df.spread_winner, 'spread_popular_won'] = True
+
+    df['spread_popular_underdog'] = False
+    df.loc[df.spread_most_popular == df.spread_dog, 'spread_popular_underdog'] = True
+
+    df['spread_stake_popular'] = None
+    df.loc[df.spread_away_stake_percentage >= 50, 'spread_stake_popular'] = 'AWAY'
+    df.loc[df.spread_away_stake_percentage < 50, 'spread_stake_popular'] = 'HOME'
+
+    df['spread_stake_won'] = False
+    df.loc[df.spread_stake_popular == df.spread_winner, 'spread_stake_won'] = True
+
+    df['spread_stake_underdog'] = False
+    df.loc[df.spread_stake_popular == df.spread_dog, 'spread_stake_underdog'] = True
+
+    df['spread_favorite_team_name'] = None
+    df['spread_dog_team_name'] = None
+    home_favorites = (df.spread_dog == "AWAY")
+    df.loc[home_favorites, "spread_favorite_team_name"] = df.loc[home_favorites, "home_team"]
+    df.loc[home_favorites, "spread_dog_team_name"] = df.loc[home_favorites, "away_team"]
+    away_favorites = (df.spread_dog == "HOME")
+    df.loc[away_favorites, "spread_favorite_team_name"] = df.loc[away_favorites, "away_team"]
+    df.loc[away_favorites, "spread_dog_team_name"] = df.loc[away_favorites, "home_team"]
+
+    df['spread_winner_team_name'] = None
+    df['spread_loser_team_name']  = None
+    spread_home_winners = (df.spread_home_won == True)
+    spread_home_losers = (df.spread_home_won == False)
+    df.loc[spread_home_winners, 'spread_winner_team_name'] = df.loc[spread_home_winners, 'home_team']
+    df.loc[spread_home_winners, 'spread_loser_team_name'] = df.loc[spread_home_winners, 'away_team']
+    df.loc[spread_home_losers, 'spread_winner_team_name'] = df.loc[spread_home_losers, 'away_team']
+    df.loc[spread_home_losers, 'spread_loser_team_name'] = df.loc[spread_home_losers, 'home_team']
+
+    df['spread_popular_team_name'] = None
+    popular_home = (df.spread_most_popular == "HOME")
+    df.loc[popular_home, 'spread_popular_team_name'] = df.loc[popular_home, 'home_team']
+    df.loc[~popular_home, 'spread_popular_team_name'] = df.loc[~popular_home, 'away_team']
+
+    return df
+
+
+@pytest.fixture
+def games():
+    df = ScrapeYahooMLB().make_dataframe(["test/fixtures/fixture1.json", "test/fixtures/fixture2.json"])
+    # flip each fixture around so every side of every condition shows up
+    flipped = df.copy()
+    flipped['spread_away_points'] = -pd.to_numeric(flipped.spread_away_points)
+    flipped['spread_away_won'] = ~flipped.spread_away_won.astype(bool)
+    flipped['spread_home_won'] = ~flipped.spread_home_won.astype(bool)
+    flipped['spread_away_wager_percentage'] = 100 - pd.to_numeric(flipped.spread_away_wager_percentage)
+    flipped['spread_away_stake_percentage'] = 100 - pd.to_numeric(flipped.spread_away_stake_percentage)
+    # a pick'em line and no betting percentages
+    unknown = df.iloc[:1].copy()
+    unknown['spread_away_points'] = 0
+    unknown['spread_away_wager_percentage'] = np.nan
+    unknown['spread_away_stake_percentage'] = np.nan
+    return pd.concat([df, flipped, unknown], ignore_index=True)
+
+
+def values(series):
+    return [None if pd.isna(v) else v for v in series.astype(object)]
+
+
+def test_matches_reference(games):
+    expected = add_spread_columns_reference(games.copy())
+    actual = spread_data.add_spread_columns(games.copy())
+
+    assert list(actual.columns) == list(expected.columns)
+    for column in expected.columns:
+        assert values(actual[column]) == values(expected[column]), column
+
+    assert actual.spread_dog.dtype == spread_data.SIDES
+    assert actual.spread_popular_team_name.dtype == 'category'
+    assert actual.spread_dog_won.dtype == bool
+
+
+def test_team_columns_keep_their_dtype(games):
+    first = spread_data.add_spread_columns(games.copy())
+    # a relocated team, so the two frames have different teams
+    relocated = games.copy()
+    relocated['home_team'] = relocated.home_team.replace(relocated.home_team.iloc[0], 'Las Vegas')
+    second = spread_data.add_spread_columns(relocated)
+
+    assert first.home_team.dtype == games.home_team.dtype
+    assert first.away_team.dtype == games.away_team.dtype
+    both = pd.concat([first, second], ignore_index=True)
+    assert (both.home_team == 'Las Vegas').sum() == (relocated.home_team == 'Las Vegas').sum()
+    assert (first.home_team == second.home_team).tolist() == (games.home_team == relocated.home_team).tolist()
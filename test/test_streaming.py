@@ -0,0 +1,76 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+import leagues
+import synthetic_games
+from scrape_yahoo_mlb import ScrapeYahooMLB
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    scraper = ScrapeYahooMLB()
+    scraper.BASE_DIR = str(tmp_path)
+    scraper.SEASONS = {'2025': None, '2026': None}
+    (tmp_path / '2025').mkdir()
+    synthetic_games.write_files(str(tmp_path / '2025'),
+                                synthetic_games.make_games(30, 'mlb', start=datetime.date(2025, 6, 1)))
+    # one season packed, the other not
+    synthetic_games.write_archive(scraper.get_archive_path('2026'),
+                                  synthetic_games.make_games(45, 'mlb', seed=1, start=datetime.date(2026, 4, 1)))
+    return scraper
+
+
+def test_iter_games_matches_get_all_data(scraper):
+    frames = list(scraper.iter_frames(chunk_size=7))
+    assert [len(df) for df in frames] == [7] * 10 + [5]
+    everything = scraper.get_all_data()
+    combined = pd.concat(frames, ignore_index=True)[everything.columns]
+    assert combined.astype(str).equals(everything.astype(str))
+
+    rows = list(scraper.iter_games())
+    assert [row['game_id'] for row in rows] == list(everything['game_id'])
+    assert rows[0]['season'] == '2025' and 'money_home_odds' in rows[0]
+
+
+def test_pushdown(scraper, monkeypatch):
+    opened = []
+    load_game_json = scraper.load_game_json
+
+    def recording_load(source, decoder=None):
+        opened.append(scraper.source_game_id(source))
+        return load_game_json(source, decoder)
+
+    monkeypatch.setattr(scraper, 'load_game_json', recording_load)
+
+    rows = list(scraper.iter_games(start=datetime.date(2026, 4, 2), end='2026-04-02'))
+    assert len(rows) == 15
+    assert all(row['game_date'].startswith('2026-04-02') for row in rows)
+    # only the games from that day are opened
+    assert sorted(opened) == sorted(row['game_id'] for row in rows)
+
+    opened.clear()
+    assert list(scraper.iter_games(seasons=['2025'], start='2026-01-01')) == []
+    assert opened == []
+
+    team = rows[0]['home_team']
+    playing = list(scraper.iter_games(teams={team}))
+    assert playing and all(team in (row['home_team'], row['away_team']) for row in playing)
+
+
+def test_across_leagues(scraper, tmp_path):
+    nfl = leagues.make_scraper('nfl')
+    nfl.BASE_DIR = str(tmp_path / 'nfl')
+    nfl.SEASONS = {'2025': None}
+    (tmp_path / 'nfl' / '2025').mkdir(parents=True)
+    synthetic_games.write_files(str(tmp_path / 'nfl' / '2025'),
+                                synthetic_games.make_games(14, 'nfl', start=datetime.date(2025, 9, 4)))
+    scrapers = {'mlb': scraper, 'nfl': nfl}
+
+    rows = list(leagues.iter_games(seasons=['2025'], scrapers=scrapers))
+    assert [sum(row['league'] == league for row in rows) for league in ['mlb', 'nfl']] == [30, 14]
+
+    frames = list(leagues.iter_frames(['nfl'], chunk_size=10, scrapers=scrapers))
+    assert [len(df) for df in frames] == [10, 4]
+    assert set(frames[0]['league']) == {'nfl'}
@@ -0,0 +1,39 @@
+import shutil
+import pytest
+from scrape_yahoo_mlb import ScrapeYahooMLB
+import summary_store
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    scraper = ScrapeYahooMLB()
+    scraper.BASE_DIR = str(tmp_path / "mlb_scrapes")
+    scraper.PARQUET_DIR = str(tmp_path / "odds_parquet")
+    scraper.SEASONS = {'2025': None, '2026': None}
+    for year, fixture_name in [('2025', 'fixture2'), ('2026', 'fixture1')]:
+        (tmp_path / "mlb_scrapes" / year).mkdir(parents=True)
+        shutil.copy(f"test/fixtures/{fixture_name}.json", tmp_path / "mlb_scrapes" / year / f"{fixture_name}.json")
+    return scraper
+
+
+def test_schema_covers_massaged_columns(scraper):
+    df = scraper.make_dataframe(["test/fixtures/fixture1.json"])
+    assert set(df.columns) == set(summary_store.SCHEMA)
+
+
+def test_parquet_round_trip(scraper):
+    scraper.rebuild_summary_parquet()
+
+    df = scraper.load_summary_parquet()
+    assert len(df) == 2
+    assert df.money_home_won.dtype == 'boolean'
+    assert df.spread_home_wager_percentage.dtype == 'float64'
+    assert df.home_team.dtype == 'category'
+    assert str(df.game_date.dtype).startswith('datetime64')
+
+    one_season = scraper.load_summary_parquet(seasons=['2026'], columns=['game_id', 'money_home_odds'])
+    assert list(one_season.index) == ['mlb.g.460610128']
+    assert list(one_season.columns) == ['money_home_odds', 'league', 'season']
+    assert one_season.money_home_odds.iloc[0] == -102
@@ -0,0 +1,79 @@
+import pytest
+
+from throttle import CircuitBreaker, CircuitOpen, FetchError, Throttle
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_goes_up_and_backs_off():
+    clock = Clock()
+    pacer = Throttle(1.0, min_rate=0.25, max_rate=1.5, step=0.25, backoff=2, clock=clock)
+    pacer.started()
+    assert pacer.wait_seconds() == 1.0
+
+    for _ in range(3):
+        pacer.success(0.1)
+    assert pacer.rate == 1.5 # capped at max_rate
+    pacer.success(5.0) # slow
+    assert pacer.rate == 0.75
+
+    pacer.failure(ValueError("bad JSON"))
+    assert pacer.rate == 0.375
+    assert pacer.backoff_seconds() == 2
+    pacer.failure()
+    assert pacer.rate == 0.25 # held at min_rate
+    assert pacer.backoff_seconds() == 4 # doubled
+
+    clock.now += 10
+    assert pacer.backoff_seconds() == 0
+    pacer.failure(FetchError("429", 429, retry_after=30))
+    assert pacer.backoff_seconds() == 30
+    assert pacer.counts == {'success': 3, 'slow': 1, 'failure': 3, 'rejected': 0}
+
+
+def test_other_4xx_dont_slow_down():
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=2, clock=clock)
+    pacer = Throttle(1.0, step=0.25, breaker=breaker, clock=clock)
+    for _ in range(5):
+        pacer.failure(FetchError("404", 404))
+    assert (pacer.rate, pacer.backoff_seconds(), breaker.state) == (1.0, 0, 'closed')
+    assert pacer.counts['rejected'] == 5
+
+    pacer.failure(FetchError("503", 503))
+    assert pacer.rate == 0.5
+    assert pacer.backoff_seconds() > 0
+
+
+def test_circuit_breaker():
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=3, cooldown=10, max_trips=2, clock=clock)
+    for _ in range(2):
+        breaker.failure()
+    assert breaker.wait_seconds() == 0
+    breaker.failure()
+    assert breaker.state == 'open'
+    assert breaker.wait_seconds() == 10
+
+    # after the cooldown, one probe goes through and everyone else waits on it
+    clock.now += 10
+    assert breaker.wait_seconds() == 0
+    breaker.started()
+    assert breaker.wait_seconds() > 0
+    breaker.success()
+    assert (breaker.state, breaker.trips, breaker.wait_seconds()) == ('closed', 0, 0)
+
+    for _ in range(3):
+        breaker.failure()
+    clock.now += 10
+    breaker.started()
+    breaker.failure() # the probe failed too, so it cools down twice as long
+    assert breaker.trips == 2
+    with pytest.raises(CircuitOpen):
+        breaker.wait_seconds()
@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from scrape_yahoo_mlb import ScrapeYahooMLB
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    scraper = ScrapeYahooMLB()
+    scraper.BASE_DIR = str(tmp_path)
+    scraper.SEASONS = {'2026': None}
+    (tmp_path / "2026").mkdir()
+    shutil.copy("test/fixtures/fixture1.json", tmp_path / "2026" / "mlb.g.460610128.json")
+    return scraper
+
+
+def full_rebuild(scraper):
+    return scraper.get_all_data().drop(columns='season')
+
+
+def summary(scraper):
+    df = pd.read_csv(f"{scraper.BASE_DIR}/csv/2026_odds.csv")
+    return df.sort_values('game_id', ignore_index=True)
+
+
+def test_only_changed_games_are_parsed(scraper, tmp_path, monkeypatch):
+    scraper.update_summary()
+    assert list(summary(scraper).game_id) == ['mlb.g.460610128']
+
+    # a new game shows up, and an existing one gets re-fetched with different odds
+    shutil.copy("test/fixtures/fixture2.json", tmp_path / "2026" / "mlb.g.460501120.json")
+    with open("test/fixtures/fixture1.json", "r") as f:
+        updated = json.load(f)
+    updated['data']['games'][0]['gameLineSixPack'][0]['options'][0]['americanOdds'] = -150
+    with open(tmp_path / "2026" / "mlb.g.460610128.json", "w") as f:
+        json.dump(updated, f)
+    os.utime(tmp_path / "2026" / "mlb.g.460610128.json", ns=(0, 1))
+
+    parsed = []
+    parse_files = scraper.parse_files
+    monkeypatch.setattr(scraper, "parse_files",
+                        lambda filenames, *args: parsed.extend(filenames) or parse_files(filenames, *args))
+
+    scraper.update_summary()
+    assert sorted(os.path.basename(f) for f in parsed) == ['mlb.g.460501120.json', 'mlb.g.460610128.json']
+    df = summary(scraper)
+    assert list(df.game_id) == ['mlb.g.460501120', 'mlb.g.460610128']
+    assert df.money_away_odds.tolist()[1] == -150
+
+    # nothing changed, nothing parsed
+    parsed.clear()
+    scraper.update_summary()
+    assert parsed == []
+
+    # a removed game is dropped
+    os.remove(tmp_path / "2026" / "mlb.g.460501120.json")
+    scraper.update_summary()
+    assert list(summary(scraper).game_id) == ['mlb.g.460610128']
+    assert len(full_rebuild(scraper)) == 1
+
+
+def test_summary_written_with_its_index(scraper, tmp_path):
+    # summaries from before update_summary were written by to_csv with the index
+    os.makedirs(tmp_path / "csv")
+    old = full_rebuild(scraper).assign(game_id='mlb.g.460501120')
+    old.to_csv(tmp_path / "csv" / "2026_odds.csv")
+    assert 'Unnamed: 0' in pd.read_csv(tmp_path / "csv" / "2026_odds.csv").columns
+
+    scraper.update_summary()
+    df = summary(scraper)
+    assert 'Unnamed: 0' not in df.columns
+    assert list(df.columns) == list(full_rebuild(scraper).columns)
+    assert list(df.game_id) == ['mlb.g.460501120', 'mlb.g.460610128']
+    assert 'Unnamed: 0' not in pd.read_csv(tmp_path / "csv" / "all_odds.csv").columns
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+import fetch_benchmark
+import yahoo_stand_in
+from scrape_yahoo_mlb import ScrapeYahooMLB
+
+
+@pytest.fixture
+def server():
+    with yahoo_stand_in.StandInYahoo.from_synthetic(40, 'mlb') as server:
+        yield server
+
+
+def test_routes(server):
+    scraper = server.configure(ScrapeYahooMLB())
+    dates = sorted(server.dates)
+
+    status, _, body = server.handle(scraper.make_date_url(dates[0], dates[1]).replace(server.base_url, ''))
+    assert status == 200
+    assert scraper.extract_game_ids(body.decode()) == set(server.dates[dates[0]] + server.dates[dates[1]])
+
+    game_ids = server.dates[dates[0]][:3] + ['mlb.g.unknown']
+    status, _, body = server.handle(scraper.make_yahoo_json_url(game_ids).replace(server.base_url, ''))
+    assert sorted(scraper.split_games_response(json.loads(body))) == sorted(game_ids[:3])
+
+    assert server.handle('/nowhere')[0] == 404
+    assert server.stats == {('dates', 200): 1, ('odds', 200): 1, ('unknown', 404): 1}
+
+
+def test_nfl_weeks():
+    server = yahoo_stand_in.StandInYahoo.from_synthetic(30, 'nfl')
+    week_one = server.handle('/nfl/scoreboard/?confId=&dateRange=1&schedState=2&scoreboardSeason=2026')[2].decode()
+    week_two = server.handle('/nfl/scoreboard/?confId=&dateRange=2&schedState=2&scoreboardSeason=2026')[2].decode()
+    first_week = [game_id for date in sorted(server.dates)[:7] for game_id in server.dates[date]]
+    assert all(game_id in week_one for game_id in first_week)
+    assert not any(game_id in week_two for game_id in first_week)
+
+
+def test_faults():
+    games = yahoo_stand_in.StandInYahoo.from_synthetic(5, 'mlb').games
+    throttled = yahoo_stand_in.StandInYahoo(games, throttle_rate=1, retry_after=3)
+    status, headers, _ = throttled.handle('/v1/query/shangrila/leagueGameIdsByDate?startRange=2026-03-25&endRange=2026-03-25')
+    assert (status, headers['Retry-After']) == (429, '3')
+
+    truncated = yahoo_stand_in.StandInYahoo(games, truncate_rate=1)
+    status, _, body = truncated.handle('/v1/query/shangrila/leagueGameIdsByDate?startRange=2026-03-25&endRange=2026-03-25')
+    assert status == 200
+    with pytest.raises(ValueError):
+        json.loads(body)
+
+
+def test_sequential_fetch(server, tmp_path):
+    scraper = server.configure(ScrapeYahooMLB())
+    scraper.POLITE_DELAY = 0.01
+    scraper.MAX_RATE = 1000
+    dates = sorted(server.dates)
+    scraper.fetch_yahoo_data(str(tmp_path), dates[0], dates[-1])
+
+    assert sorted(path.name[:-len('.json')] for path in tmp_path.iterdir()) == sorted(server.games)
+    # clean responses speed it up
+    assert scraper.get_throttle().rate > 1 / scraper.POLITE_DELAY
+
+
+def test_sequential_fetch_retries_failures(tmp_path):
+    from game_index import GameIndex
+
+    with yahoo_stand_in.StandInYahoo.from_synthetic(40, 'mlb', error_rate=0.2, throttle_rate=0.05,
+                                                    retry_after=0) as server, GameIndex(":memory:") as index:
+        scraper = server.configure(ScrapeYahooMLB())
+        scraper.POLITE_DELAY = scraper.FAILURE_DELAY = scraper.BREAKER_COOLDOWN = 0
+        scraper.MIN_RATE, scraper.MAX_RATE = 100, 1000
+        dates = sorted(server.dates)
+        scraper.fetch_yahoo_data(str(tmp_path), dates[0], dates[-1], index=index, season='2026')
+
+        assert sorted(path.name[:-len('.json')] for path in tmp_path.iterdir()) == sorted(server.games)
+        assert server.stats[('odds', 500)] > 0 and server.stats[('odds', 429)] > 0
+        assert scraper.get_throttle().counts['failure'] == sum(count for (_, status), count in server.stats.items()
+                                                               if status != 200)
+        assert index.due_retries('mlb', '2026', scraper.MAX_ATTEMPTS) == []
+        assert index.abandoned_retries('mlb', scraper.MAX_ATTEMPTS) == []
+
+
+def test_fetch_benchmark_with_faults():
+    run = fetch_benchmark.run_fetch_benchmark(60, 'mlb', 'async', concurrency=4, rate=1000, batch_size=8,
+                                              truncate_rate=0.2, seed=1)
+    assert run['fetched'] + run['failed'] == 60
+    assert run['retries'] > 0
+    assert 'odds_truncated 200' in run['requests']
+
+
+def test_async_fetch_drains_retries():
+    run = fetch_benchmark.run_fetch_benchmark(60, 'mlb', 'async', concurrency=4, rate=1000, batch_size=4,
+                                              error_rate=0.3, retry_after=0, seed=2)
+    assert run['fetched'] == 60
+    assert run['throttle']['failure'] > 0
+
+
+@pytest.mark.parametrize("fetch", ["sequential", "async"])
+def test_unreadable_date_is_given_up_on(server, tmp_path, fetch):
+    scraper = server.configure(ScrapeYahooMLB())
+    scraper.POLITE_DELAY = 0.01
+    scraper.MAX_RATE = 1000
+    dates = sorted(server.dates)
+    extract_game_ids = scraper.extract_game_ids
+
+    def extract_all_but_the_first(date_html):
+        game_ids = extract_game_ids(date_html)
+        if set(server.dates[dates[0]]) & game_ids:
+            raise ValueError("unexpected page")
+        return game_ids
+
+    # the requests themselves go fine, so the throttle never slows the retries down
+    scraper.extract_game_ids = extract_all_but_the_first
+    if fetch == "sequential":
+        scraper.fetch_yahoo_data(str(tmp_path), dates[0], dates[-1])
+    else:
+        scraper.fetch_yahoo_data_async(str(tmp_path), dates[0], dates[-1], rate=1000)
+
+    assert server.stats[('dates', 200)] == scraper.MAX_ATTEMPTS + len(dates) - 1
+    expected = sorted(game_id for date in dates[1:] for game_id in server.dates[date])
+    assert sorted(path.name[:-len('.json')] for path in tmp_path.iterdir()) == expected
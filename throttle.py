@@ -0,0 +1,207 @@
+"""
+Adaptive request pacing for the fetchers, so a backfill finds the fastest rate Yahoo will put
+up with on its own instead of sleeping a fixed 2 seconds between requests.
+
+`Throttle` keeps a request rate in requests per second. Every fast, clean response adds `step`
+to it, up to `max_rate`. A 429, a 5xx, a connection error or a body that can't be parsed halves
+it (down to `min_rate`) and holds off every request for a while: `backoff` seconds, doubled for
+every failure in a row, or however long the Retry-After header asked for. A slow response halves
+the rate too, without holding anything off. It's additive increase, multiplicative decrease, the
+same way TCP finds the bandwidth of a connection. Any other 4xx (a 404 for a game id Yahoo took
+down, say) is about that one request, not about how hard we're pushing, so it's only counted.
+
+`CircuitBreaker` handles the server being down rather than busy. After `threshold` failures in a
+row it opens, and requests wait out a cooldown before a single probe request is let through. A
+successful probe closes it, a failed one opens it again with twice the cooldown. After
+`max_trips` openings without a success in between, it raises CircuitOpen, since it's better to
+stop and let the retry queue pick things up on the next run than to keep knocking.
+
+Both take a `clock` so tests don't have to sleep.
+"""
+
+import time
+
+
+class FetchError(Exception):
+    """
+    a response that came back, but not with what was asked for. `retry_after` is the number of
+    seconds the server asked us to wait, if it said.
+    """
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+def retry_after_seconds(response):
+    """
+    the Retry-After header in seconds, or None if it's missing or an HTTP date
+    """
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+def pushes_back(error):
+    """
+    whether a failed request means the server wants us to slow down: a 429, a 5xx, a
+    connection error or a body that can't be parsed. other 4xx only say that request was bad.
+
+    >>> pushes_back(FetchError("404", 404)), pushes_back(FetchError("429", 429)), pushes_back(ValueError())
+    (False, True, True)
+    """
+    status = getattr(error, 'status', None)
+    return status is None or status == 429 or not 400 <= status < 500
+
+
+def check_response(response):
+    """
+    returns the text of a successful response, and raises FetchError for anything else
+    """
+    if response.status_code >= 400:
+        raise FetchError(f"{response.status_code} from {response.url}", response.status_code,
+                         retry_after_seconds(response))
+    return response.text
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=5, cooldown=60.0, max_cooldown=900.0, max_trips=5, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max_trips
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0 # in a row
+        self.trips = 0 # openings in a row, without a success in between
+        self.opened_at = None
+        self.probing = False
+
+    def current_cooldown(self):
+        return min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1))
+
+    def wait_seconds(self):
+        """
+        seconds to wait before the next request. raises CircuitOpen once it has given up.
+        """
+        if self.state == 'closed':
+            return 0.0
+        if self.trips >= self.max_trips:
+            raise CircuitOpen(f"{self.trips} failed attempts to get going again after {self.threshold} "
+                              "failures in a row")
+        remaining = self.opened_at + self.current_cooldown() - self.clock()
+        if remaining > 0:
+            return remaining
+        if self.probing:
+            # another request is already finding out whether the server is back
+            return min(1.0, self.current_cooldown())
+        return 0.0
+
+    def started(self):
+        if self.state == 'open' and self.clock() >= self.opened_at + self.current_cooldown():
+            self.probing = True
+
+    def success(self):
+        self.state = 'closed'
+        self.failures = 0
+        self.trips = 0
+        self.probing = False
+
+    def failure(self):
+        self.failures += 1
+        # failures of requests that were already in flight when it opened don't count
+        if self.probing or (self.state == 'closed' and self.failures >= self.threshold):
+            self.state = 'open'
+            self.trips += 1
+            self.opened_at = self.clock()
+            self.probing = False
+
+
+class Throttle:
+    def __init__(self, rate, min_rate=0.05, max_rate=2.0, step=0.1, decrease=0.5, slow_seconds=2.0,
+                 backoff=10.0, max_backoff=300.0, breaker=None, clock=time.monotonic):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.step = step
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker
+        self.clock = clock
+        self.failures = 0 # in a row
+        self.resume_at = 0.0
+        self.last_request = None
+        self.counts = {'success': 0, 'failure': 0, 'slow': 0, 'rejected': 0}
+
+    def interval(self):
+        return 1 / self.rate
+
+    def backoff_seconds(self):
+        """
+        seconds every request has to hold off for, because of a recent failure or an open circuit
+        """
+        wait = self.resume_at - self.clock()
+        if self.breaker is not None:
+            wait = max(wait, self.breaker.wait_seconds())
+        return max(0.0, wait)
+
+    def wait_seconds(self):
+        """
+        seconds until the next request can go, counting the spacing between requests
+        """
+        wait = self.backoff_seconds()
+        if self.last_request is not None:
+            wait = max(wait, self.last_request + self.interval() - self.clock())
+        return wait
+
+    def started(self):
+        """
+        marks the start of a request, and returns the time it started
+        """
+        self.last_request = self.clock()
+        if self.breaker is not None:
+            self.breaker.started()
+        return self.last_request
+
+    def success(self, seconds):
+        """
+        a request that worked, and took `seconds`
+        """
+        self.failures = 0
+        if seconds > self.slow_seconds:
+            self.counts['slow'] += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+        else:
+            self.counts['success'] += 1
+            self.rate = min(self.max_rate, self.rate + self.step)
+        if self.breaker is not None:
+            self.breaker.success()
+
+    def failure(self, error=None):
+        """
+        a request that didn't work. a FetchError's `retry_after` is used as the backoff, if it has one.
+        errors that don't push back (see pushes_back) leave the rate alone, and count as the server
+        being up for the circuit breaker.
+        """
+        if not pushes_back(error):
+            self.counts['rejected'] += 1
+            if self.breaker is not None:
+                self.breaker.success()
+            return
+        self.counts['failure'] += 1
+        self.failures += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        backoff = getattr(error, 'retry_after', None)
+        if backoff is None:
+            backoff = min(self.max_backoff, self.backoff * 2 ** (self.failures - 1))
+        self.resume_at = max(self.resume_at, self.clock() + backoff)
+        if self.breaker is not None:
+            self.breaker.failure()
@@ -0,0 +1,193 @@
+"""
+A local stand-in for the Yahoo endpoints the scrapers fetch from, for tests and benchmarks.
+
+Serves, from a dict of {game id: gameOdds document}:
+
+    /v1/query/shangrila/leagueGameIdsByDate?startRange=..&endRange=..&leagues=..
+    /site/api/resource/sports.graphite.gameOdds;...;gameIds=<id>,<id>,...
+    /nfl/scoreboard/?dateRange=<week>&scoreboardSeason=<year>
+
+Games are dated by their `startDate`, and NFL weeks count 7 days from the first NFL game of
+a season. Faults can be mixed in to see how the fetchers cope:
+
+    latency, jitter   seconds added to every response (latency + up to `jitter` more)
+    error_rate        chance of a 500
+    throttle_rate     chance of a 429 with a Retry-After header
+    truncate_rate     chance of a 200 whose body is cut off halfway
+
+Every response is counted in `stats`, by endpoint and status, like ('odds', 200).
+
+    with StandInYahoo.from_synthetic(500, 'mlb') as server:
+        scraper = ScrapeYahooMLB()
+        server.configure(scraper)
+        scraper.fetch_yahoo_data(...)
+"""
+
+import collections
+import datetime
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import synthetic_games
+
+
+class StandInYahoo:
+    def __init__(self, games, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, truncate_rate=0.0,
+                 retry_after=1, seed=0):
+        self.games = dict(games)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.truncate_rate = truncate_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = collections.Counter()
+        self.server = None
+
+        self.dates = collections.defaultdict(list)
+        for game_id, document in self.games.items():
+            self.dates[self.game_date(document)].append(game_id)
+
+    @classmethod
+    def from_synthetic(cls, n_games, league='mlb', seed=0, start=datetime.date(2026, 3, 25), **faults):
+        return cls(synthetic_games.make_games(n_games, league, seed, start=start), seed=seed, **faults)
+
+    @classmethod
+    def from_files(cls, filenames, **faults):
+        games = {}
+        for filename in filenames:
+            with open(filename, 'r') as f:
+                document = json.load(f)
+            games[document['data']['games'][0]['gameId']] = document
+        return cls(games, **faults)
+
+    def game_date(self, document):
+        return document['data']['games'][0]['startDate'][:10]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self, port=0):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers, body = stand_in.handle(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def configure(self, scraper):
+        """
+        points a scraper's requests at this server
+        """
+        scraper.YAHOO_BASE_URL = self.base_url
+        scraper.GRAPHITE_BASE_URL = self.base_url
+        return scraper
+
+    def handle(self, path):
+        """
+        returns (status, headers, body bytes) for a request path
+        """
+        endpoint, body = self.route(path)
+        with self.lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            roll = self.rng.random()
+        if delay:
+            time.sleep(delay)
+
+        headers = {"Content-Type": "application/json"}
+        if body is None:
+            status, body = 404, b'{"error": "not found"}'
+        elif roll < self.throttle_rate:
+            status, body = 429, b'{"error": "too many requests"}'
+            headers["Retry-After"] = str(self.retry_after)
+        elif roll < self.throttle_rate + self.error_rate:
+            status, body = 500, b'{"error": "internal error"}'
+        elif roll < self.throttle_rate + self.error_rate + self.truncate_rate:
+            status, body = 200, body[:len(body) // 2]
+            endpoint += '_truncated'
+        else:
+            status = 200
+
+        with self.lock:
+            self.stats[(endpoint, status)] += 1
+        return status, headers, body
+
+    def route(self, path):
+        """
+        returns (endpoint name, body bytes), or a None body for an unknown path
+        """
+        url = urllib.parse.urlsplit(path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+
+        if url.path.endswith('/leagueGameIdsByDate'):
+            return 'dates', self.game_ids_body(query['startRange'], query['endRange'], query.get('leagues'))
+
+        odds = re.search(r"sports\.graphite\.gameOdds;.*gameIds=([^;/?]*)", url.path)
+        if odds:
+            return 'odds', self.odds_body(urllib.parse.unquote(odds.group(1)).split(','))
+
+        scoreboard = re.match(r"/(\w+)/scoreboard/?$", url.path)
+        if scoreboard and 'dateRange' in query:
+            return 'scoreboard', self.scoreboard_body(scoreboard.group(1), int(query['dateRange']),
+                                                      int(query['scoreboardSeason']))
+        return 'unknown', None
+
+    def league_games(self, league):
+        return {game_id: document for game_id, document in self.games.items()
+                if league is None or game_id.startswith(f"{league}.g.")}
+
+    def game_ids_body(self, start, end, league=None):
+        games = [{'gameId': game_id, 'startDate': self.game_date(document)}
+                 for game_id, document in sorted(self.league_games(league).items())
+                 if start <= self.game_date(document) <= end]
+        return json.dumps({'data': {'games': games}}).encode()
+
+    def odds_body(self, game_ids):
+        games = [self.games[game_id]['data']['games'][0] for game_id in game_ids if game_id in self.games]
+        return json.dumps({'data': {'games': games}, 'extensions': {}}).encode()
+
+    def scoreboard_body(self, league, week, year):
+        # a season runs from its first game through february of the next year
+        season = {game_id: datetime.date.fromisoformat(self.game_date(document))
+                  for game_id, document in self.league_games(league).items()}
+        season = {game_id: date for game_id, date in season.items()
+                  if date.year == year or (date.year == year + 1 and date.month <= 2)}
+        if not season:
+            return b"<html><body></body></html>"
+        first = min(season.values())
+        links = [f'<a href="/{league}/game/{game_id}/">{game_id}</a>' for game_id, date in sorted(season.items())
+                 if (date - first).days // 7 + 1 == week]
+        return f"<html><body>{''.join(links)}</body></html>".encode()